@@ -5,6 +5,9 @@ from clock.contracts.models import Contract
 
 class ContractAdmin(admin.ModelAdmin):
     list_display = ("__str__", "employee", "hours")
+    list_select_related = ("employee",)
+    search_fields = ("department", "employee__username")
+    autocomplete_fields = ("employee",)
 
 
 admin.site.register(Contract, ContractAdmin)
@@ -1,10 +1,10 @@
-import datetime
-
 from django.core.exceptions import ValidationError
 from django.db.models.fields import IntegerField
 from django.forms.fields import CharField
 from django.utils.translation import ugettext_lazy as _
 
+from clock.contracts.utils import WorkingHours
+
 
 """
 All credit for WorkingHoursFieldForm and WorkingHoursField go to
@@ -61,48 +61,74 @@ class WorkingHoursFieldForm(CharField):
         return value
 
 
+class WorkingHoursDescriptor:
+    """Converts the values assigned to a `WorkingHoursField` to
+    `WorkingHours`, e.g. minutes passed to `Contract.objects.create()`.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        if self.field.attname not in instance.__dict__:
+            # The field was deferred.
+            instance.refresh_from_db(fields=[self.field.attname])
+        value = instance.__dict__[self.field.attname]
+        if value is not None and not isinstance(value, WorkingHours):
+            # E.g. instances that were pickled before we used `WorkingHours`.
+            try:
+                value = instance.__dict__[self.field.attname] = WorkingHours.parse(
+                    value
+                )
+            except ValueError:
+                pass
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
 class WorkingHoursField(IntegerField):
     """Creates a custom field so we can store our working hours in contracts.
     Working hours are stored as an integer in minutes inside the database.
 
-    This field accepts input in the format HH.MM and will display it the same
-    way.
+    The values are returned as `WorkingHours`, which are displayed as HH:MM.
+    Strings in the format HH:MM are accepted as well.
     """
 
-    # Get values from database and return them as HH.MM
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        setattr(cls, self.attname, WorkingHoursDescriptor(self))
+
     def from_db_value(self, value, expression, connection, context):
         if value is None:
             return value
-        hours, minutes = divmod(value, 60)
-        return "%02d:%02d" % (hours, minutes)
+        return WorkingHours(value)
 
     def to_python(self, value):
         if value is None:
             return value
-        if isinstance(value, int):
-            return value
-        # Split into two values and return the duration in minutes!
-        if isinstance(value, str):
-            try:
-                hours, minutes = list(map(int, value.split(":")))
-            except ValueError:
-                raise ValidationError(
-                    _("Working hours entered must be in format HH:MM")
-                )
+        try:
+            return WorkingHours.parse(value)
+        except ValueError:
+            raise ValidationError(_("Working hours entered must be in format HH:MM"))
 
-            # If the user entered a value like '30.3' we will convert it into
-            # '30.30'. Otherwise it would be interpreted as '30.03'.
-            if len(value.split(":")[1]) == 1 and minutes < 10:
-                minutes *= 10
-            return (hours * 60) + minutes
-        # I do not know if this is really relevant here?
-        elif not isinstance(value, datetime.timedelta):
-            raise ValidationError("Unable to convert %s to timedelta." % value)
-        return value
+    def get_prep_value(self, value):
+        if value is None:
+            return value
+        return self.to_python(value).minutes
 
     def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
         return value
 
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return "" if value is None else str(value)
+
     # This is somehow needed, as otherwise the form will not work correctly!
     def formfield(self, form_class=WorkingHoursFieldForm, **kwargs):
         defaults = {
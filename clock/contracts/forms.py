@@ -4,6 +4,7 @@ from crispy_forms.helper import FormHelper
 from crispy_forms.layout import HTML, Field, Layout, Submit
 from django import forms
 from django.conf import settings
+from django.forms.models import ModelChoiceIterator
 from django.urls import reverse_lazy
 from django.utils.translation import ugettext_lazy as _
 
@@ -99,3 +100,50 @@ class ContractForm(forms.ModelForm):
             raise forms.ValidationError(
                 _("The end date must be bigger than the start date.")
             )
+
+
+class ContractChoiceIterator(ModelChoiceIterator):
+    """Iterate over the contracts of the registry instead of the queryset."""
+
+    def __iter__(self):
+        if self.field.registry is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for contract in self.field.registry:
+            yield self.choice(contract)
+
+    def __len__(self):
+        if self.field.registry is None:
+            return super().__len__()
+        return len(self.field.registry) + (self.field.empty_label is not None)
+
+
+class ContractChoiceField(forms.ModelChoiceField):
+    """
+    Choice field for the contracts of a user. If a `ContractRegistry` is set,
+    the choices and the submitted value are taken from the registry, so
+    rendering and validating the form does not query the contracts again.
+    """
+
+    iterator = ContractChoiceIterator
+
+    def __init__(self, *args, registry=None, **kwargs):
+        self.registry = registry
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if self.registry is None or value in self.empty_values:
+            return super().to_python(value)
+        if isinstance(value, Contract):
+            value = value.pk
+        try:
+            contract = self.registry.get(int(value))
+        except (TypeError, ValueError):
+            contract = None
+        if contract is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"], code="invalid_choice"
+            )
+        return contract
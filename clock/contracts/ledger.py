@@ -0,0 +1,160 @@
+"""Overtime and undertime balance of the contracts.
+
+The time worked per contract and month is kept in `MonthlyBalance` rows,
+together with the running total up to the month. Saving or deleting a shift
+moves its duration from the row of its old month and contract to the one of
+its new month and contract, so the balance never needs to sum up shifts.
+Bulk operations that do not send signals call `rebuild_balances()`.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from clock.contracts.models import MonthlyBalance
+from clock.contracts.utils import format_minutes
+from clock.shifts.models import Shift
+
+
+def month_of(started):
+    """Return the first day of the month (in the current timezone) of the
+    given datetime.
+    """
+    return timezone.localtime(started).date().replace(day=1)
+
+
+def add_worked_time(contract_id, started, duration):
+    """Add the (possibly negative) duration to the month of the given datetime
+    and to the running totals of all following months of the contract.
+    """
+    month = month_of(started)
+    balances = MonthlyBalance.objects.filter(contract_id=contract_id)
+    with transaction.atomic():
+        if duration > timedelta(0):
+            # Removing time only happens for shifts that were added before,
+            # so only adding time may need a new row. This also keeps us from
+            # creating rows for contracts that are being deleted.
+            previous = (
+                balances.filter(month__lt=month)
+                .order_by("-month")
+                .values_list("worked_total", flat=True)
+                .first()
+            )
+            MonthlyBalance.objects.get_or_create(
+                contract_id=contract_id,
+                month=month,
+                defaults={"worked_total": previous or timedelta(0)},
+            )
+        balances.filter(month=month).update(worked=F("worked") + duration)
+        balances.filter(month__gte=month).update(
+            worked_total=F("worked_total") + duration
+        )
+
+
+def rebuild_balances(contract_ids=None):
+    """
+    Recompute the balance rows of the given or of all contracts from their
+    shifts with one grouped query.
+    """
+    shifts = Shift.objects.filter(contract__isnull=False, duration__isnull=False)
+    balances = MonthlyBalance.objects.all()
+    if contract_ids is not None:
+        shifts = shifts.filter(contract_id__in=contract_ids)
+        balances = balances.filter(contract_id__in=contract_ids)
+
+    rows = (
+        shifts.annotate(
+            month=TruncMonth("started", tzinfo=timezone.get_current_timezone())
+        )
+        .values("contract_id", "month")
+        .annotate(worked=Sum("duration"))
+        .order_by("contract_id", "month")
+    )
+
+    objects = []
+    totals = {}
+    for row in rows:
+        total = totals.get(row["contract_id"], timedelta(0)) + row["worked"]
+        totals[row["contract_id"]] = total
+        objects.append(
+            MonthlyBalance(
+                contract_id=row["contract_id"],
+                month=row["month"].date(),
+                worked=row["worked"],
+                worked_total=total,
+            )
+        )
+
+    with transaction.atomic():
+        balances.delete()
+        MonthlyBalance.objects.bulk_create(objects, batch_size=1000)
+    return len(objects)
+
+
+def target_minutes(contract, until):
+    """
+    Return the minutes the employee should have worked on the contract from
+    its start up to the end of the month of `until`.
+
+    Contracts start at their start date or, without one, when they were
+    created. The first and the last month of a contract only count for the
+    days the contract was running.
+    """
+    hours = contract.hours.minutes
+    first = contract.start_date or timezone.localtime(contract.created_at).date()
+    last = until.replace(day=calendar.monthrange(until.year, until.month)[1])
+    if contract.end_date and contract.end_date < last:
+        last = contract.end_date
+    if last < first:
+        return 0
+
+    months = (last.year - first.year) * 12 + last.month - first.month + 1
+    minutes = months * hours
+    # Days of the first month before the start of the contract
+    minutes -= hours * (first.day - 1) / calendar.monthrange(first.year, first.month)[1]
+    # Days of the last month after the end of the contract
+    days_in_last = calendar.monthrange(last.year, last.month)[1]
+    minutes -= hours * (days_in_last - last.day) / days_in_last
+    return round(minutes)
+
+
+def get_balances(contracts, year, month):
+    """
+    Returns the balance (see `get_balance()`) of every contract up to the end
+    of the given month, with one query for all of them.
+    """
+    until = date(int(year), int(month), 1)
+    # The latest row of every contract up to the month
+    totals = dict(
+        MonthlyBalance.objects.filter(contract__in=contracts, month__lte=until)
+        .order_by("contract_id", "-month")
+        .distinct("contract_id")
+        .values_list("contract_id", "worked_total")
+    )
+    balances = []
+    for contract in contracts:
+        worked = totals.get(contract.pk) or timedelta(0)
+        worked = int(worked.total_seconds() // 60)
+        target = target_minutes(contract, until)
+        balances.append(
+            {
+                "contract": contract,
+                "month": until,
+                "worked": worked,
+                "target": target,
+                "balance": worked - target,
+                "balance_display": format_minutes(worked - target),
+            }
+        )
+    return balances
+
+
+def get_balance(contract, year, month):
+    """
+    Returns the minutes worked on the contract, the target minutes and the
+    difference (positive for overtime) up to the end of the given month.
+    """
+    return get_balances([contract], year, month)[0]
@@ -0,0 +1,21 @@
+"""Recompute the balance ledger of the contracts from their shifts.
+
+The ledger is updated whenever a shift is saved or deleted. Changes that do
+not send any signals, e.g. raw SQL or `QuerySet.update()`, require a rebuild.
+"""
+from django.core.management.base import BaseCommand
+
+from clock.contracts.ledger import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly balances of all or of the given contracts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "contracts", nargs="*", type=int, help="IDs of the contracts."
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_balances(options["contracts"] or None)
+        self.stdout.write("Rebuilt {} monthly balances.".format(count))
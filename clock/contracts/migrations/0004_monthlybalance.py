@@ -0,0 +1,43 @@
+# Generated by Django 2.0.5 on 2026-10-19 18:47
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("contracts", "0003_auto_20180308_2234")]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyBalance",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("worked", models.DurationField(default=datetime.timedelta(0))),
+                ("worked_total", models.DurationField(default=datetime.timedelta(0))),
+                (
+                    "contract",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balances",
+                        to="contracts.Contract",
+                    ),
+                ),
+            ],
+            options={"ordering": ["contract", "month"]},
+        ),
+        migrations.AlterUniqueTogether(
+            name="monthlybalance", unique_together={("contract", "month")}
+        ),
+    ]
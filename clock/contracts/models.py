@@ -2,10 +2,11 @@ from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Sum
 from django.utils.translation import ugettext_lazy as _
 
 from clock.contracts.fields import WorkingHoursField
-from clock.contracts.utils import convert_work_hours
+from clock.contracts.utils import WorkingHours
 from clock.shifts.models import Shift
 
 
@@ -28,34 +29,43 @@ class Contract(models.Model):
         return str(self.department)
 
     def total_hours_per_contract(self):
-        shifts = Shift.objects.filter(contract=self.pk)
-
-        total_work_hours = timedelta(seconds=0)
-        for shift in shifts:
-            total_work_hours += shift.duration
-        return total_work_hours
+        total_work_hours = Shift.objects.filter(contract=self.pk).aggregate(
+            duration=Sum("duration")
+        )["duration"]
+        return total_work_hours or timedelta(seconds=0)
 
     def completed_hours_per_month(self, date=datetime.now):
-        shifts = Shift.objects.filter(
+        monthly_work_hours = Shift.objects.filter(
             contract=self.pk,
             started__year=datetime.now().year,
             started__month=datetime.now().month,
             finished__isnull=False,
-        )
+        ).aggregate(duration=Sum("duration"))["duration"] or timedelta(seconds=0)
+        return WorkingHours.from_timedelta(monthly_work_hours)
 
-        monthly_work_hours = timedelta(seconds=0)
-        for shift in shifts:
-            monthly_work_hours += shift.duration
+    def completed_work_hours_percentage(self, date=datetime.today):
+        return self.completed_hours_per_month(date).percent_of(self.hours)
 
-        hours, minutes = divmod(monthly_work_hours.total_seconds() / 60, 60)
-        return "%02d:%02d" % (hours, minutes)
 
-    def completed_work_hours_percentage(self, date=datetime.today):
-        contract_hours = float(convert_work_hours(self.hours))
-        completed_hours = float(
-            convert_work_hours(self.completed_hours_per_month(date))
-        )
-
-        if completed_hours == 0:
-            return 0
-        return int(completed_hours / contract_hours * 100)
+class MonthlyBalance(models.Model):
+    """
+    The time worked on a contract in a month and in all months up to it.
+
+    The rows are kept up to date by `clock.contracts.ledger` whenever a shift
+    changes, so the balance of a contract at any month is a single lookup.
+    """
+    contract = models.ForeignKey(
+        Contract, on_delete=models.CASCADE, related_name="balances"
+    )
+    # The first day of the month
+    month = models.DateField()
+    worked = models.DurationField(default=timedelta(0))
+    # Time worked from the first month of the contract up to this month
+    worked_total = models.DurationField(default=timedelta(0))
+
+    class Meta:
+        unique_together = ("contract", "month")
+        ordering = ["contract", "month"]
+
+    def __str__(self):
+        return "{} {:%Y-%m}".format(self.contract, self.month)
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+
+from clock.contracts.models import Contract
+from clock.shifts.cache import CONTRACTS_KEY, cache_data, get_data_version
+from clock.shifts.models import Shift
+
+
+class ContractRegistry:
+    """
+    The contracts of a user, loaded with a single query.
+
+    The contracts are cached with the data version of the user, so they are
+    loaded again as soon as one of them changes. Use `get_contract_registry()`
+    to share a registry between everything that needs the contracts of the
+    user during a request.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.version = get_data_version(user_id)
+
+        key = CONTRACTS_KEY.format(user_id, self.version)
+        contracts = cache.get(key)
+        if contracts is None:
+            contracts = list(Contract.objects.filter(employee=user_id).order_by("id"))
+            cache_data(key, contracts)
+        self.contracts = contracts
+        self._by_pk = {contract.pk: contract for contract in contracts}
+        self._default = None
+        self._default_loaded = False
+
+    def __iter__(self):
+        return iter(self.contracts)
+
+    def __len__(self):
+        return len(self.contracts)
+
+    def get(self, pk):
+        """Return the contract with the given pk or None."""
+        return self._by_pk.get(pk)
+
+    @property
+    def default(self):
+        """The contract of the latest shift of the user or None."""
+        if not self._default_loaded:
+            contract_id = (
+                Shift.objects.for_user(self.user_id)
+                .order_by("-started")
+                .values_list("contract_id", flat=True)
+                .first()
+            )
+            self._default = self.get(contract_id)
+            self._default_loaded = True
+        return self._default
+
+    def is_current(self):
+        return self.version == get_data_version(self.user_id)
+
+
+def get_contract_registry(user):
+    """
+    Returns the contract registry of a user. The registry is memoized on the
+    user object, which lives as long as the request.
+    """
+    registry = getattr(user, "_contract_registry", None)
+    if registry is None or not registry.is_current():
+        registry = ContractRegistry(user.pk)
+        user._contract_registry = registry
+    return registry
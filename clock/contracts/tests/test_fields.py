@@ -0,0 +1,49 @@
+import pickle
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from test_plus.test import TestCase
+
+from clock.contracts.models import Contract
+from clock.contracts.utils import WorkingHours
+
+
+class WorkingHoursTest(TestCase):
+
+    def test_parse(self):
+        self.assertEqual(WorkingHours.parse("12:15").minutes, 735)
+        # '30:3' is '30:30' and not '30:03'
+        self.assertEqual(WorkingHours.parse("30:3").minutes, 1830)
+        # Strings without a colon are whole hours, like in the form.
+        self.assertEqual(WorkingHours.parse("50").minutes, 3000)
+        self.assertEqual(WorkingHours.parse(timedelta(hours=1, seconds=59)), 60)
+        with self.assertRaises(ValueError):
+            WorkingHours.parse("ten hours")
+
+    def test_arithmetic(self):
+        hours = WorkingHours(600)
+        self.assertEqual(str(hours), "10:00")
+        self.assertEqual(str(hours - 630), "-00:30")
+        self.assertEqual(hours + WorkingHours(30), 630)
+        self.assertEqual(hours * 0.5, 300)
+        self.assertTrue(WorkingHours(30) < hours)
+        self.assertEqual(WorkingHours(450).percent_of(hours), 75)
+        self.assertEqual(hours.percent_of(0), 0)
+        self.assertEqual(pickle.loads(pickle.dumps(hours)), hours)
+
+    def test_field(self):
+        """Assert that the field converts all values to `WorkingHours`."""
+        user = self.make_user("user1")
+        contract = Contract.objects.create(
+            employee=user, department="Tutor", hours="10:00"
+        )
+        self.assertEqual(contract.hours, 600)
+        self.assertEqual(Contract.objects.get(hours=600), contract)
+        self.assertEqual(Contract.objects.get(hours="10:00").hours, 600)
+
+        deferred = Contract.objects.defer("hours").get()
+        self.assertEqual(str(deferred.hours), "10:00")
+
+        contract.hours = "ten hours"
+        with self.assertRaises(ValidationError):
+            contract.full_clean()
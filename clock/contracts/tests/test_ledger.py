@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from clock.contracts.ledger import (
+    get_balance,
+    get_balances,
+    rebuild_balances,
+    target_minutes,
+)
+from clock.contracts.models import Contract, MonthlyBalance
+from clock.shifts.models import Shift
+
+
+class LedgerTest(TestCase):
+    def setUp(self):
+        self.user = self.make_user("user1")
+        # 10 hours per month
+        self.contract = Contract.objects.create(
+            employee=self.user,
+            department="Tutor",
+            hours=600,
+            start_date=date(2016, 4, 16),
+        )
+        self.other = Contract.objects.create(
+            employee=self.user, department="Library", hours=600
+        )
+        self.started = timezone.make_aware(timezone.datetime(2016, 5, 2, 8))
+
+    def add_shift(self, days, hours, contract=None):
+        started = self.started + timedelta(days=days)
+        return Shift.objects.create(
+            employee=self.user,
+            contract=contract or self.contract,
+            started=started,
+            finished=started + timedelta(hours=hours),
+            duration=timedelta(hours=hours),
+        )
+
+    def ledger(self):
+        # Months that became empty are only removed by a rebuild.
+        return list(
+            MonthlyBalance.objects.filter(contract=self.contract)
+            .exclude(worked=timedelta(0))
+            .values_list("contract_id", "month", "worked", "worked_total")
+        )
+
+    def assertLedger(self, expected):
+        """Assert the ledger and that it matches a rebuild from scratch."""
+        self.assertEqual(
+            self.ledger(),
+            [
+                (self.contract.pk, date(2016, month, 1), timedelta(hours=worked), total)
+                for month, worked, total in expected
+            ],
+        )
+        rebuild_balances()
+        self.assertEqual(
+            self.ledger(),
+            [
+                (self.contract.pk, date(2016, month, 1), timedelta(hours=worked), total)
+                for month, worked, total in expected
+            ],
+        )
+
+    def test_incremental_updates(self):
+        shift = self.add_shift(0, 4)
+        self.add_shift(31, 2)
+        self.assertLedger([(5, 4, timedelta(hours=4)), (6, 2, timedelta(hours=6))])
+
+        # Change the duration
+        shift = Shift.objects.get(pk=shift.pk)
+        shift.duration = timedelta(hours=3)
+        shift.save()
+        self.assertLedger([(5, 3, timedelta(hours=3)), (6, 2, timedelta(hours=5))])
+
+        # Move the shift into the next month, without loading it again.
+        shift.started += timedelta(days=31)
+        shift.save()
+        self.assertLedger([(6, 5, timedelta(hours=5))])
+
+        # Assign it to another contract
+        shift.contract = self.other
+        shift.save()
+        self.assertLedger([(6, 2, timedelta(hours=2))])
+        self.assertEqual(get_balance(self.other, 2016, 6)["worked"], 180)
+        shift.delete()
+        self.assertEqual(get_balance(self.other, 2016, 6)["worked"], 0)
+
+    def test_target_minutes(self):
+        """Assert that only the days of the running contract count."""
+        # Half of April (15 of 30 days) and May
+        self.assertEqual(target_minutes(self.contract, date(2016, 5, 1)), 900)
+        self.assertEqual(target_minutes(self.contract, date(2016, 3, 1)), 0)
+
+        # Until the end of the first half of June (15 of 30 days)
+        self.contract.end_date = date(2016, 6, 15)
+        self.assertEqual(target_minutes(self.contract, date(2017, 1, 1)), 1200)
+
+    def test_balance(self):
+        self.add_shift(0, 12)
+        Shift.objects.create(employee=self.user, started=self.started)
+
+        balance = get_balance(self.contract, 2016, 5)
+        self.assertEqual(balance["worked"], 720)
+        self.assertEqual(balance["target"], 900)
+        self.assertEqual(balance["balance_display"], "-03:00")
+
+        with self.login(username=self.user.username, password="password"):
+            data = self.get_check_200(
+                "contract:balance", pk=self.contract.pk, data={"month": "2016-05"}
+            ).json()
+            self.assertEqual(data["month"], "2016-05")
+            self.assertEqual(data["balance"], -180)
+
+            self.get("contract:balance", pk=self.contract.pk, data={"month": "May"})
+            self.response_400()
+
+        with self.login(username=self.make_user("user2").username, password="password"):
+            self.get("contract:balance", pk=self.contract.pk)
+            self.response_404()
+
+    def test_balances(self):
+        """Assert that the balances of all contracts need a single query."""
+        self.add_shift(0, 12)
+        self.add_shift(31, 1)
+        self.add_shift(1, 2, contract=self.other)
+
+        with self.assertNumQueries(1):
+            balances = get_balances([self.contract, self.other], 2016, 5)
+        self.assertEqual([balance["worked"] for balance in balances], [720, 120])
+        self.assertEqual(balances[0], get_balance(self.contract, 2016, 5))
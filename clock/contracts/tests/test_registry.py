@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from test_plus.test import TestCase
+
+from clock.contracts.models import Contract
+from clock.contracts.registry import get_contract_registry
+from clock.shifts.forms import ClockInForm, ShiftForm
+
+
+class ContractRegistryTestCase(TestCase):
+    """
+    Tests the contract registry and the forms using it.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user1 = self.make_user(username="user1")
+        self.contract1 = Contract.objects.create(
+            employee=self.user1, department="Test contract", hours="40"
+        )
+
+    def test_single_query_per_user(self):
+        """Assert that the forms share the contracts of the user."""
+        with self.assertNumQueries(1):
+            registry = get_contract_registry(self.user1)
+            self.assertEqual(list(registry), [self.contract1])
+
+            clock_in = ClockInForm(user=self.user1)
+            shift = ShiftForm(user=self.user1, view="shift_create")
+            self.assertEqual(len(clock_in.fields["contract"].choices), 2)
+            self.assertEqual(len(list(shift.fields["contract"].choices)), 2)
+
+        # Other requests take the contracts from the cache.
+        user = type(self.user1).objects.get(pk=self.user1.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_contract_registry(user)), 1)
+
+    def test_contract_changes(self):
+        """Assert that the registry is refreshed after a contract changed."""
+        get_contract_registry(self.user1)
+        contract2 = Contract.objects.create(
+            employee=self.user1, department="Second contract", hours="20"
+        )
+        self.assertEqual(
+            list(get_contract_registry(self.user1)), [self.contract1, contract2]
+        )
+
+    def test_form_validation(self):
+        """Assert that only contracts of the user can be chosen."""
+        other_contract = Contract.objects.create(
+            employee=self.make_user(username="user2"), department="Other", hours="10"
+        )
+        field = ClockInForm(user=self.user1).fields["contract"]
+        self.assertEqual(field.clean(str(self.contract1.pk)), self.contract1)
+        self.assertIsNone(field.clean(""))
+        with self.assertRaises(ValidationError):
+            field.clean(str(other_contract.pk))
@@ -14,6 +14,7 @@ class ContractViewTest(TestCase):
         self.assertLoginRequired("contract:new")
         self.assertLoginRequired("contract:edit", pk=1)
         self.assertLoginRequired("contract:delete", pk=1)
+        self.assertLoginRequired("contract:balance", pk=1)
 
     def test_logged_in_contract_views(self):
         """
@@ -6,6 +6,7 @@ from clock.contracts.views import (
     ContractDeleteView,
     ContractListView,
     ContractUpdateView,
+    contract_balance,
 )
 
 app_name = "contract"
@@ -19,4 +20,6 @@ urlpatterns = [
     path("<int:pk>/edit/", ContractUpdateView.as_view(), name="edit"),
     # DeleteView to delete an existing contract
     path("<int:pk>/delete/", ContractDeleteView.as_view(), name="delete"),
+    # JSON overtime balance of a contract
+    path("<int:pk>/balance/", contract_balance, name="balance"),
 ]
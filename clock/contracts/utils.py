@@ -1,10 +1,125 @@
+from datetime import timedelta
+from functools import total_ordering
+
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 
 def convert_work_hours(work_hours):
     try:
-        hours, minutes = list(map(int, work_hours.split(":")))
+        return WorkingHours.parse(work_hours).minutes
     except ValueError:
         raise ValidationError(_("Could not split the value you provided."))
-    return (hours * 60) + minutes
+
+
+def format_minutes(minutes):
+    """Format a (possibly negative) number of minutes as HH:MM."""
+    sign = "-" if minutes < 0 else ""
+    hours, minutes = divmod(abs(minutes), 60)
+    return "%s%02d:%02d" % (sign, hours, minutes)
+
+
+@total_ordering
+class WorkingHours:
+    """An amount of working time in whole minutes.
+
+    `WorkingHoursField` returns its values as `WorkingHours`, so computations
+    work on integers and the values are only formatted as HH:MM for display.
+    """
+
+    __slots__ = ("minutes",)
+
+    def __init__(self, minutes=0):
+        self.minutes = int(minutes)
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Return `WorkingHours` for minutes (int), a `timedelta`, another
+        `WorkingHours` or a string in the format HH:MM. Strings without a
+        colon are whole hours, like `WorkingHoursFieldForm` accepts them.
+
+        :raises ValueError: If the value can not be parsed.
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, timedelta):
+            return cls.from_timedelta(value)
+        if isinstance(value, int):
+            return cls(value)
+        if isinstance(value, str):
+            if ":" not in value:
+                return cls(int(value) * 60)
+            hours, minutes = value.split(":")
+            # '30:3' means '30:30' and not '30:03'.
+            if len(minutes) == 1:
+                minutes += "0"
+            return cls(int(hours) * 60 + int(minutes))
+        raise ValueError("Unable to convert {!r} to working hours.".format(value))
+
+    @classmethod
+    def from_timedelta(cls, value):
+        """Return the whole minutes of the timedelta."""
+        return cls(value.total_seconds() // 60)
+
+    def to_timedelta(self):
+        return timedelta(minutes=self.minutes)
+
+    def percent_of(self, other):
+        """Return how many percent (rounded down) of `other` this is."""
+        other = self.parse(other)
+        if not other.minutes:
+            return 0
+        return int(self.minutes / other.minutes * 100)
+
+    def __str__(self):
+        return format_minutes(self.minutes)
+
+    def __repr__(self):
+        return "<WorkingHours: {}>".format(self)
+
+    def __int__(self):
+        return self.minutes
+
+    def __bool__(self):
+        return bool(self.minutes)
+
+    def __hash__(self):
+        return hash(self.minutes)
+
+    def __eq__(self, other):
+        if isinstance(other, (WorkingHours, int)):
+            return self.minutes == int(other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, (WorkingHours, int)):
+            return self.minutes < int(other)
+        return NotImplemented
+
+    def __add__(self, other):
+        if isinstance(other, (WorkingHours, int)):
+            return WorkingHours(self.minutes + int(other))
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, (WorkingHours, int)):
+            return WorkingHours(self.minutes - int(other))
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, int):
+            return WorkingHours(other - self.minutes)
+        return NotImplemented
+
+    def __neg__(self):
+        return WorkingHours(-self.minutes)
+
+    def __mul__(self, factor):
+        if isinstance(factor, (int, float)):
+            return WorkingHours(round(self.minutes * factor))
+        return NotImplemented
+
+    __rmul__ = __mul__
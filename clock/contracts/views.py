@@ -1,10 +1,16 @@
+from datetime import datetime
+
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
 
 from clock.contracts.forms import ContractForm
+from clock.contracts.ledger import get_balance
 from clock.contracts.models import Contract
 from clock.pages.mixins import UserObjectOwnerMixin
 
@@ -72,3 +78,26 @@ class ContractDeleteView(DeleteView, UserObjectOwnerMixin):
         Return our own contracts and not those of other employees.
         """
         return self.request.user.contract_set.all()
+
+
+@login_required
+def contract_balance(request, pk):
+    """
+    Return the minutes worked on the contract, the target minutes and the
+    balance up to the end of the month given as `?month=YYYY-MM` (default: the
+    current month) as JSON.
+    """
+    contract = get_object_or_404(Contract, pk=pk, employee=request.user)
+    try:
+        month = datetime.strptime(request.GET["month"], "%Y-%m").date()
+    except KeyError:
+        month = timezone.localdate()
+    except ValueError:
+        return JsonResponse(
+            {"errors": {"month": ["Use the format YYYY-MM."]}}, status=400
+        )
+
+    balance = get_balance(contract, month.year, month.month)
+    balance["contract"] = contract.pk
+    balance["month"] = balance["month"].strftime("%Y-%m")
+    return JsonResponse(balance)
@@ -0,0 +1,22 @@
+"""
+PostgreSQL database backend that keeps connections in a pool.
+
+Django opens a connection per thread (or greenlet, with gevent workers) and
+closes it at the end of the request, unless CONN_MAX_AGE is set. Greenlets
+only live for a single request though, so persistent connections would never
+be reused and pile up until the database refuses new ones. This backend hands
+the connections back to a pool shared by all greenlets of the process
+instead.
+
+Usage::
+
+    DATABASES = {
+        "default": {
+            "ENGINE": "clock.contrib.postgresql_pool",
+            ...
+            "POOL": {"SIZE": 10},
+        }
+    }
+
+See `ConnectionPool` for the available pool options.
+"""
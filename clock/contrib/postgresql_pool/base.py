@@ -0,0 +1,43 @@
+import threading
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+from clock.contrib.postgresql_pool.pool import ConnectionPool
+
+# One pool per database alias, shared by all threads of the process.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, connect):
+        with _pools_lock:
+            if self.alias not in _pools:
+                options = {
+                    key.lower(): value
+                    for key, value in self.settings_dict.get("POOL", {}).items()
+                }
+                _pools[self.alias] = ConnectionPool(connect, **options)
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connect = partial(super().get_new_connection, conn_params)
+        pool = self.get_pool(connect)
+        # The connection parameters may change, e.g. the name of the test
+        # database, so the pool always uses the ones of the latest caller.
+        pool.connect = connect
+
+        connection = pool.acquire()
+        # Restore what `super().get_new_connection()` sets up for new
+        # connections.
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                _pools[self.alias].release(self.connection)
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError, extensions
+
+
+class ConnectionPool:
+    """
+    A pool of at most `size` database connections.
+
+    The locks of the `threading` module are patched by gevent, so waiting for a
+    free connection only blocks the current greenlet.
+
+    :param connect: Callable returning a new connection
+    :param size: Maximum number of connections opened at the same time
+    :param timeout: Seconds to wait for a free connection before giving up
+    :param max_age: Seconds after which a connection is closed and replaced by
+        a new one, or None to keep connections forever
+    :param check_after: Seconds a connection may be idle before we check that
+        it still works when handing it out again
+    """
+
+    def __init__(self, connect, size=10, timeout=10, max_age=None, check_after=30):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.check_after = check_after
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # Idle connections with the time they were opened and returned.
+        self._idle = deque()
+        self._opened = {}
+
+    def acquire(self):
+        """Return an idle connection or open a new one."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                "No database connection available within {} seconds "
+                "(pool size {}).".format(self.timeout, self.size)
+            )
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned = self._idle.pop()
+
+                if self._is_usable(connection, returned):
+                    return connection
+                self._discard(connection)
+
+            connection = self.connect()
+            self._opened[id(connection)] = time.monotonic()
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """Hand a connection back to the pool."""
+        try:
+            status = connection.get_transaction_status()
+            if status in (
+                extensions.TRANSACTION_STATUS_INTRANS,
+                extensions.TRANSACTION_STATUS_INERROR,
+            ):
+                connection.rollback()
+                status = connection.get_transaction_status()
+
+            if status != extensions.TRANSACTION_STATUS_IDLE or self._is_expired(
+                connection
+            ):
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        except Exception:
+            self._discard(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, returned in idle:
+            self._discard(connection)
+
+    def _is_expired(self, connection):
+        opened = self._opened.get(id(connection), 0)
+        return self.max_age is not None and time.monotonic() - opened > self.max_age
+
+    def _is_usable(self, connection, returned):
+        if connection.closed or self._is_expired(connection):
+            return False
+        if time.monotonic() - returned < self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            # Do not leave the check behind as an open transaction.
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, connection):
+        self._opened.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from psycopg2 import OperationalError, extensions
+
+from clock.contrib.postgresql_pool.base import DatabaseWrapper, _pools
+from clock.contrib.postgresql_pool.pool import ConnectionPool
+
+
+class FakeConnection:
+    closed = False
+
+    def get_transaction_status(self):
+        if self.closed:
+            return extensions.TRANSACTION_STATUS_UNKNOWN
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_limits_concurrent_connections():
+    """Simulate many greenlets running short requests at the same time."""
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(FakeConnection()) or opened[-1], size=3)
+    in_use = []
+    max_in_use = []
+    lock = threading.Lock()
+
+    def request():
+        connection = pool.acquire()
+        with lock:
+            in_use.append(connection)
+            max_in_use.append(len(in_use))
+        time.sleep(0.01)
+        with lock:
+            in_use.remove(connection)
+        pool.release(connection)
+
+    threads = [threading.Thread(target=request) for i in range(30)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(max_in_use) <= 3
+    # The connections were reused instead of opening one per request.
+    assert len(opened) <= 3
+
+
+def test_pool_timeout():
+    pool = ConnectionPool(FakeConnection, size=1, timeout=0.01)
+    pool.acquire()
+    with pytest.raises(OperationalError):
+        pool.acquire()
+
+
+def test_pool_replaces_closed_and_expired_connections():
+    pool = ConnectionPool(FakeConnection, size=1, max_age=60)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+
+    first.closed = True
+    pool.release(first)
+    second = pool.acquire()
+    assert second is not first
+
+    pool._opened[id(second)] -= 120
+    pool.release(second)
+    assert second.closed
+    assert pool.acquire() is not second
+
+
+@pytest.mark.django_db
+def test_backend_reuses_connections():
+    wrapper = DatabaseWrapper(connection.settings_dict, alias="pool_test")
+    try:
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        wrapper.close()
+        assert not first.closed
+
+        wrapper.ensure_connection()
+        assert wrapper.connection is first
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            assert cursor.fetchone() == (1,)
+    finally:
+        wrapper.close()
+        _pools.pop("pool_test").close()
@@ -0,0 +1,17 @@
+"""
+Send the reads of reporting views to a read replica of the database.
+
+Views decorated with `use_replica` read from the database alias configured
+in the REPLICA_DATABASE setting. Everything else, all writes and the reads
+that follow a write stay on the primary database. After a request that may
+have written something (any POST, PUT, PATCH or DELETE) the browser reads
+from the primary for REPLICA_STICKY_SECONDS, so the redirect after saving a
+shift does not show stale data of a lagging replica.
+
+Usage::
+
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+    REPLICA_DATABASE = "replica"
+    DATABASE_ROUTERS = ["clock.contrib.replica.routers.ReplicaRouter"]
+    MIDDLEWARE += ("clock.contrib.replica.middleware.StickyPrimaryMiddleware",)
+"""
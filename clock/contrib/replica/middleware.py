@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+STICKY_COOKIE = "clock_primary"
+
+
+class StickyPrimaryMiddleware(MiddlewareMixin):
+    """Read from the primary database for a while after the client sent a
+    request that may have changed data.
+    """
+
+    def process_request(self, request):
+        request.use_primary = STICKY_COOKIE in request.COOKIES
+
+    def process_response(self, request, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE"):
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+            )
+        return response
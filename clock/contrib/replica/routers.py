@@ -0,0 +1,85 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+@contextmanager
+def replica_reads():
+    """Read from the replica until the block ends or something is written."""
+    previous = getattr(_state, "use_replica", False)
+    _state.use_replica = True
+    try:
+        yield
+    finally:
+        _state.use_replica = previous
+
+
+def reads_from_replica():
+    """Return True if the reads of the current thread go to the replica."""
+    return bool(getattr(settings, "REPLICA_DATABASE", None)) and getattr(
+        _state, "use_replica", False
+    )
+
+
+def replica_iterator(iterable):
+    """Read from the replica while producing each item of the iterable.
+
+    The state is only set while the next item is produced, so the code that
+    consumes the items (e.g. the server sending a streaming response) is not
+    affected.
+    """
+    iterator = iter(iterable)
+    while True:
+        with replica_reads():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def use_replica(view):
+    """Let a view read from the replica, unless the client wrote something
+    shortly before (see `StickyPrimaryMiddleware`).
+
+    The content of streaming responses is produced after the view returned,
+    so it is wrapped with `replica_iterator()`.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if getattr(request, "use_primary", False):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            response = view(request, *args, **kwargs)
+        if getattr(response, "streaming", False):
+            response.streaming_content = replica_iterator(response.streaming_content)
+        return response
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """Route the reads of `use_replica` views to the REPLICA_DATABASE."""
+
+    def db_for_read(self, model, **hints):
+        if reads_from_replica():
+            return settings.REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        # The replica may not have the changes yet, so reading after writing
+        # has to use the primary.
+        _state.use_replica = False
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica contains the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != getattr(settings, "REPLICA_DATABASE", None)
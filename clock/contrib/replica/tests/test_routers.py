@@ -0,0 +1,90 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+
+from clock.contrib.replica.middleware import STICKY_COOKIE, StickyPrimaryMiddleware
+from clock.contrib.replica.routers import ReplicaRouter, replica_reads, use_replica
+from clock.shifts.models import Shift
+
+router = ReplicaRouter()
+
+
+@override_settings(REPLICA_DATABASE="replica")
+def test_reads_go_to_replica_only_inside_block():
+    assert router.db_for_read(Shift) is None
+    with replica_reads():
+        assert router.db_for_read(Shift) == "replica"
+    assert router.db_for_read(Shift) is None
+
+
+@override_settings(REPLICA_DATABASE=None)
+def test_without_replica():
+    with replica_reads():
+        assert router.db_for_read(Shift) is None
+
+
+@override_settings(REPLICA_DATABASE="replica")
+def test_reads_after_write_use_primary():
+    with replica_reads():
+        assert router.db_for_write(Shift) is None
+        assert router.db_for_read(Shift) is None
+
+
+@override_settings(REPLICA_DATABASE="replica")
+def test_allow_migrate():
+    assert router.allow_migrate("default", "shifts")
+    assert not router.allow_migrate("replica", "shifts")
+
+
+@override_settings(REPLICA_DATABASE="replica", REPLICA_STICKY_SECONDS=10)
+def test_sticky_primary_after_write():
+    """Assert that views read from the primary after the client wrote data."""
+    middleware = StickyPrimaryMiddleware(lambda request: HttpResponse())
+    used = []
+
+    @use_replica
+    def view(request):
+        used.append(router.db_for_read(Shift))
+        return HttpResponse()
+
+    factory = RequestFactory()
+
+    request = factory.get("/")
+    middleware.process_request(request)
+    response = middleware.process_response(request, view(request))
+    assert STICKY_COOKIE not in response.cookies
+
+    request = factory.post("/")
+    middleware.process_request(request)
+    response = middleware.process_response(request, HttpResponse())
+    assert response.cookies[STICKY_COOKIE]["max-age"] == 10
+
+    request = factory.get("/")
+    request.COOKIES[STICKY_COOKIE] = "1"
+    middleware.process_request(request)
+    view(request)
+
+    assert used == ["replica", None]
+
+
+@override_settings(REPLICA_DATABASE="replica")
+def test_streaming_responses_read_from_replica():
+    """Assert that the content of streaming responses, produced after the view
+    returned, is read from the replica as well.
+    """
+
+    def lines():
+        yield router.db_for_read(Shift)
+
+    @use_replica
+    def view(request):
+        return StreamingHttpResponse(lines())
+
+    request = RequestFactory().get("/")
+    response = view(request)
+
+    assert router.db_for_read(Shift) is None
+    assert list(response) == [b"replica"]
+    assert router.db_for_read(Shift) is None
+
+    request.use_primary = True
+    assert list(view(request)) == [b"None"]
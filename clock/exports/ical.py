@@ -0,0 +1,231 @@
+"""iCalendar feed of the shifts of a user.
+
+Calendar clients poll the feed every few minutes, so the events are rendered
+per month and cached until the shifts of the month change. A refresh only
+queries and renders the months that changed, using a single query with one
+range over the `(employee, started)` index per run of consecutive months.
+"""
+import secrets
+from datetime import date
+from itertools import groupby
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone, translation
+from django.utils.translation import ugettext as _
+
+from clock.pages.utils import month_bounds
+from clock.profiles.models import UserProfile
+from clock.shifts.cache import CALENDAR_MONTH_KEY, cache_data, get_change_stamp
+from clock.shifts.models import Shift
+from clock.shifts.statistics import month_range
+
+# Past months in the feed. Planned (e.g. recurring) shifts are shown up to
+# `FEED_MONTHS_AHEAD` months ahead.
+FEED_MONTHS_BEFORE = 12
+FEED_MONTHS_AHEAD = 12
+
+
+def get_feed_token(user):
+    """Return the token that grants access to the feed of the user, creating
+    one if the user has none yet.
+    """
+    profile, _created = UserProfile.objects.get_or_create(user=user)
+    if not profile.calendar_token:
+        return reset_feed_token(user)
+    return profile.calendar_token
+
+
+def reset_feed_token(user):
+    """Replace the token of the user with a new random one, so the previous
+    address of the feed stops working.
+    """
+    token = secrets.token_urlsafe(32)
+    UserProfile.objects.update_or_create(user=user, defaults={"calendar_token": token})
+    return token
+
+
+def get_feed_user(token):
+    """Return the user of the feed token or None if the token is invalid."""
+    if not token:
+        return None
+    profile = (
+        UserProfile.objects.filter(calendar_token=token, user__is_active=True)
+        .select_related("user")
+        .first()
+    )
+    return profile.user if profile is not None else None
+
+
+def feed_months(today=None):
+    """Return (year, month) of all months in the feed."""
+    today = today or timezone.localdate()
+    current = today.year * 12 + today.month - 1
+    return [
+        (index // 12, index % 12 + 1)
+        for index in range(
+            current - FEED_MONTHS_BEFORE, current + FEED_MONTHS_AHEAD + 1
+        )
+    ]
+
+
+def feed_last_modified(user_id, months, today=None):
+    """Return the last time any of the shifts in the months changed.
+
+    The months of the feed move at the beginning of every month, so the feed
+    was modified at least then.
+    """
+    today = today or timezone.localdate()
+    moved, _next = month_bounds(today.year, today.month)
+    return max(
+        [moved] + [get_change_stamp(user_id, year, month) for year, month in months]
+    )
+
+
+def escape_text(value):
+    """Escape a TEXT value (RFC 5545, section 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Fold a content line into lines of at most 75 octets."""
+    lines = []
+    current, size = "", 0
+    for char in line:
+        length = len(char.encode("utf-8"))
+        if size + length > 75:
+            lines.append(current)
+            # The continuation lines start with a space.
+            current, size = " ", 1
+        current += char
+        size += length
+    lines.append(current)
+    return "\r\n".join(lines) + "\r\n"
+
+
+def format_datetime(value):
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_event(pk, started, finished, department, key, note, created_at):
+    """Return the VEVENT of a shift."""
+    summary = department or _("Shift")
+    if key:
+        summary = "{} ({})".format(summary, dict(Shift.KEY_CHOICES).get(key, key))
+    lines = [
+        "BEGIN:VEVENT",
+        "UID:shift-{}@clock".format(pk),
+        "DTSTAMP:{}".format(format_datetime(created_at)),
+        "DTSTART:{}".format(format_datetime(started)),
+        "DTEND:{}".format(format_datetime(finished)),
+        "SUMMARY:{}".format(escape_text(summary)),
+    ]
+    if note:
+        lines.append("DESCRIPTION:{}".format(escape_text(note)))
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def _month_of(row):
+    started = timezone.localtime(row[1])
+    return started.year, started.month
+
+
+def month_runs(months):
+    """Yield the first and last (year, month) of the runs of consecutive
+    months in the ordered list.
+    """
+    first = last = None
+    for year, month in months:
+        if last is not None and year * 12 + month == last[0] * 12 + last[1] + 1:
+            last = (year, month)
+            continue
+        if first is not None:
+            yield first, last
+        first = last = (year, month)
+    if first is not None:
+        yield first, last
+
+
+def render_months(user_id, months):
+    """
+    Yield the VEVENTs of the finished shifts of the user in the given months,
+    as one block per month.
+
+    Blocks are cached until the shifts of their month change. The shifts of
+    all other months are loaded with one streaming query.
+    """
+    language = translation.get_language()
+    keys = [
+        CALENDAR_MONTH_KEY.format(
+            user_id,
+            year,
+            month,
+            language,
+            get_change_stamp(user_id, year, month).timestamp(),
+        )
+        for year, month in months
+    ]
+    cached = cache.get_many(keys)
+    missing = [month for month, key in zip(months, keys) if key not in cached]
+
+    groups = iter(())
+    if missing:
+        ranges = Q()
+        for first, last in month_runs(missing):
+            start, end = month_range(date(*first, 1), date(*last, 1))
+            ranges |= Q(started__gte=start, started__lt=end)
+        rows = (
+            Shift.objects.for_user(user_id)
+            .finished()
+            .filter(ranges)
+            .order_by("started")
+            .values_list(
+                "pk",
+                "started",
+                "finished",
+                "contract__department",
+                "key",
+                "note",
+                "created_at",
+            )
+            .iterator()
+        )
+        groups = groupby(rows, key=_month_of)
+
+    pending = next(groups, None)
+    for month, key in zip(months, keys):
+        if key in cached:
+            yield cached[key]
+            continue
+
+        # Skip the shifts of months that are cached.
+        while pending is not None and pending[0] < month:
+            pending = next(groups, None)
+        block = ""
+        if pending is not None and pending[0] == month:
+            block = "".join(render_event(*row) for row in pending[1])
+            pending = next(groups, None)
+        cache_data(key, block)
+        yield block
+
+
+def render_feed(user, months):
+    """Yield the iCalendar feed of the user piece by piece."""
+    yield (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//clock//Shifts//EN\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+    )
+    yield fold("X-WR-CALNAME:{}".format(escape_text(_("Shifts of %s") % user)))
+    yield "REFRESH-INTERVAL;VALUE=DURATION:PT15M\r\n"
+    yield from render_months(user.pk, months)
+    yield "END:VCALENDAR\r\n"
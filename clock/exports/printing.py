@@ -3,7 +3,6 @@ import os
 from datetime import timedelta
 
 from django.conf import settings
-from django.utils import timezone
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib.pagesizes import A4, letter
@@ -22,6 +21,7 @@ from reportlab.platypus import (
     TableStyle,
 )
 
+from clock.pages.localization import format_column, localize_column
 from clock.pages.templatetags.format_duration import format_dttd
 
 # Register custom fonts. Path is hardcoded so we're using the internal fonts
@@ -294,21 +294,25 @@ class ShiftExport:
 
         shifts = self.context["shift_list"]
 
+        # Convert the start and end times of all shifts to the current timezone
+        # at once.
+        started = localize_column(shift.started for shift in shifts)
+        finished = format_column((shift.finished for shift in shifts), "%H:%M")
+        pause_ranges = self.context["pause_ranges"]
+        pauses = {
+            shift_id: ", ".join(
+                "{} - {}".format(*format_column(pause, "%H:%M")) for pause in ranges
+            )
+            for shift_id, ranges in pause_ranges.items()
+        }
+
         # Go through all shifts and format them accordingly
         i = 0
         for i, shift in enumerate(shifts):
-            # Not sure why, but timezone.localtime() is not working here.
-            # Instead timezone.template_localtime() is, so we're using it
-            b1_date = timezone.template_localtime(shift.started).strftime(
-                "%d.%m.%Y"
-            )  # e.g. 24.12.2016
-            b2_start = timezone.template_localtime(shift.started).strftime(
-                "%H:%M"
-            )  # e.g. 08:15
-            b3_pause = shift.pause_start_end  # e.g. 08:15 - 15:55
-            b4_end = timezone.template_localtime(shift.finished).strftime(
-                "%H:%M"
-            )  # e.g. 15:55
+            b1_date = started[i].strftime("%d.%m.%Y")  # e.g. 24.12.2016
+            b2_start = started[i].strftime("%H:%M")  # e.g. 08:15
+            b3_pause = pauses.get(shift.pk, "")  # e.g. 12:00 - 12:30
+            b4_end = finished[i]  # e.g. 15:55
             b5_total = format_dttd(shift.duration, "%H:%M")  # e.g. 07:40
             b6_cmnt = shift.key  # e.g. "K" or "U"
 
@@ -0,0 +1,173 @@
+"""Tests for the iCalendar feed of the shifts."""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from freezegun import freeze_time
+from test_plus.test import TestCase
+
+from clock.exports.ical import (
+    escape_text,
+    feed_months,
+    fold,
+    get_feed_token,
+    month_runs,
+)
+from clock.shifts.cache import MONTH_STAMP_KEY
+from clock.shifts.models import Shift
+
+
+@freeze_time("2016-05-15 12:00")
+class CalendarFeedTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.make_user("user1")
+        self.token = get_feed_token(self.user)
+        for month, day, key, note in [
+            (4, 4, "", "Inventory, part 1"),
+            (5, 2, "S", ""),
+            # A planned shift
+            (6, 6, "", ""),
+        ]:
+            started = timezone.make_aware(timezone.datetime(2016, month, day, 8))
+            Shift.objects.create(
+                employee=self.user,
+                started=started,
+                finished=started + timezone.timedelta(hours=4),
+                duration=timezone.timedelta(hours=4),
+                key=key,
+                note=note,
+            )
+        # Shifts of other users and running shifts are not included.
+        Shift.objects.create(
+            employee=self.make_user("user2"), started=timezone.now(), finished=None
+        )
+        Shift.objects.create(employee=self.user, started=timezone.now())
+
+    def get_feed(self, token=None, **extra):
+        response = self.get("export:calendar", token=token or self.token, extra=extra)
+        if response.status_code == 200:
+            response.text = b"".join(response.streaming_content).decode()
+        return response
+
+    def test_feed(self):
+        response = self.get_feed()
+        self.response_200(response)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertTrue(response.text.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(response.text.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(response.text.count("BEGIN:VEVENT"), 3)
+        self.assertIn("DTSTART:20160404T060000Z\r\n", response.text)
+        self.assertIn("DESCRIPTION:Inventory\\, part 1\r\n", response.text)
+        self.assertIn("SUMMARY:Shift (Sick)\r\n", response.text)
+        self.assertIn("DTSTART:20160606T060000Z\r\n", response.text)
+
+    def test_invalid_token(self):
+        self.response_404(self.get_feed(token="invalid"))
+        self.user.is_active = False
+        self.user.save()
+        self.response_404(self.get_feed())
+
+    def test_not_modified(self):
+        last_modified = self.get_feed()["Last-Modified"]
+        response = self.get_feed(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        with freeze_time("2016-05-15 12:05"):
+            Shift.objects.filter(started__month=6).delete()
+            response = self.get_feed(HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.response_200(response)
+            self.assertEqual(response.text.count("BEGIN:VEVENT"), 2)
+            self.assertEqual(response["Last-Modified"], http_date())
+
+    def test_modified_when_the_months_move(self):
+        """Assert that the feed is modified at the beginning of a month, when
+        its months move by one."""
+        last_modified = self.get_feed()["Last-Modified"]
+
+        with freeze_time("2016-06-02 12:00"):
+            # The month that is added to the feed changed a long time ago.
+            cache.set(
+                MONTH_STAMP_KEY.format(self.user.pk, 2017, 6),
+                timezone.now() - timezone.timedelta(days=365),
+                None,
+            )
+            response = self.get_feed(HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.response_200(response)
+
+    def shift_queries(self):
+        """Return the queries of the shifts run by a request of the feed."""
+        with CaptureQueriesContext(connection) as context:
+            self.get_feed()
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if 'FROM "shifts_shift"' in query["sql"]
+        ]
+
+    def test_incremental(self):
+        """Assert that only the months that changed are queried again."""
+        self.get_feed()
+        self.assertEqual(self.shift_queries(), [])
+
+        with freeze_time("2016-05-15 12:05"):
+            shift = Shift.objects.get(started__month=4)
+            shift.note = "Inventory, part 2"
+            shift.save()
+            Shift.objects.get(started__month=6).save()
+            [query] = self.shift_queries()
+        # Only April and June are queried and rendered again.
+        self.assertIn("'2016-04-01", query)
+        self.assertIn("'2016-05-01", query)
+        self.assertIn("'2016-06-01", query)
+        self.assertIn("'2016-07-01", query)
+        response = self.get_feed()
+        self.assertIn("part 2", response.text)
+        self.assertEqual(response.text.count("BEGIN:VEVENT"), 3)
+
+    def test_profile(self):
+        with self.login(username=self.user.username, password="password"):
+            self.get_check_200("profiles:account_view")
+            self.assertResponseContains(self.token, html=False)
+
+    def test_reset_token(self):
+        self.assertEqual(get_feed_token(self.user), self.token)
+        # Anonymous users are sent to the login page.
+        self.response_302(self.post("profiles:reset_calendar"))
+        self.assertEqual(get_feed_token(self.user), self.token)
+
+        with self.login(username=self.user.username, password="password"):
+            self.response_405(self.get("profiles:reset_calendar"))
+            response = self.post("profiles:reset_calendar")
+            self.response_302(response)
+
+        token = get_feed_token(self.user)
+        self.assertNotEqual(token, self.token)
+        self.response_404(self.get_feed())
+        self.response_200(self.get_feed(token=token))
+
+
+class CalendarFormatTest(TestCase):
+
+    def test_feed_months(self):
+        months = feed_months(timezone.datetime(2016, 5, 15).date())
+        self.assertEqual(len(months), 25)
+        self.assertEqual(months[0], (2015, 5))
+        self.assertEqual(months[12], (2016, 5))
+        self.assertEqual(months[-1], (2017, 5))
+
+    def test_month_runs(self):
+        self.assertEqual(
+            list(month_runs([(2016, 11), (2016, 12), (2017, 1), (2017, 3)])),
+            [((2016, 11), (2017, 1)), ((2017, 3), (2017, 3))],
+        )
+        self.assertEqual(list(month_runs([])), [])
+
+    def test_escape_and_fold(self):
+        self.assertEqual(escape_text("a;b,c\\d\ne"), "a\\;b\\,c\\\\d\\ne")
+        line = fold("DESCRIPTION:" + "ä" * 40)
+        self.assertEqual(
+            [len(part.encode("utf-8")) for part in line.split("\r\n")], [74, 19, 0]
+        )
@@ -1,6 +1,9 @@
+from django.utils import timezone
 from test_plus.test import TestCase
 
 from clock.contracts.models import Contract
+from clock.shifts.models import Pause, Shift
+from clock.shifts.utils import export_etag
 
 
 class ExportViewTest(TestCase):
@@ -23,3 +26,97 @@ class ExportViewTest(TestCase):
 
         with self.login(username=user1.username, password="password"):
             self.get_check_200("export:contract", year=2016, month=1, pk=contract.pk)
+
+    def test_json_export(self):
+        """Test that the JSON export contains the shifts of the user."""
+        user1 = self.make_user("user1")
+        contract = Contract.objects.create(
+            employee=user1, department="Test contract", hours="40"
+        )
+        started = timezone.make_aware(timezone.datetime(2016, 1, 4, 8))
+        shift = Shift.objects.create(
+            employee=user1,
+            contract=contract,
+            started=started,
+            finished=started + timezone.timedelta(hours=4),
+            duration=timezone.timedelta(hours=4),
+        )
+        Pause.objects.create(
+            shift=shift,
+            started=started + timezone.timedelta(hours=2),
+            finished=started + timezone.timedelta(hours=2, minutes=30),
+        )
+        shift.update_duration()
+
+        with self.login(username=user1.username, password="password"):
+            response = self.get_check_200(
+                "export:api_contract", year=2016, month=1, pk=contract.pk
+            )
+
+        data = response.json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["employee"], "user1")
+        self.assertEqual(data[0]["contract"], "Test contract")
+        self.assertEqual(data[0]["duration"], "03:30")
+        self.assertEqual(data[0]["pause_duration"], "00:30")
+        self.assertEqual(
+            data[0]["pauses"], [["2016-01-04 09:00:00Z", "2016-01-04 09:30:00Z"]]
+        )
+
+        with self.login(username=user1.username, password="password"):
+            response = self.get_check_200(
+                "export:contract", year=2016, month=1, pk=contract.pk
+            )
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+    def test_conditional_json_export(self):
+        """Test that only changes in the exported month invalidate the export."""
+        user1 = self.make_user("user1")
+        started = timezone.make_aware(timezone.datetime(2016, 1, 4, 8))
+
+        def add_shift(started):
+            return Shift.objects.create(
+                employee=user1,
+                started=started,
+                finished=started + timezone.timedelta(hours=4),
+                duration=timezone.timedelta(hours=4),
+            )
+
+        shift = add_shift(started)
+
+        with self.login(username=user1.username, password="password"):
+            response = self.get_check_200("export:api_all", year=2016, month=1)
+            etag = response["ETag"]
+            self.assertTrue(response.has_header("Last-Modified"))
+
+            # The export is localized.
+            response = self.get(
+                "export:api_all",
+                year=2016,
+                month=1,
+                extra={"HTTP_IF_NONE_MATCH": etag, "HTTP_ACCEPT_LANGUAGE": "en"},
+            )
+            self.response_200()
+            with timezone.override("America/New_York"):
+                self.assertNotEqual(
+                    export_etag(response.wsgi_request, 2016, 1), etag.strip('"')
+                )
+
+            # A shift in another month does not change the export.
+            add_shift(started + timezone.timedelta(days=31))
+            response = self.get(
+                "export:api_all", year=2016, month=1, extra={"HTTP_IF_NONE_MATCH": etag}
+            )
+            self.assertEqual(response.status_code, 304)
+
+            # Moving a shift out of the month does.
+            shift = Shift.objects.get(pk=shift.pk)
+            shift.started += timezone.timedelta(days=62)
+            shift.save()
+            response = self.get(
+                "export:api_all", year=2016, month=1, extra={"HTTP_IF_NONE_MATCH": etag}
+            )
+            self.response_200()
+            self.assertEqual(
+                response.json(), ["No shifts available for this given query."]
+            )
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 from django.urls import path
 
-from clock.exports.views import ExportContractMonthAPI, ExportMonth, ExportMonthAPI
+from clock.exports.views import (
+    CalendarFeed,
+    ExportContractMonthAPI,
+    ExportMonth,
+    ExportMonthAPI,
+)
 
 app_name = "export"
 urlpatterns = [
@@ -22,4 +27,6 @@ urlpatterns = [
         ExportContractMonthAPI.as_view(month_format="%m"),
         name="api_contract",
     ),
+    # iCalendar feed of all shifts, protected by a token instead of a login
+    path("calendar/<str:token>/shifts.ics", CalendarFeed.as_view(), name="calendar"),
 ]
@@ -3,16 +3,37 @@ from datetime import timedelta
 
 from braces.views import JSONResponseMixin
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, StreamingHttpResponse
 from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.generic import View
 from django.views.generic.dates import MonthArchiveView
 
 from clock.contracts.models import Contract
+from clock.contrib.replica.routers import use_replica
+from clock.exports.ical import (
+    feed_last_modified,
+    feed_months,
+    get_feed_user,
+    render_feed,
+)
 from clock.exports.mixins import PdfResponseMixin
 from clock.exports.serializers import ShiftJSONEncoder
-from clock.shifts.models import Shift
+from clock.shifts.models import Pause, Shift
+from clock.shifts.utils import export_etag, export_last_modified
+
+# Exports only change if the shifts of the month or the contracts of the user
+# change. Clients have to revalidate them, but can reuse unchanged responses.
+conditional_export = [
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=export_etag, last_modified_func=export_last_modified),
+]
 
 
 @method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+@method_decorator(conditional_export, name="get")
 class ExportMonth(PdfResponseMixin, MonthArchiveView):
     model = Shift
     date_field = "started"
@@ -26,28 +47,39 @@ class ExportMonth(PdfResponseMixin, MonthArchiveView):
             self.request.user.first_name, self.request.user.last_name
         )
 
-        if not context["shift_list"]:
+        # We only need to read a few columns of each shift.
+        shifts = context["shift_list"].rows()
+        context["shift_list"] = context["object_list"] = shifts
+
+        if not shifts:
             context["department"] = Contract.objects.get(
                 pk=int(self.kwargs["pk"])
             ).department
-            context["total_shift_duration"] = timedelta(seconds=0)
         else:
-            context["department"] = context["shift_list"][0].contract_or_none
+            context["department"] = shifts[0].contract_or_none
 
-        total_shift_duration = timedelta(seconds=0)
-        for shift in context["shift_list"]:
-            total_shift_duration += shift.duration
-            context["total_shift_duration"] = total_shift_duration
+        # The pauses of all shifts are loaded with one query.
+        context["pause_ranges"] = Pause.objects.filter(
+            shift__in=[shift.pk for shift in shifts]
+        ).ranges()
+
+        context["total_shift_duration"] = sum(
+            (shift.duration for shift in shifts), timedelta(seconds=0)
+        )
         return context
 
     def get_queryset(self):
         contract_pk = self.kwargs["pk"]
-        return Shift.objects.filter(
-            employee=self.request.user.pk, contract=contract_pk, finished__isnull=False
+        return (
+            Shift.objects.for_user(self.request.user)
+            .finished()
+            .filter(contract=contract_pk)
         )
 
 
 @method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+@method_decorator(conditional_export, name="get")
 class ExportMonthClass(JSONResponseMixin, MonthArchiveView):
     model = Shift
     date_field = "started"
@@ -55,21 +87,31 @@ class ExportMonthClass(JSONResponseMixin, MonthArchiveView):
     json_encoder_class = ShiftJSONEncoder
 
     def get_queryset(self):
-        return Shift.objects.filter(employee=self.request.user.pk)
+        return Shift.objects.for_user(self.request.user)
 
     def get(self, request, *args, **kwargs):
-        self.object = self.get_queryset()
+        # We are not using `get_dated_items()` of the MonthArchiveView, so we
+        # need to restrict the shifts to the requested month ourselves.
+        self.object = (
+            self.get_queryset().in_month(self.get_year(), self.get_month()).rows()
+        )
 
         if not self.object:
             context_dict = ["No shifts available for this given query."]
         else:
+            pause_ranges = Pause.objects.filter(
+                shift__in=[shift.pk for shift in self.object]
+            ).ranges()
+            # All shifts belong to the current user, so there is no need to
+            # look up the employee of every single shift.
             context_dict = [
                 {
-                    "employee": shift.employee.username,
+                    "employee": request.user.username,
                     "contract": shift.contract_or_none,
                     "started": shift.started,
                     "finished": shift.finished,
                     "pause_duration": shift.pause_duration,
+                    "pauses": pause_ranges.get(shift.pk, []),
                     "duration": shift.duration,
                 }
                 for shift in self.object
@@ -82,8 +124,40 @@ class ExportContractMonthAPI(ExportMonthClass):
 
     def get_queryset(self):
         contract_pk = self.kwargs["pk"]
-        return Shift.objects.filter(employee=self.request.user.pk, contract=contract_pk)
+        return Shift.objects.for_user(self.request.user).filter(contract=contract_pk)
 
 
 class ExportMonthAPI(ExportMonthClass):
     pass
+
+
+def calendar_last_modified(request, token):
+    user = get_feed_user(token)
+    if user is None:
+        return None
+    return feed_last_modified(user.pk, feed_months())
+
+
+@method_decorator(use_replica, name="dispatch")
+@method_decorator(
+    [
+        cache_control(private=True, no_cache=True),
+        condition(last_modified_func=calendar_last_modified),
+    ],
+    name="get",
+)
+class CalendarFeed(View):
+    """Stream the shifts of the user of the token as iCalendar feed, e.g. to
+    subscribe to them with a calendar app.
+    """
+
+    def get(self, request, token):
+        user = get_feed_user(token)
+        if user is None:
+            raise Http404
+        response = StreamingHttpResponse(
+            render_feed(user, feed_months()),
+            content_type="text/calendar; charset=utf-8",
+        )
+        response["Content-Disposition"] = 'inline; filename="shifts.ics"'
+        return response
@@ -0,0 +1,80 @@
+"""Convert whole columns of datetimes to the current timezone.
+
+Converting every single datetime with `astimezone()` makes pytz search the
+transitions of the timezone again and again. Shifts of a month share the
+same few UTC offsets, so we look up the transitions of a timezone once per
+year and only have to pick the right offset for every value.
+"""
+from bisect import bisect_right
+from datetime import datetime
+
+from django.utils import formats, timezone
+
+# Maps (zone, year) to the UTC start times of all periods that overlap with
+# the year and the UTC offsets and tzinfos used during those periods.
+_transitions = {}
+
+
+def _get_transitions(tz, year):
+    key = (tz.zone, year)
+    try:
+        return _transitions[key]
+    except KeyError:
+        pass
+
+    times = tz._utc_transition_times
+    first = max(bisect_right(times, datetime(year, 1, 1)) - 1, 0)
+    last = bisect_right(times, datetime(year + 1, 1, 1))
+
+    starts = times[first:last]
+    periods = []
+    for start in starts:
+        local = tz.fromutc(max(start, datetime(year, 1, 1)).replace(tzinfo=tz))
+        periods.append((local.utcoffset(), local.tzinfo))
+
+    _transitions[key] = starts, periods
+    return starts, periods
+
+
+def localize_column(values, tz=None):
+    """Convert aware datetimes to the given or the current timezone.
+
+    `None` values are kept, so the result lines up with the given values.
+    """
+    if tz is None:
+        tz = timezone.get_current_timezone()
+
+    if not hasattr(tz, "_utc_transition_times"):
+        # Timezones with a fixed offset are cheap to convert anyway.
+        return [None if value is None else value.astimezone(tz) for value in values]
+
+    localized = []
+    for value in values:
+        if value is None:
+            localized.append(None)
+            continue
+
+        utc = value.replace(tzinfo=None) - value.utcoffset()
+        starts, periods = _get_transitions(tz, utc.year)
+        offset, tzinfo = periods[bisect_right(starts, utc) - 1]
+        localized.append((utc + offset).replace(tzinfo=tzinfo))
+    return localized
+
+
+def format_column(values, fmt=None, tz=None):
+    """Convert aware datetimes to the given or the current timezone and format
+    them.
+
+    `fmt` is a `strftime()` format. Without it the values are formatted like
+    the templates do, using the `DATETIME_FORMAT` of the active language.
+    `None` values are formatted as empty strings.
+    """
+    strings = []
+    for value in localize_column(values, tz):
+        if value is None:
+            strings.append("")
+        elif fmt is None:
+            strings.append(formats.date_format(value, "DATETIME_FORMAT"))
+        else:
+            strings.append(value.strftime(fmt))
+    return strings
@@ -0,0 +1,68 @@
+"""Paginators for tables that are too big to count."""
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Below this number of rows the exact count is cheap enough.
+EXACT_COUNT_LIMIT = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator that does not count all rows of big querysets on PostgreSQL.
+
+    Unfiltered querysets use the number of rows of the table estimated by its
+    statistics, filtered ones the number of rows the query planner expects.
+    The last pages may therefore be empty or missing. If the estimate is below
+    `exact_count_limit` the rows are counted exactly, as are the rows of other
+    databases (e.g. SQLite) and of lists.
+
+    Use it as `paginator_class` of a `ListView` or as `paginator` of a
+    `ModelAdmin`.
+    """
+    exact_count_limit = EXACT_COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate_count()
+        if estimate is None or estimate < self.exact_count_limit:
+            return super().count
+        return estimate
+
+    def estimate_count(self):
+        """Return the estimated number of rows of the queryset or None if no
+        estimate is available.
+        """
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is None:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        if not (query.where or query.distinct or query.low_mark or query.high_mark):
+            return self.estimate_table_rows(connection, queryset.model)
+        return self.estimate_query_rows(connection, query)
+
+    def estimate_table_rows(self, connection, model):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # Tables that were never analyzed have no (or a negative) estimate.
+        return int(row[0]) if row and row[0] > 0 else None
+
+    def estimate_query_rows(self, connection, query):
+        try:
+            sql, params = query.get_compiler(connection=connection).as_sql()
+        except EmptyResultSet:
+            # E.g. `.none()`, which the exact count handles without a query.
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        return plan[0]["Plan"]["Plan Rows"]
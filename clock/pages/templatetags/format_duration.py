@@ -3,6 +3,9 @@ from datetime import datetime, timedelta
 
 from django import template
 
+from clock.contracts.utils import WorkingHours
+from clock.pages.localization import format_column
+
 register = template.Library()
 
 
@@ -50,3 +53,26 @@ def format_week(date):
     # https://docs.djangoproject.com/en/1.9/ref/class-based-views/generic-date-based/#weekarchiveview
     # We will use strftime instead!
     return date.strftime("%W")
+
+
+@register.filter
+def percent_of(hours, total):
+    """Return how many percent (rounded down) of `total` the working hours
+    are, e.g. ``{{ completed|percent_of:contract.hours }}``.
+    """
+    return WorkingHours.parse(hours).percent_of(total)
+
+
+@register.filter
+def local_times(shifts):
+    """Return tuples of every shift with its formatted start and end time.
+
+    The times of all shifts are converted to the current timezone at once, so
+    the template does not have to localize every single value::
+
+        {% for shift, started, finished in object_list|local_times %}
+    """
+    shifts = list(shifts or [])
+    started = format_column(shift.started for shift in shifts)
+    finished = format_column(shift.finished for shift in shifts)
+    return list(zip(shifts, started, finished))
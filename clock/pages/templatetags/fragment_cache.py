@@ -0,0 +1,64 @@
+from django import template
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import timezone, translation
+
+from clock.shifts.cache import cache_data, get_data_version, record_fragment_cache
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+
+    def __init__(self, nodelist, fragment_name, user_id, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.user_id = user_id
+        self.vary_on = vary_on
+
+    def render(self, context):
+        user_id = self.user_id.resolve(context)
+        vary_on = [user_id, get_data_version(user_id)]
+        vary_on += [var.resolve(context) for var in self.vary_on]
+        # The rendered fragment contains translated strings and datetimes in
+        # the timezone of the user.
+        vary_on += [translation.get_language(), timezone.get_current_timezone_name()]
+
+        cache_key = make_template_fragment_key(self.fragment_name, vary_on)
+        value = cache.get(cache_key)
+        record_fragment_cache(hit=value is not None)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache_data(cache_key, value)
+        return value
+
+
+@register.tag
+def versioned_cache(parser, token):
+    """Cache a template fragment until the data of a user changes.
+
+    Works like the `cache` tag of Django, but instead of a timeout it takes the
+    id of the user whose data is displayed. The fragment is cached with the
+    current data version of that user, which is bumped whenever one of their
+    shifts or contracts changes.
+
+    Usage::
+
+        {% load fragment_cache %}
+        {% versioned_cache [fragment_name] [user_id] [var1] [var2] .. %}
+            .. some expensive processing ..
+        {% endversioned_cache %}
+    """
+    nodelist = parser.parse(("endversioned_cache",))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            "'%r' tag requires at least 2 arguments." % tokens[0]
+        )
+    return VersionedCacheNode(
+        nodelist,
+        tokens[1],  # fragment_name can't be a variable.
+        parser.compile_filter(tokens[2]),
+        [parser.compile_filter(t) for t in tokens[3:]],
+    )
@@ -0,0 +1,43 @@
+"""Test the localization module"""
+import pytz
+from django.utils import timezone
+
+from clock.pages.localization import format_column, localize_column
+
+
+def test_localize_column_across_transitions():
+    """Assert that the column is converted like every single value would be."""
+    berlin = pytz.timezone("Europe/Berlin")
+    # Hourly values around the transitions in March and October and the turn
+    # of the year.
+    values = []
+    for start in [(2017, 3, 25), (2017, 10, 28), (2017, 12, 31)]:
+        first = timezone.make_aware(timezone.datetime(*start), pytz.utc)
+        values += [first + timezone.timedelta(hours=hour) for hour in range(48)]
+
+    localized = localize_column(values, berlin)
+    assert [str(value) for value in localized] == [
+        str(value.astimezone(berlin)) for value in values
+    ]
+    assert [value.tzname() for value in localized] == [
+        value.astimezone(berlin).tzname() for value in values
+    ]
+
+
+def test_localize_column_keeps_none():
+    value = timezone.make_aware(timezone.datetime(2017, 6, 1, 8), pytz.utc)
+    assert localize_column([None, value, None], pytz.utc) == [None, value, None]
+
+
+def test_format_column():
+    berlin = pytz.timezone("Europe/Berlin")
+    values = [
+        timezone.make_aware(timezone.datetime(2017, 1, 1, 8), pytz.utc),
+        None,
+        timezone.make_aware(timezone.datetime(2017, 7, 1, 8), pytz.utc),
+    ]
+    assert format_column(values, "%d.%m.%Y %H:%M", berlin) == [
+        "01.01.2017 09:00",
+        "",
+        "01.07.2017 10:00",
+    ]
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from clock.pages.paginators import EstimatedCountPaginator
+from clock.shifts.models import Shift
+
+
+class EstimatedCountPaginatorTest(TestCase):
+
+    def setUp(self):
+        self.user1 = self.make_user("user1")
+        user2 = self.make_user("user2")
+        started = timezone.make_aware(timezone.datetime(2016, 5, 2, 8))
+        Shift.objects.bulk_create(
+            Shift(employee=user, started=started + timezone.timedelta(days=days))
+            for days in range(30)
+            for user in [self.user1, user2]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE shifts_shift")
+
+    def paginator(self, queryset, exact_count_limit=0):
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.exact_count_limit = exact_count_limit
+        return paginator
+
+    def test_exact_count_below_limit(self):
+        queryset = Shift.objects.for_user(self.user1)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.paginator(queryset, 1000).count, 30)
+        self.assertEqual(EstimatedCountPaginator(list(range(5)), 2).count, 5)
+
+    def test_estimates(self):
+        """Assert that the table statistics and the query planner are used."""
+        with self.assertNumQueries(1):
+            self.assertEqual(self.paginator(Shift.objects.all()).count, 60)
+
+        paginator = self.paginator(Shift.objects.for_user(self.user1))
+        with self.assertNumQueries(1):
+            # An estimate, not necessarily the exact number of rows.
+            self.assertGreater(paginator.count, 0)
+        self.assertEqual(len(paginator.page(1)), 10)
+
+    def test_other_databases(self):
+        with patch.object(connection, "vendor", "sqlite"):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.paginator(Shift.objects.all()).count, 60)
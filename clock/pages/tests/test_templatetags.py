@@ -0,0 +1,83 @@
+"""Test the template tags of the pages app."""
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import override_settings
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from clock.contracts.utils import WorkingHours
+from clock.contrib.replica.routers import replica_reads
+from clock.shifts.cache import get_fragment_cache_stats
+from clock.shifts.models import Shift
+
+
+class VersionedCacheTest(TestCase):
+    """Test the `versioned_cache` template tag."""
+
+    template = Template(
+        "{% load fragment_cache %}"
+        "{% versioned_cache shifts user.pk month %}"
+        "{% for shift in user.shift_set.all %}{{ shift.pk }};{% endfor %}"
+        "{% endversioned_cache %}"
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.make_user()
+
+    def render(self, month=1):
+        return self.template.render(Context({"user": self.user, "month": month}))
+
+    def create_shift(self):
+        now = timezone.now()
+        return Shift.objects.create(
+            employee=self.user, started=now, finished=now + timezone.timedelta(0, 3600)
+        )
+
+    def test_fragment_is_cached(self):
+        shift = self.create_shift()
+        self.assertEqual(self.render(), "{};".format(shift.pk))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render(), "{};".format(shift.pk))
+
+        self.assertEqual(get_fragment_cache_stats(), {"hits": 1, "misses": 1})
+
+    @override_settings(REPLICA_DATABASE="default")
+    def test_fragment_read_from_replica_is_not_cached(self):
+        """The replica may lag behind the data version, so fragments rendered
+        from it must not be cached with that version."""
+        shift = self.create_shift()
+        with replica_reads():
+            self.assertEqual(self.render(), "{};".format(shift.pk))
+
+        self.assertEqual(self.render(), "{};".format(shift.pk))
+        self.assertEqual(get_fragment_cache_stats(), {"hits": 0, "misses": 2})
+
+    def test_fragment_varies_on_arguments(self):
+        self.render(month=1)
+        self.render(month=2)
+        self.assertEqual(get_fragment_cache_stats(), {"hits": 0, "misses": 2})
+
+    def test_fragment_is_invalidated(self):
+        """Saving or deleting a shift must invalidate the cached fragment."""
+        self.assertEqual(self.render(), "")
+
+        shift = self.create_shift()
+        self.assertEqual(self.render(), "{};".format(shift.pk))
+
+        shift.delete()
+        self.assertEqual(self.render(), "")
+
+
+class PercentOfTest(TestCase):
+    """Test the `percent_of` template filter."""
+
+    def test_percent_of(self):
+        template = Template(
+            "{% load format_duration %}{{ completed|percent_of:hours }}"
+        )
+        context = Context({"completed": WorkingHours(450), "hours": WorkingHours(600)})
+        self.assertEqual(template.render(context), "75")
+        context["hours"] = WorkingHours(0)
+        self.assertEqual(template.render(context), "0")
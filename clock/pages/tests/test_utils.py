@@ -1,7 +1,10 @@
 """Test the utils module"""
+from datetime import date
+
+import pytest
 from django.utils import timezone
 
-from clock.pages.utils import round_time
+from clock.pages.utils import month_bounds, next_month, round_time
 
 
 def test_round_down():
@@ -28,3 +31,23 @@ def test_round_up():
 
     time = timezone.datetime(2017, 1, 1, 12, 2)
     assert round_time(dt=time, to="up") == timezone.datetime(2017, 1, 1, 12, 5)
+
+
+def test_next_month():
+    """Assert that we get the first day of the following month."""
+    assert next_month(date(2017, 1, 31)) == date(2017, 2, 1)
+    assert next_month(date(2017, 12, 1)) == date(2018, 1, 1)
+
+    with pytest.raises(ValueError):
+        next_month(date(9999, 12, 1))
+
+
+def test_month_bounds():
+    """Assert that invalid months are rejected."""
+    first, last = month_bounds("2017", "12")
+    assert first == timezone.make_aware(timezone.datetime(2017, 12, 1))
+    assert last == timezone.make_aware(timezone.datetime(2018, 1, 1))
+
+    for year, month in [(2017, 13), (2017, 0), (9999, 12)]:
+        with pytest.raises(ValueError):
+            month_bounds(year, month)
@@ -1,5 +1,7 @@
 from test_plus.test import TestCase
 
+from clock.contracts.models import Contract
+
 
 class PagesViewTests(TestCase):
     """Tests the behaviour of the home view for guest users and authenticated
@@ -42,3 +44,23 @@ class PagesViewTests(TestCase):
 
             self.assertInContext("last_shifts")
             self.assertContext("last_shifts", None)
+
+    def test_dashboard_balance(self):
+        """An authenticated user sees the balance of their contracts."""
+        Contract.objects.create(employee=self.user1, department="Tutor", hours=600)
+        with self.login(username=self.user1, password="password"):
+            response = self.get_check_200("home")
+            self.assertEqual(len(response.context["balances"]), 1)
+            self.assertContains(response, "Overtime balance")
+
+    def test_cache_status(self):
+        """The fragment cache statistics are only visible for staff members."""
+        response = self.get("cache_status")
+        self.response_302(response)
+
+        self.user1.is_staff = True
+        self.user1.save()
+        with self.login(username=self.user1, password="password"):
+            response = self.get_check_200("cache_status")
+
+        self.assertIn("hits", response.json()["fragment_cache"])
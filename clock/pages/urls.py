@@ -3,4 +3,7 @@ from django.urls import path
 
 from clock.pages import views
 
-urlpatterns = [path("", views.home, name="home")]
+urlpatterns = [
+    path("", views.home, name="home"),
+    path("status/cache/", views.cache_status, name="cache_status"),
+]
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from django.utils import timezone
 
@@ -42,3 +42,28 @@ def round_time(dt=None, obj=None, date_delta=timedelta(minutes=5), to="average")
             + timedelta(0, rounding - seconds)
             - timedelta(microseconds=dt.microseconds)
         )
+
+
+def next_month(day):
+    """Return the first day of the month after the month of the given date.
+
+    Raises ValueError for the last month a date can represent.
+    """
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def month_bounds(year, month):
+    """Return the aware datetimes of the beginning of the given month and of
+    the month after it, in the current timezone.
+
+    Raises ValueError if the month does not exist or is out of range.
+    """
+    first_day = date(int(year), int(month), 1)
+    return (
+        timezone.make_aware(datetime.combine(first_day, datetime.min.time())),
+        timezone.make_aware(
+            datetime.combine(next_month(first_day), datetime.min.time())
+        ),
+    )
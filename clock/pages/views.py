@@ -1,8 +1,13 @@
-from datetime import datetime
+from datetime import timedelta
 
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 
-from clock.contracts.models import Contract
+from clock.contracts.ledger import get_balances
+from clock.shifts.cache import get_fragment_cache_stats
 from clock.shifts.forms import ClockInForm
 from clock.shifts.utils import (
     get_all_contracts,
@@ -38,27 +43,34 @@ def home(request):
         if shift:
             context["shift_closed"] = bool(shift)
             context["shift"] = shift
-            d = datetime.now()
-            s = shift.started
+            # The duration is updated by the browser afterwards.
             context["current_duration"] = shift.current_duration
-            context["current_duration_wp"] = d.replace(tzinfo=None) - s.replace(
-                tzinfo=None
-            )
-            context["current_duration_wp_ms"] = context[
-                "current_duration_wp"
-            ].microseconds
 
             # Delete the 'all_contracts' key from the context dict,
             # so we can hide the <select>-element in the template.
             del context["all_contracts"]
 
-        context["last_shifts"] = get_last_shifts(request.user)
-        contracts = Contract.objects.filter(employee=request.user)
+        # The table of the last shifts is cached in the template, so we only
+        # query them if the template actually renders them.
+        context["last_shifts"] = SimpleLazyObject(lambda: get_last_shifts(request.user))
+        contracts = get_all_contracts(request.user)
 
         if contracts:
             context["contracts"] = contracts
+            # The current month is not over yet, so show the balance up to
+            # the end of the last one.
+            last_month = timezone.localdate().replace(day=1) - timedelta(days=1)
+            context["balances"] = get_balances(
+                contracts, last_month.year, last_month.month
+            )
 
     context["template_to_render"] = template_to_render
 
     # Render the template
     return render(request, template_to_render, context)
+
+
+@staff_member_required
+def cache_status(request):
+    """Return the hit/miss counters of the template fragment cache."""
+    return JsonResponse({"fragment_cache": get_fragment_cache_stats()})
@@ -0,0 +1,21 @@
+# Generated by Django 2.0.5 on 2026-10-19 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("profiles", "0002_auto_20171022_1456")]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="calendar_token",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=64,
+                verbose_name="Calendar feed token",
+            ),
+        )
+    ]
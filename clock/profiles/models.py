@@ -9,3 +9,7 @@ class UserProfile(models.Model):
     language = models.CharField(
         _("Site language"), max_length=2, choices=settings.LANGUAGES, default="de"
     )
+    # Secret part of the address of the calendar feed, see `clock.exports.ical`
+    calendar_token = models.CharField(
+        _("Calendar feed token"), max_length=64, blank=True, db_index=True
+    )
@@ -2,7 +2,7 @@
 from django.urls import path
 from django.views.generic import TemplateView
 
-from clock.profiles.views import delete_user
+from clock.profiles.views import delete_user, reset_calendar_token
 
 from . import views
 
@@ -10,6 +10,7 @@ app_name = "profiles"
 urlpatterns = [
     path("profiles/", view=views.AccountUpdateView.as_view(), name="account_view"),
     path("delete/", delete_user, name="delete"),
+    path("calendar/reset/", reset_calendar_token, name="reset_calendar"),
     path(
         "goodbye/",
         TemplateView.as_view(template_name="profiles/goodbye.html"),
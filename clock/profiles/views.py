@@ -1,16 +1,19 @@
 from braces.views import LoginRequiredMixin
 from django import http
 from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
-from django.urls import reverse_lazy, translate_url
+from django.urls import reverse, reverse_lazy, translate_url
 from django.utils.http import is_safe_url
 from django.utils.translation import LANGUAGE_SESSION_KEY, check_for_language
 from django.utils.translation import ugettext_lazy as _
+from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView
 from django.views.generic.edit import UpdateView
 
+from clock.exports.ical import get_feed_token, reset_feed_token
 from clock.profiles.forms import DeleteUserForm, UpdateUserForm
 from clock.profiles.models import UserProfile
 from clock.users.models import User
@@ -24,6 +27,7 @@ class AccountView(LoginRequiredMixin, TemplateView):
 
 class AccountUpdateView(LoginRequiredMixin, UpdateView):
     """View to update some profile information."""
+
     model = User
     form_class = UpdateUserForm
     template_name = "profiles/profile.html"
@@ -32,6 +36,31 @@ class AccountUpdateView(LoginRequiredMixin, UpdateView):
     def get_object(self):
         return User.objects.get(pk=self.request.user.pk)
 
+    def get_context_data(self, **kwargs):
+        context = super(AccountUpdateView, self).get_context_data(**kwargs)
+        context["calendar_url"] = self.request.build_absolute_uri(
+            reverse("export:calendar", kwargs={"token": get_feed_token(self.object)})
+        )
+        return context
+
+
+@require_POST
+@login_required()
+def reset_calendar_token(request):
+    """Replace the address of the calendar feed, e.g. after it was shared by
+    accident.
+    """
+    reset_feed_token(request.user)
+    messages.add_message(
+        request,
+        messages.SUCCESS,
+        _(
+            "The address of your calendar feed was changed. Please update it in "
+            "your calendar app."
+        ),
+    )
+    return redirect("profiles:account_view")
+
 
 @login_required()
 def update_language(request):
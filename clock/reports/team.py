@@ -0,0 +1,120 @@
+"""Monthly totals of all employees for the staff.
+
+Every page of the report is computed by one grouped query over the contracts
+and their shifts, so the report does not get slower with the number of shifts
+of the employees.
+"""
+from datetime import date, timedelta
+
+from django.db.models import Count, Q, Sum
+
+from clock.contracts.models import Contract
+from clock.contracts.utils import format_minutes
+from clock.pages.utils import month_bounds, next_month
+
+
+class TeamReportRow:
+    """The totals of one contract of an employee in a month."""
+
+    __slots__ = (
+        "contract_id",
+        "department",
+        "hours",
+        "employee_id",
+        "username",
+        "first_name",
+        "last_name",
+        "worked",
+        "shifts",
+        "sick",
+        "vacation",
+    )
+
+    # Lookups passed to `values()`, in the same order as `__slots__`.
+    lookups = (
+        "pk",
+        "department",
+        "hours",
+        "employee_id",
+        "employee__username",
+        "employee__first_name",
+        "employee__last_name",
+    )
+
+    def __init__(self, values):
+        for name, lookup in zip(self.__slots__, self.lookups):
+            setattr(self, name, values[lookup])
+        self.worked = values["worked"] or timedelta(0)
+        self.shifts = values["shifts"]
+        self.sick = values["sick"]
+        self.vacation = values["vacation"]
+
+    def __repr__(self):
+        return "<TeamReportRow: {} {}>".format(self.username, self.department)
+
+    @property
+    def employee_name(self):
+        return " ".join(filter(None, [self.first_name, self.last_name])) or (
+            self.username
+        )
+
+    @property
+    def worked_minutes(self):
+        return int(self.worked.total_seconds() // 60)
+
+    @property
+    def target_minutes(self):
+        return self.hours.minutes
+
+    @property
+    def overtime_minutes(self):
+        return self.worked_minutes - self.target_minutes
+
+    @property
+    def worked_display(self):
+        return format_minutes(self.worked_minutes)
+
+    @property
+    def overtime_display(self):
+        return format_minutes(self.overtime_minutes)
+
+    @property
+    def fulfilment(self):
+        """Return the worked time in percent of the contract hours."""
+        if not self.target_minutes:
+            return 0
+        return int(self.worked_minutes / self.target_minutes * 100)
+
+
+def get_team_report(year, month):
+    """
+    Returns the worked time, the number of shifts and the number of sick and
+    vacation shifts per contract of all contracts running in the given month.
+
+    The values are grouped in the database, so each row is one contract and
+    not one shift. Contracts without shifts in the month are included.
+    """
+    first_day = date(int(year), int(month), 1)
+    started, finished = month_bounds(year, month)
+    in_month = Q(
+        shift__started__gte=started,
+        shift__started__lt=finished,
+        shift__finished__isnull=False,
+    )
+
+    return (
+        Contract.objects.filter(
+            Q(start_date__isnull=True) | Q(start_date__lt=next_month(first_day)),
+            Q(end_date__isnull=True) | Q(end_date__gte=first_day),
+        )
+        .values(*TeamReportRow.lookups)
+        .annotate(
+            worked=Sum("shift__duration", filter=in_month),
+            shifts=Count("shift", filter=in_month),
+            sick=Count("shift", filter=in_month & Q(shift__key="S")),
+            vacation=Count("shift", filter=in_month & Q(shift__key="V")),
+        )
+        .order_by(
+            "employee__last_name", "employee__first_name", "employee__username", "pk"
+        )
+    )
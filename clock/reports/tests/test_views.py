@@ -0,0 +1,121 @@
+from datetime import date
+
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from clock.contracts.models import Contract
+from clock.shifts.models import Shift
+
+
+class TeamReportViewTest(TestCase):
+
+    def setUp(self):
+        self.staff = self.make_user("staff")
+        self.staff.is_staff = True
+        self.staff.save()
+
+        self.user1 = self.make_user("user1")
+        self.user1.first_name, self.user1.last_name = "Ada", "Lovelace"
+        self.user1.save()
+        self.user2 = self.make_user("user2")
+
+        # 10 hours per month
+        self.contract1 = Contract.objects.create(
+            employee=self.user1, department="Tutor", hours=600
+        )
+        self.contract2 = Contract.objects.create(
+            employee=self.user2, department="Library", hours=600
+        )
+        Contract.objects.create(
+            employee=self.user2,
+            department="Expired",
+            hours=600,
+            end_date=date(2016, 4, 30),
+        )
+
+        started = timezone.make_aware(timezone.datetime(2016, 5, 2, 8))
+        for contract, days, hours, key in [
+            (self.contract1, 0, 8, ""),
+            (self.contract1, 1, 4, "S"),
+            (self.contract1, 40, 4, ""),
+            (self.contract2, 0, 2, "V"),
+        ]:
+            Shift.objects.create(
+                employee=contract.employee,
+                contract=contract,
+                started=started + timezone.timedelta(days=days),
+                finished=started + timezone.timedelta(days=days, hours=hours),
+                duration=timezone.timedelta(hours=hours),
+                key=key,
+            )
+
+    def test_staff_required(self):
+        with self.login(username=self.user1.username, password="password"):
+            self.get("reports:team")
+            self.response_302()
+            self.get("reports:team_csv", year=2016, month=5)
+            self.response_302()
+
+    def test_team_report(self):
+        """Assert that the totals are computed per contract of the month."""
+        with self.login(username=self.staff.username, password="password"):
+            response = self.get_check_200("reports:team_month", year=2016, month=5)
+            rows = response.context["rows"]
+            self.assertEqual(
+                [
+                    (
+                        row.department,
+                        row.worked_display,
+                        row.overtime_display,
+                        row.fulfilment,
+                        row.shifts,
+                        row.sick,
+                        row.vacation,
+                    )
+                    for row in rows
+                ],
+                [
+                    ("Library", "02:00", "-08:00", 20, 1, 0, 1),
+                    ("Tutor", "12:00", "02:00", 120, 2, 1, 0),
+                ],
+            )
+            self.assertEqual(rows[1].employee_name, "Ada Lovelace")
+            self.assertNotContains(response, "Expired")
+
+            response = self.get_check_200("reports:team_csv", year=2016, month=5)
+            self.assertEqual(response["Content-Type"], "text/csv")
+            lines = b"".join(response.streaming_content).decode().splitlines()
+            self.assertEqual(len(lines), 3)
+            self.assertEqual(
+                lines[2], "Ada Lovelace,user1,Tutor,10:00,12:00,02:00,120,2,1,0"
+            )
+
+    def test_invalid_month(self):
+        with self.login(username=self.staff.username, password="password"):
+            self.get("reports:team_month", year=2016, month=13)
+            self.response_404()
+            self.get("reports:team_csv", year=9999, month=12)
+            self.response_404()
+            self.get("reports:compliance_csv", year=2016, month=13)
+            self.response_404()
+
+    def test_compliance_report(self):
+        """Assert that the violations of all employees are streamed as CSV."""
+        Shift.objects.update(
+            created_at=timezone.make_aware(timezone.datetime(2016, 5, 3))
+        )
+        with self.login(username=self.user1.username, password="password"):
+            self.get("reports:compliance_csv", year=2016, month=5)
+            self.response_302()
+
+        with self.login(username=self.staff.username, password="password"):
+            response = self.get_check_200("reports:compliance_csv", year=2016, month=5)
+            lines = b"".join(response.streaming_content).decode().splitlines()
+            self.assertEqual(
+                lines[1:],
+                [
+                    "Ada Lovelace,user1,2016-05-02,Missing breaks,00:00,{}".format(
+                        Shift.objects.get(employee=self.user1, started__day=2).pk
+                    )
+                ],
+            )
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from django.urls import path
+
+from clock.reports.views import ComplianceReportCSV, TeamReportCSV, TeamReportView
+
+app_name = "reports"
+urlpatterns = [
+    # Team report of the current month
+    path("", TeamReportView.as_view(), name="team"),
+    path("<int:year>/<int:month>/", TeamReportView.as_view(), name="team_month"),
+    # The whole team report of a month as CSV
+    path("<int:year>/<int:month>/csv/", TeamReportCSV.as_view(), name="team_csv"),
+    # Violations of the working time rules of all employees in a month as CSV
+    path(
+        "<int:year>/<int:month>/compliance/csv/",
+        ComplianceReportCSV.as_view(),
+        name="compliance_csv",
+    ),
+]
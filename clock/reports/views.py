@@ -0,0 +1,149 @@
+import csv
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import get_user_model
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.translation import ugettext_lazy as _
+from django.views.generic import ListView, View
+
+from clock.contrib.replica.routers import use_replica
+from clock.pages.paginators import EstimatedCountPaginator
+from clock.pages.utils import month_bounds
+from clock.reports.team import TeamReportRow, get_team_report
+from clock.shifts.compliance import check_compliance
+
+
+class _Echo:
+    """File-like object that returns what is written to it, so `csv.writer`
+    can be used to produce the lines of a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+class TeamReportMixin:
+    """Read the month of the report from the URL, defaulting to the current
+    month.
+    """
+
+    def get_month(self):
+        today = timezone.localdate()
+        year = int(self.kwargs.get("year", today.year))
+        month = int(self.kwargs.get("month", today.month))
+        try:
+            month_bounds(year, month)
+        except (ValueError, OverflowError):
+            raise Http404
+        return year, month
+
+    def get_queryset(self):
+        return get_team_report(*self.get_month())
+
+
+@method_decorator(staff_member_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+class TeamReportView(TeamReportMixin, ListView):
+    """Monthly totals and contract fulfilment of all employees."""
+    template_name = "reports/team.html"
+    paginate_by = 50
+    paginator_class = EstimatedCountPaginator
+
+    def get_context_data(self, **kwargs):
+        context = super(TeamReportView, self).get_context_data(**kwargs)
+        year, month = self.get_month()
+        context["month"] = timezone.datetime(year, month, 1)
+        context["rows"] = [TeamReportRow(values) for values in context["object_list"]]
+        return context
+
+
+@method_decorator(staff_member_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+class TeamReportCSV(TeamReportMixin, View):
+    """Stream the whole team report of a month as CSV."""
+
+    header = [
+        _("Employee"),
+        _("Username"),
+        _("Contract"),
+        _("Work hours"),
+        _("Worked"),
+        _("Overtime"),
+        _("Fulfilment (%)"),
+        _("Shifts"),
+        _("Sick"),
+        _("Vacation"),
+    ]
+
+    def get_lines(self, writer):
+        yield writer.writerow([str(title) for title in self.header])
+        for values in self.get_queryset().iterator():
+            row = TeamReportRow(values)
+            yield writer.writerow(
+                [
+                    row.employee_name,
+                    row.username,
+                    row.department,
+                    row.hours,
+                    row.worked_display,
+                    row.overtime_display,
+                    row.fulfilment,
+                    row.shifts,
+                    row.sick,
+                    row.vacation,
+                ]
+            )
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            self.get_lines(csv.writer(_Echo())), content_type="text/csv"
+        )
+        response["Content-Disposition"] = 'attachment; filename="{}"'.format(
+            "team_{}_{:02d}.csv".format(*self.get_month())
+        )
+        return response
+
+
+@method_decorator(staff_member_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+class ComplianceReportCSV(TeamReportMixin, View):
+    """Stream the violations of the working time rules of all employees in a
+    month as CSV.
+    """
+
+    header = [_("Employee"), _("Username"), _("Day"), _("Rule"), _("Value"), _("Shift")]
+
+    def get_lines(self, writer, start, end):
+        yield writer.writerow([str(title) for title in self.header])
+        employees = {
+            pk: (" ".join(filter(None, (first_name, last_name))), username)
+            for pk, first_name, last_name, username in get_user_model()
+            .objects.values_list("pk", "first_name", "last_name", "username")
+            .iterator()
+        }
+        for violation in check_compliance(start, end):
+            name, username = employees[violation.employee_id]
+            yield writer.writerow(
+                [
+                    name,
+                    username,
+                    violation.date.isoformat(),
+                    violation.get_rule_display(),
+                    violation.get_value_display(),
+                    violation.shift_id,
+                ]
+            )
+
+    def get(self, request, *args, **kwargs):
+        # The month is validated before the response starts streaming.
+        year, month = self.get_month()
+        response = StreamingHttpResponse(
+            self.get_lines(csv.writer(_Echo()), *month_bounds(year, month)),
+            content_type="text/csv",
+        )
+        response["Content-Disposition"] = 'attachment; filename="{}"'.format(
+            "compliance_{}_{:02d}.csv".format(year, month)
+        )
+        return response
@@ -0,0 +1 @@
+default_app_config = "clock.shifts.apps.ShiftsConfig"
@@ -1,6 +1,39 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import (
+    Case,
+    DateTimeField,
+    DurationField,
+    IntegerField,
+    Value,
+    When,
+)
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+from django.utils.translation import ungettext
+from taggit.models import TaggedItem
 
-from clock.shifts.models import Shift
+from clock.contracts.models import Contract
+from clock.pages.paginators import EstimatedCountPaginator
+from clock.shifts.models import Pause, Shift
+from clock.shifts.utils import invalidate_shifts
+
+
+class ShiftActionForm(ActionForm):
+    contract = forms.IntegerField(
+        label=_("Contract ID"),
+        required=False,
+        help_text=_("Only used to reassign the contract."),
+    )
+
+
+class PauseInline(admin.TabularInline):
+    model = Pause
+    extra = 0
 
 
 class ShiftAdmin(admin.ModelAdmin):
@@ -12,6 +45,205 @@ class ShiftAdmin(admin.ModelAdmin):
         "duration",
         "created_at",
     )
+    list_select_related = ("employee", "contract")
+    list_filter = ("bool_finished", "key")
+    date_hierarchy = "started"
+    autocomplete_fields = ("employee", "contract")
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    action_form = ShiftActionForm
+    actions = ["close_shifts", "split_shifts", "reassign_contract"]
+    inlines = [PauseInline]
+
+    def save_related(self, request, form, formsets, change):
+        """The pauses are saved after the shift, so its duration has to be
+        updated again.
+        """
+        super().save_related(request, form, formsets, change)
+        form.instance.update_duration()
+
+    def close_shifts(self, request, queryset):
+        """Finish the selected running shifts now."""
+        queryset = queryset.filter(finished__isnull=True)
+        rows = list(queryset.values_list("pk", "employee_id", "started", "contract_id"))
+        now = timezone.now()
+        Pause.objects.filter(shift__in=queryset, finished__isnull=True).update(
+            finished=now
+        )
+        count = queryset.update(finished=now, bool_finished=True, pause_started=None)
+        Shift.objects.filter(pk__in=[row[0] for row in rows]).update_durations()
+        invalidate_shifts([row[1:3] for row in rows], [row[3] for row in rows])
+        self.message_user(
+            request, ungettext("Closed %d shift.", "Closed %d shifts.", count) % count
+        )
+
+    close_shifts.short_description = _("Close the selected running shifts")
+
+    def split_shifts(self, request, queryset):
+        """
+        End the selected shifts that spill into the next day at midnight and
+        move the rest of them into a new shift, together with their note, tags
+        and the pauses after midnight.
+        """
+        midnight = TruncDay("finished", tzinfo=timezone.get_current_timezone())
+        rows = list(
+            queryset.filter(finished__isnull=False)
+            .annotate(midnight=midnight)
+            .values_list(
+                "pk",
+                "employee_id",
+                "contract_id",
+                "key",
+                "midnight",
+                "finished",
+                "started",
+                "note",
+                "pause_duration",
+            )
+        )
+        # Only shifts that run over midnight are split, not the ones that end
+        # exactly at midnight. The truncated values are local times without a
+        # timezone in the database, so we compare them with the start and end
+        # of the shifts here.
+        rows = [row for row in rows if row[6] < row[4] < row[5]]
+        if not rows:
+            self.message_user(request, _("None of the shifts spill into the next day."))
+            return
+
+        # Shifts without recorded pauses keep as much of their pause before
+        # midnight as fits, the rest is moved to the new shift.
+        first_pauses = {row[0]: min(row[8], row[4] - row[6]) for row in rows}
+        with transaction.atomic():
+            new_shifts = {
+                row[0]: Shift(
+                    employee_id=row[1],
+                    contract_id=row[2],
+                    key=row[3],
+                    started=row[4],
+                    finished=row[5],
+                    pause_duration=row[8] - first_pauses[row[0]],
+                    bool_finished=True,
+                    note=row[7],
+                )
+                for row in rows
+            }
+            Shift.objects.bulk_create(new_shifts.values())
+
+            # The truncated values are local times without a timezone in the
+            # database, so we pass the midnights we already fetched instead.
+            Shift.objects.filter(pk__in=new_shifts).update(
+                finished=Case(
+                    *[When(pk=row[0], then=Value(row[4])) for row in rows],
+                    output_field=DateTimeField()
+                ),
+                pause_duration=Case(
+                    *[
+                        When(pk=pk, then=Value(pause))
+                        for pk, pause in first_pauses.items()
+                    ],
+                    output_field=DurationField()
+                ),
+            )
+
+            # Pauses after midnight belong to the new shifts, pauses over
+            # midnight are split as well.
+            midnights = {row[0]: row[4] for row in rows}
+            moved, ended, created = {}, {}, []
+            for pause in Pause.objects.filter(shift_id__in=new_shifts):
+                split_at = midnights[pause.shift_id]
+                new_shift = new_shifts[pause.shift_id]
+                if pause.started >= split_at:
+                    moved[pause.pk] = new_shift.pk
+                elif pause.finished is not None and pause.finished > split_at:
+                    ended[pause.pk] = split_at
+                    created.append(
+                        Pause(
+                            shift=new_shift, started=split_at, finished=pause.finished
+                        )
+                    )
+            if moved:
+                Pause.objects.filter(pk__in=moved).update(
+                    shift=Case(
+                        *[
+                            When(pk=pk, then=Value(shift_id))
+                            for pk, shift_id in moved.items()
+                        ],
+                        output_field=IntegerField()
+                    )
+                )
+            if ended:
+                Pause.objects.filter(pk__in=ended).update(
+                    finished=Case(
+                        *[
+                            When(pk=pk, then=Value(finished))
+                            for pk, finished in ended.items()
+                        ],
+                        output_field=DateTimeField()
+                    )
+                )
+            Pause.objects.bulk_create(created)
+
+            content_type = ContentType.objects.get_for_model(Shift)
+            TaggedItem.objects.bulk_create(
+                TaggedItem(
+                    tag_id=tag_id,
+                    content_type=content_type,
+                    object_id=new_shifts[object_id].pk,
+                )
+                for object_id, tag_id in TaggedItem.objects.filter(
+                    content_type=content_type, object_id__in=new_shifts
+                ).values_list("object_id", "tag_id")
+            )
+
+            halves = Shift.objects.filter(
+                pk__in=list(new_shifts) + [shift.pk for shift in new_shifts.values()]
+            )
+            halves.update_durations()
+            halves.update_search_vector()
+
+        # The new shifts may start in the month after the split ones.
+        invalidate_shifts(
+            [(row[1], row[4]) for row in rows] + [(row[1], row[6]) for row in rows],
+            [row[2] for row in rows],
+        )
+        self.message_user(
+            request,
+            ungettext("Split %d shift.", "Split %d shifts.", len(rows)) % len(rows),
+        )
+
+    split_shifts.short_description = _("Split the selected shifts at midnight")
+
+    def reassign_contract(self, request, queryset):
+        """Assign the contract given in the action form to the selected shifts
+        of the employee of the contract.
+        """
+        try:
+            contract = Contract.objects.get(pk=request.POST.get("contract"))
+        except (Contract.DoesNotExist, ValueError):
+            self.message_user(
+                request, _("Please enter the ID of a contract."), messages.ERROR
+            )
+            return
+
+        queryset = queryset.filter(employee_id=contract.employee_id)
+        rows = list(queryset.values_list("employee_id", "started", "contract_id"))
+        count = queryset.update(contract=contract)
+        invalidate_shifts(
+            [row[:2] for row in rows], [row[2] for row in rows] + [contract.pk]
+        )
+        self.message_user(
+            request,
+            ungettext(
+                "Assigned %(count)d shift to %(contract)s.",
+                "Assigned %(count)d shifts to %(contract)s.",
+                count,
+            )
+            % {"count": count, "contract": contract},
+        )
+
+    reassign_contract.short_description = _(
+        "Assign the selected shifts to another contract"
+    )
 
 
 admin.site.register(Shift, ShiftAdmin)
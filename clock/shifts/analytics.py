@@ -0,0 +1,73 @@
+"""Time spent per tag, e.g. per project the shifts were tagged with."""
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+from clock.pages.utils import next_month
+from clock.shifts.cache import TAG_TOTALS_KEY, cache_data, get_change_stamp
+from clock.shifts.models import Shift
+
+
+def get_month_tag_totals(user_id, year, month):
+    """
+    Returns the duration and number of finished shifts per tag and the total
+    duration of all finished shifts of a user in a month.
+
+    The result is cached until the shifts of the month change.
+    :return: Dict with the keys 'tags' (tag name: (duration, count)) and
+        'total'
+    """
+    stamp = get_change_stamp(user_id, year, month).timestamp()
+    key = TAG_TOTALS_KEY.format(user_id, year, month, stamp)
+    totals = cache.get(key)
+    if totals is None:
+        shifts = Shift.objects.for_user(user_id).finished().in_month(year, month)
+        total = shifts.aggregate(total=Sum("duration"))["total"]
+        totals = {
+            "tags": {
+                row["tags__name"]: (row["duration"], row["count"])
+                for row in shifts.tag_totals()
+            },
+            "total": total or timedelta(0),
+        }
+        cache_data(key, totals)
+    return totals
+
+
+def months_between(start, end):
+    """Yield (year, month) of all months from start to end (inclusive)."""
+    current = date(start.year, start.month, 1)
+    last = date(end.year, end.month, 1)
+    yield current.year, current.month
+    while current < last:
+        current = next_month(current)
+        yield current.year, current.month
+
+
+def get_tag_totals(user_id, start, end):
+    """
+    Returns the duration, number of shifts and share of the total working time
+    per tag for all months from start to end, the longest first.
+
+    Shifts may have several tags, so the shares do not necessarily add up to
+    100 percent.
+    """
+    durations, counts = {}, {}
+    total = timedelta(0)
+    for year, month in months_between(start, end):
+        totals = get_month_tag_totals(user_id, year, month)
+        total += totals["total"]
+        for tag, (duration, count) in totals["tags"].items():
+            durations[tag] = durations.get(tag, timedelta(0)) + duration
+            counts[tag] = counts.get(tag, 0) + count
+
+    return [
+        {
+            "tag": tag,
+            "duration": durations[tag],
+            "count": counts[tag],
+            "share": round(durations[tag] / total * 100, 1) if total else 0,
+        }
+        for tag in sorted(durations, key=lambda tag: (-durations[tag], tag))
+    ]
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class ShiftsConfig(AppConfig):
+    name = "clock.shifts"
+
+    def ready(self):
+        import clock.shifts.signals  # noqa: F401
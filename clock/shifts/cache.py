@@ -0,0 +1,131 @@
+"""Per-user data versions and change stamps used to invalidate cached data.
+
+Every change to a shift or contract bumps the data version of its employee
+(see `clock.shifts.signals`). Cache keys that include the version therefore
+never serve stale data and we do not need to know which keys to delete.
+
+Additionally we remember when the shifts of a single month or the contracts
+of a user changed the last time. These change stamps are used for
+conditional requests of views that only display a single month.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from clock.contrib.replica.routers import reads_from_replica
+
+DATA_VERSION_KEY = "clock:data_version:{}"
+FRAGMENT_STATS_KEY = "clock:fragment_cache:{}"
+MONTH_STAMP_KEY = "clock:month_stamp:{}:{}:{}"
+CONTRACT_STAMP_KEY = "clock:contract_stamp:{}"
+CLOCK_STATUS_KEY = "clock:status:{}:{}"
+CONTRACTS_KEY = "clock:contracts:{}:{}"
+TAG_TOTALS_KEY = "clock:tag_totals:{}:{}:{}:{}"
+CALENDAR_MONTH_KEY = "clock:calendar:{}:{}:{}:{}:{}"
+
+# The smallest and largest offset of any timezone to UTC
+UTC_OFFSETS = (timedelta(hours=-12), timedelta(hours=14))
+
+
+def _initial_version():
+    # If a version was evicted from the cache, start over with a value that is
+    # bigger than any version used before. Otherwise we could serve fragments
+    # that were cached with an older version of the same number.
+    return int(time.time() * 1000)
+
+
+def get_data_version(user_id):
+    """Return the current data version of the user with the given id."""
+    key = DATA_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def cache_data(key, value):
+    """Cache a value that was loaded with the current data version or change
+    stamp of its key.
+
+    Values read from the replica are not cached: the replica may not contain
+    the changes of that version yet and we would keep serving stale data.
+    """
+    if not reads_from_replica():
+        cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+
+
+def bump_data_version(user_id):
+    """Invalidate everything that was cached for the user with the given id."""
+    key = DATA_VERSION_KEY.format(user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_version()
+        cache.set(key, version, None)
+        return version
+
+
+def record_fragment_cache(hit):
+    """Count a hit or miss of the fragment cache."""
+    key = FRAGMENT_STATS_KEY.format("hits" if hit else "misses")
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_fragment_cache_stats():
+    """Return the number of hits and misses of the fragment cache."""
+    return {
+        "hits": cache.get(FRAGMENT_STATS_KEY.format("hits"), 0),
+        "misses": cache.get(FRAGMENT_STATS_KEY.format("misses"), 0),
+    }
+
+
+def _get_stamp(key):
+    stamp = cache.get(key)
+    if stamp is None:
+        # We do not know when the data changed the last time, so we have to
+        # assume it just did.
+        cache.add(key, timezone.now(), None)
+        stamp = cache.get(key)
+    return stamp or timezone.now()
+
+
+def get_change_stamp(user_id, year, month):
+    """Return the last time the shifts of the user in the given month or any
+    of the contracts of the user changed.
+    """
+    return max(
+        _get_stamp(MONTH_STAMP_KEY.format(user_id, int(year), int(month))),
+        _get_stamp(CONTRACT_STAMP_KEY.format(user_id)),
+    )
+
+
+def touch_month(user_id, started):
+    """Mark the month of the given datetime as changed for the user with the
+    given id.
+
+    The month of a datetime depends on the timezone it is displayed in, which
+    may differ from the current one. Close to the turn of a month we therefore
+    touch the months of all UTC offsets (-12:00 to +14:00).
+    """
+    started = started.astimezone(timezone.utc).replace(tzinfo=None)
+    now = timezone.now()
+    cache.set_many(
+        {
+            MONTH_STAMP_KEY.format(user_id, day.year, day.month): now
+            for day in (started + offset for offset in UTC_OFFSETS)
+        },
+        None,
+    )
+
+
+def touch_contracts(user_id):
+    """Mark the contracts of the user with the given id as changed."""
+    cache.set(CONTRACT_STAMP_KEY.format(user_id), timezone.now(), None)
@@ -0,0 +1,183 @@
+"""Check shifts against the German working time rules.
+
+The checks run in a single pass over the shifts ordered by employee and
+start, keeping only the state of the current day of the current employee.
+This allows audits of the whole organisation without loading all shifts.
+
+The rules are:
+
+* At most 10 hours of work per day (§ 3 ArbZG).
+* At least 30 minutes of breaks for more than 6 hours of work and 45 minutes
+  for more than 9 hours (§ 4 ArbZG). Pauses of the shifts and gaps of at
+  least 15 minutes between shifts of the same day count as breaks.
+* At least 11 hours of rest between two working days (§ 5 ArbZG). A working
+  day ends with the last shift before the first shift on a later day, unless
+  that shift continues the work, e.g. after a shift was split at midnight.
+* Sick and vacation shifts are no work and are only checked for the record.
+* Shifts have to be recorded within 7 days after the day of work
+  (§ 17 MiLoG).
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+from django.utils.translation import ungettext
+
+from clock.contracts.utils import format_minutes
+from clock.shifts.models import Shift
+from clock.shifts.statistics import CONTINUATION, MIN_REST
+
+MAX_DAILY_WORK = timedelta(hours=10)
+# Required breaks for more than the given amount of work, longest first
+REQUIRED_BREAKS = (
+    (timedelta(hours=9), timedelta(minutes=45)),
+    (timedelta(hours=6), timedelta(minutes=30)),
+)
+MIN_BREAK = timedelta(minutes=15)
+RECORDING_PERIOD = timedelta(days=7)
+
+DAILY_WORK = "daily_work"
+BREAKS = "breaks"
+REST = "rest"
+LATE_RECORD = "late_record"
+RULES = {
+    DAILY_WORK: _("More than 10 hours of work"),
+    BREAKS: _("Missing breaks"),
+    REST: _("Less than 11 hours of rest"),
+    LATE_RECORD: _("Recorded more than 7 days late"),
+}
+
+
+class Violation(
+    namedtuple("Violation", ["employee_id", "rule", "date", "shift_id", "value"])
+):
+    """A violation of a rule by an employee on a (local) day.
+
+    `value` is the offending amount of time: the work of the day, the breaks
+    taken, the rest period or the delay of the record.
+    """
+
+    __slots__ = ()
+
+    def get_rule_display(self):
+        return RULES[self.rule]
+
+    def get_value_display(self):
+        if self.rule == LATE_RECORD:
+            return ungettext("%d day", "%d days", self.value.days) % self.value.days
+        return format_minutes(self.value.total_seconds() // 60)
+
+
+class _Day:
+    """The work and breaks of an employee on one day so far."""
+    __slots__ = ("employee_id", "date", "work", "breaks", "last_shift_id", "finished")
+
+    def __init__(self, employee_id, date):
+        self.employee_id = employee_id
+        self.date = date
+        self.work = timedelta(0)
+        self.breaks = timedelta(0)
+        self.last_shift_id = None
+        self.finished = None
+
+    def violations(self):
+        if self.work > MAX_DAILY_WORK:
+            yield Violation(
+                self.employee_id, DAILY_WORK, self.date, self.last_shift_id, self.work
+            )
+        for work, required in REQUIRED_BREAKS:
+            if self.work > work:
+                if self.breaks < required:
+                    yield Violation(
+                        self.employee_id,
+                        BREAKS,
+                        self.date,
+                        self.last_shift_id,
+                        self.breaks,
+                    )
+                break
+
+
+def check_shifts(shifts):
+    """
+    Yield the violations of the finished shifts of the given queryset, in the
+    order of the employees and days.
+    """
+    rows = (
+        shifts.finished()
+        .order_by("employee_id", "started")
+        .values_list(
+            "pk",
+            "employee_id",
+            "started",
+            "finished",
+            "pause_duration",
+            "created_at",
+            "key",
+        )
+        .iterator()
+    )
+
+    day = None
+    # Late records of sick and vacation shifts, yielded after the violations
+    # of the current day to keep the order.
+    pending = []
+    for pk, employee_id, started, finished, pause, created_at, key in rows:
+        date = timezone.localtime(started).date()
+        created_date = timezone.localtime(created_at).date()
+        late = None
+        if created_date - date > RECORDING_PERIOD:
+            late = Violation(employee_id, LATE_RECORD, date, pk, created_date - date)
+
+        # Sick and vacation shifts are no work, so only the record is checked.
+        if key:
+            if late is not None:
+                pending.append(late)
+            continue
+
+        # A working day lasts until the first shift on a later day that does
+        # not continue the work, e.g. of a shift that was split at midnight.
+        # The rest period is measured from the end of the last shift.
+        if (
+            day is None
+            or day.employee_id != employee_id
+            or (
+                date > day.date
+                and (started - day.finished).total_seconds() >= CONTINUATION
+            )
+        ):
+            if day is not None:
+                yield from day.violations()
+            yield from pending
+            pending = []
+            if day is not None and day.employee_id == employee_id:
+                rest = started - day.finished
+                if rest.total_seconds() < MIN_REST:
+                    yield Violation(employee_id, REST, date, pk, rest)
+            day = _Day(employee_id, date)
+        elif started - day.finished >= MIN_BREAK:
+            day.breaks += started - day.finished
+
+        if late is not None:
+            yield late
+
+        day.work += finished - started - pause
+        day.breaks += pause
+        day.last_shift_id = pk
+        day.finished = max(finished, day.finished or finished)
+
+    if day is not None:
+        yield from day.violations()
+    yield from pending
+
+
+def check_compliance(start, end, user=None):
+    """
+    Yield the violations of the shifts started between the datetimes start
+    (inclusive) and end (exclusive) of the given user or of all users.
+    """
+    shifts = Shift.objects.filter(started__gte=start, started__lt=end)
+    if user is not None:
+        shifts = shifts.for_user(user)
+    return check_shifts(shifts)
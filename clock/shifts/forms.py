@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import io
+import os
 from datetime import datetime
 
 import pytz
@@ -14,29 +16,33 @@ from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
 
+from clock.contracts.forms import ContractChoiceField
 from clock.contracts.models import Contract
-from clock.pages.utils import round_time
-from clock.shifts.models import Shift
-from clock.shifts.utils import get_return_url
+from clock.contracts.registry import get_contract_registry
+from clock.pages.utils import month_bounds, round_time
+from clock.shifts.compliance import MAX_DAILY_WORK
+from clock.shifts.imports import ShiftImporter, read_csv, read_ics
+from clock.shifts.models import Pause, Shift
+from clock.shifts.utils import get_return_url, validate_shift_times
 
 
 class ClockInForm(forms.Form):
     """Form used to clock in the user."""
     started = forms.DateTimeField(input_formats=settings.DATETIME_INPUT_FORMATS)
-    contract = forms.ModelChoiceField(
+    contract = ContractChoiceField(
         queryset=Contract.objects.none(), empty_label=_("None defined"), required=False
     )
 
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop("user")
         super().__init__(*args, **kwargs)
-        if self.fields["contract"]:
-            self.fields["contract"].queryset = self.user.contract_set.all()
+        self.fields["contract"].queryset = self.user.contract_set.all()
+        self.fields["contract"].registry = get_contract_registry(self.user)
 
     def clean(self):
         cleaned_data = super().clean()
 
-        if Shift.objects.filter(employee=self.user, finished__isnull=True):
+        if Shift.objects.for_user(self.user).filter(finished__isnull=True).exists():
             raise forms.ValidationError(_("You cannot clock into two shifts at once!"))
 
         return cleaned_data
@@ -84,6 +90,7 @@ class ClockOutForm(forms.Form):
 
         # Check whether the `started` and `finished` datetimes are on different
         # days. If yes, we need to split them into two own objects.
+        next_shift = None
         if self.spills_into_next_day():
             # Save the finished time of the to-be created Shift object.
             next_day_finished = self.cleaned_data["finished"]
@@ -148,13 +155,17 @@ class ClockOutForm(forms.Form):
                     }
                 )
                 if new_shift.is_valid():
-                    new_shift.save()
+                    next_shift = new_shift.save()
 
         # If we came this far, then we were able to process the Shift,
         # splitting of the residual datetime into a new day. We have not yet
         # checked whether the duration on the actual starting day is >= five
         # minutes.
-        self.instance.duration = cleaned_data["finished"] - self.instance.started
+        self.instance.finished = cleaned_data["finished"]
+        self.split_pauses(next_shift)
+        self.instance.update_duration()
+        if next_shift is not None:
+            next_shift.update_duration()
 
         # Check whether the duration of the Shift object started on the actual
         # day is >= than 5 minutes. Delete otherwise.
@@ -176,6 +187,46 @@ class ClockOutForm(forms.Form):
 
         return cleaned_data
 
+    def split_pauses(self, next_shift=None):
+        """Keep only the parts of the pauses that lie within the shift.
+
+        The parts after midnight are moved to the shift of the next day, if
+        there is one. Shifts without recorded pauses keep as much of their
+        pause as fits.
+        """
+        shift = self.instance
+        pauses = list(shift.pauses.finished())
+        if not pauses:
+            shift.pause_duration = min(
+                shift.pause_duration, shift.finished - shift.started
+            )
+            return
+
+        shift.pause_duration = timezone.timedelta(0)
+        for pause in pauses:
+            started = max(pause.started, shift.started)
+            finished = min(pause.finished, shift.finished)
+            next_started = next_finished = None
+            if next_shift is not None:
+                next_started = max(pause.started, next_shift.started)
+                next_finished = min(pause.finished, next_shift.finished)
+            has_next = next_started is not None and next_started < next_finished
+
+            if started < finished:
+                Pause.objects.filter(pk=pause.pk).update(
+                    started=started, finished=finished
+                )
+                if has_next:
+                    Pause.objects.create(
+                        shift=next_shift, started=next_started, finished=next_finished
+                    )
+            elif has_next:
+                Pause.objects.filter(pk=pause.pk).update(
+                    shift=next_shift, started=next_started, finished=next_finished
+                )
+            else:
+                pause.delete()
+
     def spills_into_next_day(self, started=None, finished=None):
         """Returns True if the shift finishes the same day it started."""
         if not started:
@@ -237,6 +288,7 @@ class ShiftForm(forms.ModelForm):
             "contract": forms.Select(attrs={"class": "selectpicker"}),
             "key": forms.Select(attrs={"class": "selectpicker"}),
         }
+        field_classes = {"contract": ContractChoiceField}
 
     def __init__(self, *args, **kwargs):
         self.request = kwargs.pop("request", None)
@@ -255,14 +307,15 @@ class ShiftForm(forms.ModelForm):
 
             self.contract = None
         else:
-            self.fields["contract"].queryset = self.user.contract_set.all()
             self.fields["started"].widget = forms.HiddenInput()
             self.fields["finished"].widget = forms.HiddenInput()
 
         # Retrieve all contracts that belong to the user
-        self.fields["contract"].queryset = Contract.objects.filter(employee=self.user)
+        registry = get_contract_registry(self.user)
+        self.fields["contract"].queryset = self.user.contract_set.all()
+        self.fields["contract"].registry = registry
 
-        if not self.fields["contract"].queryset:
+        if not registry:
             self.fields["contract"].widget.attrs["disabled"] = True
 
         # Set the delete input to be empty. If we are not on an update page,
@@ -317,15 +370,9 @@ class ShiftForm(forms.ModelForm):
         self.instance.employee = self.user
         self.started = cleaned_data.get("started")
         self.finished = cleaned_data.get("finished")
-        self.instance.duration = self.finished - self.started
-
-        # Do not allow a manually created Shift to spill into the next day.
-        if not (
-            (self.started.year == self.finished.year)
-            and (self.started.month == self.finished.month)
-            and (self.started.day == self.finished.day)
-        ):
-            self.add_error("finished", _("A shift can never end on the next day."))
+        self.instance.duration = (
+            self.finished - self.started - self.instance.pause_duration
+        )
 
         reoccuring = self.cleaned_data.get("reoccuring")
         if (
@@ -395,8 +442,8 @@ class ShiftForm(forms.ModelForm):
         return shiftform
 
     def is_too_long(self, worked_hours=None):
-        """Return True/False if the total work time for a given day exceeds ten
-        hours.
+        """Return True/False if the total work time for a given day exceeds the
+        maximum daily working time.
         """
         if not worked_hours:
             worked_hours = self.work_time_current_day()
@@ -404,7 +451,7 @@ class ShiftForm(forms.ModelForm):
         if not self.instance.duration:
             self.instance.duration = timezone.now() - self.started
 
-        return (worked_hours + self.instance.duration) > timezone.timedelta(minutes=600)
+        return (worked_hours + self.instance.duration) > MAX_DAILY_WORK
 
     def work_time_current_day(self):
         """Return the total time worked for a given day."""
@@ -412,8 +459,7 @@ class ShiftForm(forms.ModelForm):
         month = self.started.month
         year = self.started.year
 
-        work_time = Shift.objects.filter(
-            employee=self.user,
+        work_time = Shift.objects.for_user(self.user).filter(
             contract=self.contract,
             started__gte=timezone.make_aware(datetime(year, month, day, 0, 0)),
             finished__lte=timezone.make_aware(datetime(year, month, day, 23, 59)),
@@ -429,16 +475,17 @@ class ShiftForm(forms.ModelForm):
         return work_time
 
     def time_validation(self):
-        """Validate that the finish time is bigger than the start time.
+        """Validate the start and end of the shift and that it does not overlap
+        with other shifts.
         """
 
         if not self.finished:
             return
 
-        if self.finished < self.started:
-            self.add_error(None, _("The shift cannot start after finishing."))
-        elif (self.finished - self.started) < timezone.timedelta(minutes=5):
-            self.add_error(None, _("We cannot save a shift that is this short."))
+        try:
+            validate_shift_times(self.started, self.finished)
+        except forms.ValidationError as error:
+            self.add_error(None, error)
 
         overlaps = self.check_for_overlaps
         if not overlaps:
@@ -495,12 +542,16 @@ class ShiftForm(forms.ModelForm):
         # Only perform the check if the current Shift belongs to some contract
         contract = self.cleaned_data.get("contract", None)
         if contract is not None:
-            shifts = Shift.objects.filter(
-                employee=self.instance.employee,
-                started__lt=self.finished,
-                finished__gt=self.started,
-                contract__isnull=False,  # Ignore Shifts without contracts
-            ).exclude(pk=self.instance.pk)
+            shifts = (
+                Shift.objects.for_user(self.instance.employee)
+                .filter(
+                    started__lt=self.finished,
+                    finished__gt=self.started,
+                    contract__isnull=False,  # Ignore Shifts without contracts
+                )
+                .exclude(pk=self.instance.pk)
+                .select_related("contract")
+            )
 
         return shifts
 
@@ -515,3 +566,139 @@ class ShiftForm(forms.ModelForm):
             and (started.month == finished.month)
             and (started.day == finished.day)
         )
+
+
+class ShiftSearchForm(forms.Form):
+    """Search the notes and tags of the shifts of a user."""
+
+    q = forms.CharField(label=_("Search"), max_length=200)
+    contract = ContractChoiceField(
+        queryset=Contract.objects.none(),
+        empty_label=_("All contracts"),
+        required=False,
+        label=_("Contract"),
+    )
+    start = forms.DateField(
+        label=_("From"), required=False, input_formats=settings.DATE_INPUT_FORMATS
+    )
+    end = forms.DateField(
+        label=_("Until"), required=False, input_formats=settings.DATE_INPUT_FORMATS
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop("user")
+        super().__init__(*args, **kwargs)
+        self.fields["contract"].queryset = self.user.contract_set.all()
+        self.fields["contract"].registry = get_contract_registry(self.user)
+
+    def search(self):
+        """Return the matching shifts of the user, best matches first."""
+        shifts = Shift.objects.for_user(self.user)
+
+        contract = self.cleaned_data.get("contract")
+        if contract:
+            shifts = shifts.filter(contract=contract)
+
+        start = self.cleaned_data.get("start")
+        if start:
+            shifts = shifts.filter(
+                started__gte=timezone.make_aware(
+                    datetime.combine(start, datetime.min.time())
+                )
+            )
+
+        end = self.cleaned_data.get("end")
+        if end:
+            shifts = shifts.filter(
+                started__lt=timezone.make_aware(
+                    datetime.combine(end, datetime.min.time())
+                )
+                + timezone.timedelta(days=1)
+            )
+
+        return shifts.search(self.cleaned_data["q"])
+
+
+class MonthRangeForm(forms.Form):
+    """Select a range of months, e.g. for the tag analytics or statistics."""
+
+    MONTH_FORMATS = ["%Y-%m"]
+    # Every month is aggregated on its own, so we limit the length of a range.
+    MAX_MONTHS = 60
+
+    start = forms.DateField(
+        label=_("From month"), required=False, input_formats=MONTH_FORMATS
+    )
+    end = forms.DateField(
+        label=_("Until month"), required=False, input_formats=MONTH_FORMATS
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # Default to the current year up to the current month.
+        today = timezone.localdate()
+        cleaned_data["end"] = cleaned_data.get("end") or today
+        cleaned_data["start"] = cleaned_data.get("start") or today.replace(
+            month=1, day=1
+        )
+        start, end = cleaned_data["start"], cleaned_data["end"]
+        if start > end:
+            raise forms.ValidationError(
+                _("The first month must not be after the last month.")
+            )
+        if (end.year - start.year) * 12 + end.month - start.month >= self.MAX_MONTHS:
+            raise forms.ValidationError(
+                _("Select at most %(count)d months.") % {"count": self.MAX_MONTHS}
+            )
+        try:
+            month_bounds(end.year, end.month)
+        except (ValueError, OverflowError):
+            raise forms.ValidationError(_("The last month is out of range."))
+        return cleaned_data
+
+
+class ShiftImportForm(forms.Form):
+    """Upload a CSV or iCalendar file with shifts to import."""
+
+    READERS = {".csv": read_csv, ".ics": read_ics}
+
+    file = forms.FileField(
+        label=_("File"),
+        help_text=_(
+            "A CSV file with the columns started, finished, contract, key, "
+            "pause, tags and note, or an iCalendar (.ics) file."
+        ),
+    )
+    contract = ContractChoiceField(
+        queryset=Contract.objects.none(),
+        empty_label=_("None"),
+        required=False,
+        label=_("Default contract"),
+        help_text=_("Used for all shifts without a contract."),
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop("user")
+        super().__init__(*args, **kwargs)
+        self.fields["contract"].queryset = self.user.contract_set.all()
+        self.fields["contract"].registry = get_contract_registry(self.user)
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if os.path.splitext(upload.name)[1].lower() not in self.READERS:
+            raise forms.ValidationError(_("Please upload a CSV or iCalendar file."))
+        return upload
+
+    def import_shifts(self):
+        """Import the uploaded file, reading it line by line.
+
+        :return: `ImportResult`
+        """
+        upload = self.cleaned_data["file"]
+        reader = self.READERS[os.path.splitext(upload.name)[1].lower()]
+        upload.seek(0)
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        importer = ShiftImporter(
+            self.user, default_contract=self.cleaned_data.get("contract")
+        )
+        return importer.run(reader(lines))
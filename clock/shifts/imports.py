@@ -0,0 +1,389 @@
+"""Import shifts from CSV files and iCalendar files.
+
+The files are parsed as a stream and the rows are validated in batches. Every
+row has to pass the rules of `ShiftForm` (see `validate_shift_times()`).
+Overlaps and the maximum daily working time are checked for a whole batch at
+once, against a single query of the saved shifts. The valid shifts of a batch
+are inserted with `bulk_create()` in one transaction, so an import of tens of
+thousands of rows needs a few queries per batch instead of several per row.
+"""
+import csv
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+import pytz
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import dateparse, timezone
+from django.utils.translation import ugettext as _
+from taggit.models import Tag, TaggedItem
+from taggit.utils import parse_tags
+
+from clock.contracts.registry import get_contract_registry
+from clock.contracts.utils import WorkingHours
+from clock.shifts.compliance import MAX_DAILY_WORK
+from clock.shifts.models import Shift
+from clock.shifts.utils import invalidate_shifts, validate_shift_times
+
+BATCH_SIZE = 1000
+CSV_COLUMNS = ("started", "finished", "contract", "key", "pause", "tags", "note")
+
+RowError = namedtuple("RowError", ["line", "message"])
+
+
+class RowInvalid(Exception):
+    pass
+
+
+class ImportResult:
+    """The number of imported shifts and the errors of the rejected rows."""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def __repr__(self):
+        return "<ImportResult: {} created, {} errors>".format(
+            self.created, len(self.errors)
+        )
+
+
+def read_csv(lines):
+    """Yield the line number and the values of the rows of a CSV file.
+
+    The first row has to name the columns, see `CSV_COLUMNS`. Unknown columns
+    are ignored.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {
+            column: (row.get(column) or "").strip() for column in CSV_COLUMNS
+        }
+
+
+def _unfold(lines):
+    """Yield the line number and the unfolded content lines of an iCalendar
+    file.
+    """
+    number, current = 0, None
+    for index, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield number, current
+        number, current = index, line
+    if current is not None:
+        yield number, current
+
+
+def _unescape(value):
+    return (
+        value.replace("\\n", "\n")
+        .replace("\\N", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def _parse_ics_datetime(params, value):
+    """Return the aware datetime of a DATE-TIME value in UTC, with a TZID or
+    in the current timezone.
+    """
+    parsed = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return parsed.replace(tzinfo=timezone.utc)
+    tz = timezone.get_current_timezone()
+    if "TZID" in params:
+        tz = pytz.timezone(params["TZID"].strip('"'))
+    return timezone.make_aware(parsed, tz)
+
+
+def read_ics(lines):
+    """Yield the line number and the values of the events of an iCalendar
+    file. The summary and description are used as the note of the shift.
+    """
+    event = None
+    for number, line in _unfold(lines):
+        name, _sep, value = line.partition(":")
+        name, *params = name.split(";")
+        name = name.upper()
+        params = dict(param.partition("=")[::2] for param in params)
+
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {"line": number, "note": []}
+        elif event is None:
+            continue
+        elif name == "END" and value.upper() == "VEVENT":
+            values = dict.fromkeys(CSV_COLUMNS, "")
+            values.update(event)
+            values["note"] = "\n".join(event["note"])
+            yield values.pop("line"), values
+            event = None
+        elif name in ("DTSTART", "DTEND"):
+            try:
+                parsed = _parse_ics_datetime(params, value)
+            except (ValueError, pytz.UnknownTimeZoneError):
+                parsed = value
+            event["started" if name == "DTSTART" else "finished"] = parsed
+        elif name in ("SUMMARY", "DESCRIPTION"):
+            event["note"].append(_unescape(value))
+        elif name == "CATEGORIES":
+            event["tags"] = _unescape(value)
+
+
+def parse_datetime(value):
+    """Return an aware datetime for an ISO 8601 string or any of the
+    `DATETIME_INPUT_FORMATS`. Naive values are in the current timezone.
+    """
+    if isinstance(value, datetime):
+        return value
+    parsed = None
+    try:
+        parsed = dateparse.parse_datetime(value)
+    except ValueError:
+        pass
+    for fmt in settings.DATETIME_INPUT_FORMATS:
+        if parsed is not None:
+            break
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    if parsed is None:
+        raise RowInvalid(_("Enter a valid date/time."))
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ShiftImporter:
+    """
+    Validate and insert the rows of a file as shifts of a user.
+
+    Rows without a contract are assigned to the given default contract.
+    """
+
+    def __init__(self, user, default_contract=None, batch_size=BATCH_SIZE):
+        self.user = user
+        self.default_contract = default_contract
+        self.batch_size = batch_size
+        self.registry = get_contract_registry(user)
+        self.result = ImportResult()
+        self._months = set()
+        self._contract_ids = set()
+
+    def get_contract(self, value):
+        if not value:
+            return self.default_contract
+        if value.isdigit() and self.registry.get(int(value)):
+            return self.registry.get(int(value))
+        for contract in self.registry:
+            if contract.department == value:
+                return contract
+        raise RowInvalid(_("Unknown contract %s.") % value)
+
+    def build_shift(self, values):
+        """Return the unsaved shift and the tags of a row.
+
+        :raises RowInvalid: If the row breaks one of the rules of `ShiftForm`.
+        """
+        if not values["started"] or not values["finished"]:
+            raise RowInvalid(_("The start and end of the shift are required."))
+        started = parse_datetime(values["started"])
+        finished = parse_datetime(values["finished"])
+
+        try:
+            validate_shift_times(started, finished)
+        except ValidationError as error:
+            raise RowInvalid(" ".join(error.messages))
+
+        if values["key"] and values["key"] not in dict(Shift.KEY_CHOICES):
+            raise RowInvalid(_("Unknown key %s.") % values["key"])
+
+        try:
+            pause = WorkingHours.parse(values["pause"] or 0).to_timedelta()
+        except ValueError:
+            raise RowInvalid(_("Could not split the value you provided."))
+        if pause < timedelta(0) or pause >= finished - started:
+            raise RowInvalid(_("The pause has to be shorter than the shift."))
+
+        shift = Shift(
+            employee=self.user,
+            contract=self.get_contract(values["contract"]),
+            started=started,
+            finished=finished,
+            bool_finished=True,
+            pause_duration=pause,
+            duration=finished - started - pause,
+            key=values["key"],
+            note=values["note"],
+        )
+        return shift, parse_tags(values["tags"])
+
+    def check_batch(self, rows):
+        """
+        Reject the shifts of the batch that overlap with saved shifts or other
+        shifts of the batch, or that exceed the maximum working time of their
+        day. Like `ShiftForm`, overlaps are only checked between shifts with a
+        contract. Like the compliance check, sick and vacation shifts do not
+        count as working time.
+
+        :param rows: List of (line, shift, tags)
+        :return: The accepted rows
+        """
+        first = timezone.localtime(min(shift.started for _line, shift, _tags in rows))
+        last = timezone.localtime(max(shift.finished for _line, shift, _tags in rows))
+        first_day = timezone.make_aware(
+            datetime.combine(first.date(), datetime.min.time())
+        )
+        next_day = timezone.make_aware(
+            datetime.combine(last.date() + timedelta(days=1), datetime.min.time())
+        )
+        saved = (
+            Shift.objects.for_user(self.user)
+            .finished()
+            .filter(started__lt=next_day, finished__gt=first_day)
+            .values_list("started", "finished", "contract_id", "key", "duration")
+        )
+
+        # The saved shifts ordered by their start, with the latest end of all
+        # shifts up to each of them. A row overlaps a saved shift if one of
+        # the saved shifts that start before the row ends, ends after the row
+        # starts.
+        saved_intervals = sorted(
+            (started, finished)
+            for started, finished, contract_id, _key, _duration in saved
+            if contract_id
+        )
+        saved_starts = [started for started, _finished in saved_intervals]
+        saved_ends = list(
+            accumulate((finished for _started, finished in saved_intervals), max)
+        )
+
+        # Rows of the batch are accepted in the order they start, as long as
+        # they start after the latest end of the accepted rows.
+        rejected = set()
+        furthest = None
+        for line, shift, _tags in sorted(rows, key=lambda row: row[1].started):
+            if not shift.contract_id:
+                continue
+            before = bisect_left(saved_starts, shift.finished)
+            if (before and saved_ends[before - 1] > shift.started) or (
+                furthest is not None and shift.started < furthest
+            ):
+                rejected.add(line)
+                self.error(line, _("The shift overlaps with another shift."))
+            elif furthest is None or shift.finished > furthest:
+                furthest = shift.finished
+
+        worked = {}
+        for started, _finished, _contract_id, key, duration in saved:
+            if key:
+                continue
+            day = timezone.localdate(started)
+            worked[day] = worked.get(day, timedelta(0)) + (duration or timedelta(0))
+
+        accepted = []
+        for line, shift, tags in sorted(rows, key=lambda row: row[1].started):
+            if line in rejected:
+                continue
+            if shift.key:
+                accepted.append((line, shift, tags))
+                continue
+            day = timezone.localdate(shift.started)
+            total = worked.get(day, timedelta(0)) + shift.duration
+            if total > MAX_DAILY_WORK:
+                self.error(line, _("More than 10 hours of work on this day."))
+                continue
+            worked[day] = total
+            accepted.append((line, shift, tags))
+        return accepted
+
+    def insert_batch(self, rows):
+        """Insert the shifts of a batch together with their tags."""
+        shifts = [shift for _line, shift, _tags in rows]
+        with transaction.atomic():
+            Shift.objects.bulk_create(shifts)
+
+            names = {name for _line, _shift, tags in rows for name in tags}
+            # Only backends that return primary keys from bulk inserts (e.g.
+            # PostgreSQL) allow us to tag the shifts without another query.
+            if shifts[0].pk is not None:
+                if names:
+                    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+                    for name in names - set(tags):
+                        tags[name] = Tag.objects.create(name=name)
+                    content_type = ContentType.objects.get_for_model(Shift)
+                    TaggedItem.objects.bulk_create(
+                        TaggedItem(
+                            tag=tags[name],
+                            content_type=content_type,
+                            object_id=shift.pk,
+                        )
+                        for _line, shift, shift_tags in rows
+                        for name in shift_tags
+                    )
+                # The signals that keep the search vector up to date are not
+                # sent for bulk inserts.
+                Shift.objects.filter(
+                    pk__in=[shift.pk for shift in shifts]
+                ).update_search_vector()
+
+        for shift in shifts:
+            self._months.add(timezone.localdate(shift.started).replace(day=1))
+            self._contract_ids.add(shift.contract_id)
+        self.result.created += len(shifts)
+
+    def error(self, line, message):
+        self.result.errors.append(RowError(line, message))
+
+    def run(self, rows):
+        """
+        Import the (line, values) rows, e.g. of `read_csv()` or `read_ics()`.
+
+        :return: `ImportResult` with the number of created shifts and the
+            errors of all rejected rows, ordered by line.
+        """
+        rows = iter(rows)
+        while True:
+            try:
+                chunk = list(islice(rows, self.batch_size))
+            except (csv.Error, UnicodeDecodeError) as error:
+                self.error(0, _("The file could not be read: %s") % error)
+                break
+            if not chunk:
+                break
+
+            batch = []
+            for line, values in chunk:
+                try:
+                    batch.append((line,) + self.build_shift(values))
+                except RowInvalid as error:
+                    self.error(line, str(error))
+            accepted = self.check_batch(batch) if batch else []
+            if accepted:
+                self.insert_batch(accepted)
+
+        # Caches and balances are only updated once, after all batches.
+        if self.result.created:
+            invalidate_shifts(
+                [
+                    (
+                        self.user.pk,
+                        timezone.make_aware(
+                            datetime.combine(month, datetime.min.time())
+                        ),
+                    )
+                    for month in self._months
+                ],
+                self._contract_ids,
+            )
+        self.result.errors.sort()
+        return self.result
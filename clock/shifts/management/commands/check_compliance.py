@@ -0,0 +1,65 @@
+"""Check the shifts of a period against the working time rules.
+
+The shifts are checked in one streaming pass, so the whole organisation can be
+audited at once. The violations are written as CSV.
+"""
+import csv
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from clock.shifts.compliance import check_compliance
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    help = "Write the violations of the working time rules in a period as CSV."
+
+    def add_arguments(self, parser):
+        today = timezone.localdate()
+        parser.add_argument(
+            "--start",
+            type=parse_date,
+            default=today.replace(day=1),
+            help="First day (YYYY-MM-DD), defaults to the first of this month.",
+        )
+        parser.add_argument(
+            "--end",
+            type=parse_date,
+            default=today,
+            help="Last day (YYYY-MM-DD), defaults to today.",
+        )
+        parser.add_argument("--user", help="Only check the shifts of this username.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError("User {} does not exist.".format(options["user"]))
+
+        start, end = (
+            timezone.make_aware(datetime.combine(day, datetime.min.time()))
+            for day in (options["start"], options["end"] + timedelta(days=1))
+        )
+        writer = csv.writer(self.stdout)
+        writer.writerow(["employee_id", "date", "rule", "shift_id", "value"])
+        count = 0
+        for violation in check_compliance(start, end, user=user):
+            writer.writerow(
+                [
+                    violation.employee_id,
+                    violation.date.isoformat(),
+                    violation.rule,
+                    violation.shift_id,
+                    violation.get_value_display(),
+                ]
+            )
+            count += 1
+        self.stderr.write("Found {} violations.".format(count))
@@ -0,0 +1,59 @@
+"""Import the shifts of a user from a CSV or iCalendar file.
+
+Used to migrate the existing timesheets of new employees. Rows that can not
+be imported are written to stderr with their line number.
+"""
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from clock.contracts.models import Contract
+from clock.shifts.imports import BATCH_SIZE, ShiftImporter, read_csv, read_ics
+
+
+class Command(BaseCommand):
+    help = "Import the shifts of a user from a CSV or iCalendar (.ics) file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path", help="CSV or iCalendar file.")
+        parser.add_argument(
+            "--contract", type=int, help="ID of the contract of shifts without one."
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError("User {} does not exist.".format(options["username"]))
+
+        contract = None
+        if options["contract"]:
+            try:
+                contract = user.contract_set.get(pk=options["contract"])
+            except Contract.DoesNotExist:
+                raise CommandError(
+                    "User {} has no contract {}.".format(user, options["contract"])
+                )
+
+        extension = os.path.splitext(options["path"])[1].lower()
+        if extension not in (".csv", ".ics"):
+            raise CommandError("Only .csv and .ics files can be imported.")
+        reader = read_csv if extension == ".csv" else read_ics
+
+        importer = ShiftImporter(
+            user, default_contract=contract, batch_size=options["batch_size"]
+        )
+        with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+            result = importer.run(reader(lines))
+
+        for line, message in result.errors:
+            self.stderr.write("Line {}: {}".format(line, message))
+        self.stdout.write(
+            "Imported {} shifts, {} rows failed.".format(
+                result.created, len(result.errors)
+            )
+        )
@@ -0,0 +1,218 @@
+"""Generate large amounts of realistic data for load testing.
+
+Factories create one object per query, which makes it impossible to fill a
+database with production sized tables in a reasonable amount of time. This
+command builds all objects in memory and inserts them with `bulk_create` in
+large batches instead.
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+
+from clock.contracts.ledger import rebuild_balances
+from clock.contracts.models import Contract
+from clock.shifts.models import Shift
+from clock.users.models import User
+
+DEPARTMENTS = (
+    "Institut für Informatik",
+    "Institut für Mathematik",
+    "Institut für Physik",
+    "Universitätsbibliothek",
+    "Hochschulrechenzentrum",
+)
+TAGS = ("teaching", "research", "admin", "meeting", "support", "travel")
+NOTES = ("", "", "", "Tutorial", "Exam supervision", "Lab work", "Office hours")
+
+
+class Command(BaseCommand):
+    help = "Insert a large amount of deterministic fake data for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--years", type=int, default=1)
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the random generator."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--prefix", default="loadtest", help="Prefix of the generated usernames."
+        )
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password set for all of the generated users.",
+        )
+        parser.add_argument(
+            "--until",
+            default=None,
+            help="Last day (YYYY-MM-DD) to generate shifts for. Defaults to "
+            "yesterday.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        if options["until"]:
+            try:
+                until = datetime.strptime(options["until"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--until must be given as YYYY-MM-DD.")
+        else:
+            until = date.today() - timedelta(days=1)
+        since = until - timedelta(days=365 * options["years"])
+
+        if User.objects.filter(username__startswith=options["prefix"]).exists():
+            raise CommandError(
+                "Users with the prefix '{}' already exist. Choose another "
+                "--prefix.".format(options["prefix"])
+            )
+
+        start = time.time()
+        users = self.create_users(
+            options["users"], options["prefix"], options["password"]
+        )
+        contracts = self.create_contracts(users)
+        tags = [Tag.objects.get_or_create(name=name)[0] for name in TAGS]
+
+        shift_count = 0
+        batch = []
+        for user in users:
+            for shift in self.generate_shifts(user, contracts[user.pk], since, until):
+                batch.append(shift)
+                if len(batch) >= self.batch_size:
+                    shift_count += self.insert_shifts(batch, tags)
+                    batch = []
+        shift_count += self.insert_shifts(batch, tags)
+        rebuild_balances(
+            [contract.pk for user in users for contract in contracts[user.pk]]
+        )
+
+        self.stdout.write(
+            "Created {} users, {} contracts and {} shifts in {:.1f}s.".format(
+                len(users),
+                sum(len(c) for c in contracts.values()),
+                shift_count,
+                time.time() - start,
+            )
+        )
+
+    def create_users(self, count, prefix, password):
+        # Hashing a password is deliberately slow, so we only do it once.
+        password = make_password(password)
+        usernames = ["{}{}".format(prefix, i) for i in range(count)]
+        User.objects.bulk_create(
+            [
+                User(
+                    username=username,
+                    email="{}@example.com".format(username),
+                    password=password,
+                )
+                for username in usernames
+            ],
+            batch_size=self.batch_size,
+        )
+        # Not every database backend returns the primary keys of bulk inserted
+        # rows, so we always fetch the users again.
+        users = list(User.objects.filter(username__in=usernames).order_by("pk"))
+
+        # allauth only lets users with a verified email address log in.
+        EmailAddress.objects.bulk_create(
+            [
+                EmailAddress(user=user, email=user.email, verified=True, primary=True)
+                for user in users
+            ],
+            batch_size=self.batch_size,
+        )
+        return users
+
+    def create_contracts(self, users):
+        Contract.objects.bulk_create(
+            [
+                Contract(
+                    employee=user,
+                    department=department,
+                    hours=self.random.randrange(10, 80) * 60,
+                )
+                for user in users
+                for department in self.random.sample(
+                    DEPARTMENTS, self.random.randint(1, 2)
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+        contracts = {user.pk: [] for user in users}
+        for contract in Contract.objects.filter(employee__in=users).order_by("pk"):
+            contracts[contract.employee_id].append(contract)
+        return contracts
+
+    def generate_shifts(self, user, contracts, since, until):
+        """Yield unsaved shifts for every working day between since and until."""
+        day = since
+        while day <= until:
+            if day.weekday() < 5 and self.random.random() < 0.8:
+                started = timezone.make_aware(
+                    datetime.combine(day, datetime.min.time())
+                    + timedelta(minutes=self.random.randrange(84, 132) * 5)
+                )
+                duration = timedelta(minutes=self.random.randrange(36, 108) * 5)
+                pause = timedelta(minutes=0)
+                if duration > timedelta(hours=6):
+                    pause = timedelta(minutes=self.random.choice((30, 45, 60)))
+
+                key = ""
+                roll = self.random.random()
+                if roll < 0.03:
+                    key = "S"
+                elif roll < 0.06:
+                    key = "V"
+
+                yield Shift(
+                    employee=user,
+                    contract=self.random.choice(contracts + [None]),
+                    started=started,
+                    finished=started + duration + pause,
+                    duration=duration,
+                    pause_duration=pause,
+                    key=key,
+                    note=self.random.choice(NOTES),
+                )
+            day += timedelta(days=1)
+
+    def insert_shifts(self, shifts, tags):
+        """Insert one batch of shifts together with their tags."""
+        if not shifts:
+            return 0
+
+        with transaction.atomic():
+            Shift.objects.bulk_create(shifts, batch_size=self.batch_size)
+
+            # Only backends that return primary keys from bulk inserts (e.g.
+            # PostgreSQL) allow us to tag the shifts without another query.
+            if shifts[0].pk is not None:
+                content_type = ContentType.objects.get_for_model(Shift)
+                TaggedItem.objects.bulk_create(
+                    [
+                        TaggedItem(
+                            tag=tag, content_type=content_type, object_id=shift.pk
+                        )
+                        for shift in shifts
+                        for tag in self.random.sample(tags, self.random.randint(0, 2))
+                    ],
+                    batch_size=self.batch_size,
+                )
+                # The signals that keep the search vector up to date are not
+                # sent for bulk inserts.
+                Shift.objects.filter(
+                    pk__in=[shift.pk for shift in shifts]
+                ).update_search_vector()
+        return len(shifts)
@@ -0,0 +1,51 @@
+# Generated by Django 2.0.5 on 2026-10-19 18:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Same as `ShiftQuerySet.update_search_vector()`, which we can not use in a
+# migration.
+UPDATE_SEARCH_VECTOR = """
+UPDATE shifts_shift SET search_vector =
+    setweight(to_tsvector('simple', coalesce(note, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce((
+        SELECT string_agg(tag.name, ' ')
+        FROM taggit_taggeditem item
+        JOIN taggit_tag tag ON tag.id = item.tag_id
+        JOIN django_content_type type ON type.id = item.content_type_id
+        WHERE type.app_label = 'shifts' AND type.model = 'shift'
+        AND item.object_id = shifts_shift.id
+    ), '')), 'B')
+"""
+
+
+def update_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(UPDATE_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("taggit", "0002_auto_20150616_2121"),
+        ("shifts", "0007_auto_20180102_1638"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shift",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shift",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="shifts_shif_search__2a3061_gin"
+            ),
+        ),
+        migrations.RunPython(update_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.0.5 on 2026-10-19 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("shifts", "0008_shift_search_vector")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shift",
+            index=models.Index(
+                fields=["started"], name="shifts_shif_started_7e65e4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shift",
+            index=models.Index(
+                fields=["employee", "started"], name="shifts_shif_employe_23fee6_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+import datetime
+
+from django.db import migrations
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def build_balances(apps, schema_editor):
+    """Same as `clock.contracts.ledger.rebuild_balances()`, which we can not
+    use in a migration.
+
+    This lives in the shifts app, so the shifts are migrated before the
+    contracts app needs them.
+    """
+    Shift = apps.get_model("shifts", "Shift")
+    MonthlyBalance = apps.get_model("contracts", "MonthlyBalance")
+
+    rows = (
+        Shift.objects.filter(contract__isnull=False, duration__isnull=False)
+        .annotate(month=TruncMonth("started", tzinfo=timezone.get_current_timezone()))
+        .values("contract_id", "month")
+        .annotate(worked=Sum("duration"))
+        .order_by("contract_id", "month")
+    )
+    objects = []
+    totals = {}
+    for row in rows:
+        total = totals.get(row["contract_id"], datetime.timedelta(0)) + row["worked"]
+        totals[row["contract_id"]] = total
+        objects.append(
+            MonthlyBalance(
+                contract_id=row["contract_id"],
+                month=row["month"].date(),
+                worked=row["worked"],
+                worked_total=total,
+            )
+        )
+    MonthlyBalance.objects.bulk_create(objects, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contracts", "0004_monthlybalance"),
+        ("shifts", "0009_shift_started_indexes"),
+    ]
+
+    operations = [migrations.RunPython(build_balances, migrations.RunPython.noop)]
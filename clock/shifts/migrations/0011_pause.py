@@ -0,0 +1,43 @@
+# Generated by Django 2.0.5 on 2026-10-19 19:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("shifts", "0010_build_balances")]
+
+    operations = [
+        migrations.CreateModel(
+            name="Pause",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started", models.DateTimeField(verbose_name="Pause started")),
+                (
+                    "finished",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Pause finished"
+                    ),
+                ),
+                (
+                    "shift",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pauses",
+                        to="shifts.Shift",
+                        verbose_name="Shift",
+                    ),
+                ),
+            ],
+            options={"ordering": ["started"]},
+        )
+    ]
@@ -0,0 +1,34 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.db import migrations
+from django.db.models import DurationField, ExpressionWrapper, F
+
+
+def subtract_pauses(apps, schema_editor):
+    """The duration of a shift used to include its pauses. Subtract them and
+    rebuild the balance ledger, which sums up the durations.
+    """
+    Shift = apps.get_model("shifts", "Shift")
+    MonthlyBalance = apps.get_model("contracts", "MonthlyBalance")
+
+    updated = Shift.objects.filter(
+        finished__isnull=False, pause_duration__gt=timedelta(0)
+    ).update(
+        duration=ExpressionWrapper(
+            F("finished") - F("started") - F("pause_duration"),
+            output_field=DurationField(),
+        )
+    )
+    if updated:
+        MonthlyBalance.objects.all().delete()
+        import_module("clock.shifts.migrations.0010_build_balances").build_balances(
+            apps, schema_editor
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("shifts", "0011_pause")]
+
+    operations = [migrations.RunPython(subtract_pauses, migrations.RunPython.noop)]
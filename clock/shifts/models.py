@@ -1,10 +1,218 @@
 from datetime import timedelta
 
 from django.conf import settings
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import connections, models
+from django.db.models import (
+    Count,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.query import ValuesListIterable
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from taggit.managers import TaggableManager
+from taggit.models import TaggedItem
+
+from clock.pages.utils import month_bounds
+
+# Notes are written in German and English, so we do not use any stemming.
+SEARCH_CONFIG = "simple"
+
+# The length of a (finished) pause, computed by the database
+PAUSE_LENGTH = ExpressionWrapper(
+    F("finished") - F("started"), output_field=DurationField()
+)
+
+
+class ShiftRow:
+    """Lightweight, read-only representation of a shift.
+
+    Reports and exports only read a handful of columns, so there is no need to
+    build full model instances (with their taggit managers and related object
+    descriptors) for every row. Use `Shift.objects.rows()` to retrieve them.
+    """
+
+    __slots__ = (
+        "pk",
+        "employee_id",
+        "contract_id",
+        "department",
+        "started",
+        "finished",
+        "duration",
+        "pause_duration",
+        "key",
+    )
+
+    # Lookups passed to `values_list()`, in the same order as `__slots__`.
+    lookups = (
+        "pk",
+        "employee_id",
+        "contract_id",
+        "contract__department",
+        "started",
+        "finished",
+        "duration",
+        "pause_duration",
+        "key",
+    )
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return "<ShiftRow: {} {}>".format(self.pk, self.started)
+
+    @property
+    def contract_or_none(self):
+        """Return the name of the contract or None."""
+        return self.department
+
+    def get_key_display(self):
+        return dict(Shift.KEY_CHOICES).get(self.key, self.key)
+
+
+class ShiftRowIterable(ValuesListIterable):
+    """Yield a `ShiftRow` for each row of the queryset."""
+
+    def __iter__(self):
+        for values in super().__iter__():
+            yield ShiftRow(*values)
+
+
+class ShiftQuerySet(models.QuerySet):
+
+    def for_user(self, user):
+        """Return the shifts of the given user (or user id)."""
+        return self.filter(employee=user)
+
+    def finished(self):
+        """Return only shifts that are already finished."""
+        return self.filter(finished__isnull=False)
+
+    def in_month(self, year, month):
+        """Return the shifts started in the given month of the current timezone.
+
+        We filter on a range instead of `started__year` / `started__month`, so
+        the database is able to use an index on `started`.
+        """
+        try:
+            first, last = month_bounds(year, month)
+        except (ValueError, OverflowError):
+            # There are no shifts in months that do not exist.
+            return self.none()
+        return self.filter(started__gte=first, started__lt=last)
+
+    def with_related(self):
+        """Load the contract and tags of all shifts with a constant number of
+        queries, instead of one query per shift.
+        """
+        return self.select_related("contract").prefetch_related("tags")
+
+    def tag_totals(self):
+        """Return the total duration and the number of shifts per tag.
+
+        The shifts are joined with their tags and grouped in the database, so
+        this is a single query no matter how many shifts are tagged.
+        """
+        return (
+            self.filter(tags__isnull=False)
+            .values("tags__name")
+            .annotate(duration=Sum("duration"), count=Count("pk"))
+            .order_by("-duration", "tags__name")
+        )
+
+    def _supports_search(self):
+        return connections[self.db].vendor == "postgresql"
+
+    def update_search_vector(self):
+        """Update the full text search vector from the note and the tags."""
+        if not self._supports_search():
+            return 0
+
+        tags = (
+            TaggedItem.objects.filter(
+                content_type=ContentType.objects.get_for_model(self.model),
+                object_id=OuterRef("pk"),
+            )
+            .values("object_id")
+            .annotate(names=StringAgg("tag__name", " "))
+            .values("names")
+        )
+        return self.update(
+            search_vector=SearchVector("note", weight="A", config=SEARCH_CONFIG)
+            + SearchVector(
+                Subquery(tags, output_field=models.TextField()),
+                weight="B",
+                config=SEARCH_CONFIG,
+            )
+        )
+
+    def search(self, query):
+        """Return the shifts whose note or tags match the query, best matches
+        first. Databases without full text search fall back to `icontains`.
+        """
+        if not self._supports_search():
+            return (
+                self.filter(Q(note__icontains=query) | Q(tags__name__icontains=query))
+                .distinct()
+                .order_by("-started")
+            )
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        return (
+            self.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-started")
+        )
+
+    def update_durations(self):
+        """Recompute the pause duration and the net duration of the shifts.
+
+        The pauses of all shifts are summed up by a subquery of a single
+        UPDATE. Shifts without any recorded pauses keep their pause duration.
+        Like every `update()`, this does not send any signals.
+        """
+        pauses = (
+            Pause.objects.filter(shift=OuterRef("pk"))
+            .finished()
+            .order_by()
+            .values("shift")
+            .annotate(total=Sum(PAUSE_LENGTH))
+            .values("total")
+        )
+        pause_duration = Coalesce(
+            Subquery(pauses, output_field=DurationField()), F("pause_duration")
+        )
+        return self.update(
+            pause_duration=pause_duration,
+            duration=ExpressionWrapper(
+                F("finished") - F("started") - pause_duration,
+                output_field=DurationField(),
+            ),
+        )
+
+    def rows(self):
+        """Return the shifts as `ShiftRow` objects instead of model instances."""
+        clone = self.values_list(*ShiftRow.lookups)
+        clone._iterable_class = ShiftRowIterable
+        return clone
 
 
 class Shift(models.Model):
@@ -31,6 +239,7 @@ class Shift(models.Model):
     duration = models.DurationField(
         blank=True, null=True, verbose_name=_("Shift duration")
     )
+    # Start of the running pause, see `Pause`
     pause_started = models.DateTimeField(blank=True, null=True)
     pause_duration = models.DurationField(
         default=timedelta(seconds=0), verbose_name=_("Pause duration")
@@ -39,9 +248,18 @@ class Shift(models.Model):
     note = models.TextField(_("Note"), blank=True)
     tags = TaggableManager(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Kept up to date by `clock.shifts.signals`
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ShiftQuerySet.as_manager()
 
     class Meta:
         ordering = ["-finished"]
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            models.Index(fields=["started"]),
+            models.Index(fields=["employee", "started"]),
+        ]
 
     def __str__(self):
         """
@@ -49,6 +267,15 @@ class Shift(models.Model):
         """
         return str(self.employee)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the values loaded from the database, so signal handlers are
+        able to tell what changed when the shift is saved again.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     @property
     def is_finished(self):
         """Return True if `Shift` is finished. Otherwise return False.
@@ -68,3 +295,74 @@ class Shift(models.Model):
         if self.contract:
             return self.contract.department
         return None
+
+    @property
+    def is_paused(self):
+        return self.pause_started is not None
+
+    def start_pause(self, started):
+        """Start a new pause of the running shift."""
+        Pause.objects.create(shift=self, started=started)
+        self.pause_started = started
+        self.save(update_fields=["pause_started"])
+
+    def stop_pause(self, finished):
+        """Finish the running pause and update the durations of the shift."""
+        self.pauses.filter(finished__isnull=True).update(finished=finished)
+        self.pause_started = None
+        self.update_duration()
+
+    def update_duration(self):
+        """Sum up the pauses of the shift and save its net duration.
+
+        Shifts without any recorded pauses keep their pause duration.
+        """
+        total = self.pauses.finished().aggregate(total=Sum(PAUSE_LENGTH))["total"]
+        if total is not None:
+            self.pause_duration = total
+        if self.finished:
+            self.duration = self.finished - self.started - self.pause_duration
+        self.save(update_fields=["pause_started", "pause_duration", "duration"])
+
+
+class PauseQuerySet(models.QuerySet):
+
+    def finished(self):
+        """Return only pauses that are already finished."""
+        return self.filter(finished__isnull=False)
+
+    def ranges(self):
+        """Return the start and end of the finished pauses per shift id.
+
+        The pauses of any number of shifts are loaded with a single query.
+        """
+        ranges = {}
+        for shift_id, started, finished in (
+            self.finished()
+            .order_by("started")
+            .values_list("shift_id", "started", "finished")
+        ):
+            ranges.setdefault(shift_id, []).append((started, finished))
+        return ranges
+
+
+class Pause(models.Model):
+    """A break during a shift. The duration of the shift excludes its pauses,
+    their sum is stored in `Shift.pause_duration`.
+    """
+
+    shift = models.ForeignKey(
+        Shift, on_delete=models.CASCADE, related_name="pauses", verbose_name=_("Shift")
+    )
+    started = models.DateTimeField(verbose_name=_("Pause started"))
+    finished = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Pause finished")
+    )
+
+    objects = PauseQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["started"]
+
+    def __str__(self):
+        return "{} – {}".format(self.started, self.finished or "")
@@ -0,0 +1,112 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from clock.contracts.ledger import add_worked_time, rebuild_balances
+from clock.contracts.models import Contract
+from clock.shifts.cache import bump_data_version, touch_contracts, touch_month
+from clock.shifts.models import Shift
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def invalidate_user_data(sender, instance, **kwargs):
+    """Bump the data version of the employee whenever a shift or contract
+    changes, so cached fragments of the employee are not used anymore.
+    """
+    bump_data_version(instance.employee_id)
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def update_balance(sender, instance, signal, created=False, **kwargs):
+    """Move the duration of the shift in the balance ledger from its old to
+    its new contract and month.
+
+    This has to run before `touch_shift_month()`, which updates the loaded
+    value of `started`.
+    """
+    fields = ("contract_id", "started", "duration")
+    loaded_values = getattr(instance, "_loaded_values", {})
+    current = tuple(getattr(instance, field) for field in fields)
+
+    if created:
+        old = None
+    elif all(field in loaded_values for field in fields):
+        old = tuple(loaded_values[field] for field in fields)
+    elif signal is post_delete:
+        old = current
+    else:
+        # The shift was loaded without some of the fields, so we can not tell
+        # what changed.
+        if instance.contract_id:
+            rebuild_balances([instance.contract_id])
+        return
+
+    if signal is post_delete:
+        current = None
+    if old == current:
+        return
+
+    if old and old[0] and old[2]:
+        add_worked_time(old[0], old[1], -old[2])
+    if current and current[0] and current[2]:
+        add_worked_time(*current)
+    if current:
+        # `touch_shift_month()` still needs the old value of `started` and
+        # updates it itself.
+        loaded_values["contract_id"] = instance.contract_id
+        loaded_values["duration"] = instance.duration
+        instance._loaded_values = loaded_values
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def touch_shift_month(sender, instance, **kwargs):
+    """Update the change stamp of the month of the shift. If the shift was
+    moved into another month, the old month changed as well.
+    """
+    touch_month(instance.employee_id, instance.started)
+
+    loaded_values = getattr(instance, "_loaded_values", {})
+    loaded_started = loaded_values.get("started")
+    if loaded_started and loaded_started != instance.started:
+        touch_month(instance.employee_id, loaded_started)
+    loaded_values["started"] = instance.started
+
+
+@receiver(post_save, sender=Shift)
+def update_search_vector(sender, instance, created=False, update_fields=None, **kwargs):
+    """Update the search vector if the note may have changed. Changes of the
+    tags are handled by `update_search_vector_of_tags()`.
+    """
+    if update_fields is not None and "note" not in update_fields:
+        return
+    loaded_values = getattr(instance, "_loaded_values", {})
+    if not created and loaded_values.get("note") == instance.note:
+        return
+    Shift.objects.filter(pk=instance.pk).update_search_vector()
+    loaded_values["note"] = instance.note
+    instance._loaded_values = loaded_values
+
+
+@receiver(m2m_changed, sender=Shift.tags.through)
+def update_search_vector_of_tags(sender, instance, action, **kwargs):
+    """The tags are saved after the shift itself, so the search vector has to
+    be updated again.
+    """
+    if isinstance(instance, Shift) and action in (
+        "post_add",
+        "post_remove",
+        "post_clear",
+    ):
+        Shift.objects.filter(pk=instance.pk).update_search_vector()
+        # The tag analytics of the month changed.
+        touch_month(instance.employee_id, instance.started)
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+def touch_contract(sender, instance, **kwargs):
+    touch_contracts(instance.employee_id)
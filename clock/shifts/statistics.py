@@ -0,0 +1,173 @@
+"""Statistics over the shifts of a user, computed with NumPy.
+
+The shifts of a range are loaded once as arrays of seconds since the epoch
+and all statistics are computed with vectorized operations on these arrays,
+so even users with several years of shifts do not need a loop per shift.
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.db.models.functions import Extract
+from django.utils import timezone
+
+from clock.pages.utils import month_bounds
+from clock.shifts.models import Shift
+
+DAY = 24 * 60 * 60
+# The minimum rest period between two working days (§ 5 ArbZG)
+MIN_REST = 11 * 60 * 60
+# Shorter gaps continue the same work period, e.g. shifts that were split at
+# midnight.
+CONTINUATION = 15 * 60
+# Upper bounds (in hours) of the bins of the shift length histogram
+HISTOGRAM_BINS = list(range(1, 13)) + [np.inf]
+
+
+def month_range(start, end):
+    """Return the aware datetimes of the beginning of the month of `start`
+    and of the month after `end`.
+    """
+    first, _next = month_bounds(start.year, start.month)
+    _first, last = month_bounds(end.year, end.month)
+    return first, last
+
+
+def load_shifts(user, start, end):
+    """
+    Returns the finished shifts of the user started between the datetimes
+    start (inclusive) and end (exclusive), ordered by their start.
+
+    :return: Dict of arrays with the UTC and local start and end times in
+        seconds since the epoch and the pauses in seconds.
+    """
+    # The database converts the values to seconds, local times with the
+    # current timezone as if they were UTC.
+    rows = list(
+        Shift.objects.for_user(user)
+        .finished()
+        .filter(started__gte=start, started__lt=end)
+        .order_by("started")
+        .values_list(
+            Extract("started", "epoch", tzinfo=timezone.utc),
+            Extract("finished", "epoch", tzinfo=timezone.utc),
+            Extract("started", "epoch"),
+            Extract("finished", "epoch"),
+            Extract("pause_duration", "epoch"),
+        )
+    )
+    started, finished, local_started, local_finished, pause = (
+        np.array(rows, dtype=np.float64).reshape(-1, 5).T.astype(np.int64)
+    )
+    return {
+        "started": started,
+        "finished": finished,
+        "local_started": local_started,
+        "local_finished": local_finished,
+        "pause": pause,
+    }
+
+
+def _totals(keys, weights):
+    """Sum up the weights per distinct key."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=weights, minlength=len(unique))
+
+
+def _epoch_date(days):
+    return date(1970, 1, 1) + timedelta(days=int(days))
+
+
+def _time_of_day(seconds):
+    seconds = int(round(seconds)) % DAY
+    return "%02d:%02d" % divmod(seconds // 60, 60)
+
+
+def _mean_time_of_day(seconds):
+    """Return the circular mean of times of day in seconds, so 23:00 and 01:00
+    average to midnight instead of noon.
+    """
+    angles = seconds % DAY * (2 * np.pi / DAY)
+    mean = np.arctan2(np.sin(angles).mean(), np.cos(angles).mean())
+    return mean % (2 * np.pi) * DAY / (2 * np.pi)
+
+
+def compute_statistics(shifts):
+    """
+    Compute the statistics of the shifts returned by `load_shifts()`.
+
+    Shifts count for the (local) day they started on. Durations are net of
+    pauses.
+    """
+    started, finished = shifts["started"], shifts["finished"]
+    local_started = shifts["local_started"]
+    net = np.maximum(finished - started - shifts["pause"], 0)
+
+    days = local_started // DAY
+    # 1970-01-01 was a Thursday, Monday is 0.
+    weekdays = (days + 3) % 7
+    weeks = days - weekdays
+
+    day_keys, day_totals = _totals(days, net)
+    week_keys, week_totals = _totals(weeks, net)
+    weekday_totals = np.bincount(weekdays, weights=net, minlength=7)
+    histogram, _edges = np.histogram(net / 3600, bins=[0] + HISTOGRAM_BINS)
+
+    # Shifts separated by short gaps form one work period, e.g. shifts that
+    # were split at midnight. Rest periods are the gaps before work periods
+    # that start on a later day than the previous work period.
+    gaps = started[1:] - finished[:-1]
+    period_starts = np.ones(len(days), dtype=bool)
+    period_starts[1:] = gaps >= CONTINUATION
+    period_days = days[period_starts][np.cumsum(period_starts) - 1]
+    violations = np.flatnonzero(
+        period_starts[1:] & (days[1:] > period_days[:-1]) & (gaps < MIN_REST)
+    )
+
+    def duration(seconds):
+        return timedelta(seconds=int(seconds))
+
+    return {
+        "count": len(net),
+        "total": duration(net.sum()),
+        "days": [
+            (_epoch_date(day), duration(total))
+            for day, total in zip(day_keys, day_totals)
+        ],
+        "average_day": duration(day_totals.mean()) if len(day_totals) else None,
+        "longest_day": duration(day_totals.max()) if len(day_totals) else None,
+        "weeks": [
+            (_epoch_date(week), duration(total))
+            for week, total in zip(week_keys, week_totals)
+        ],
+        "weekdays": [duration(total) for total in weekday_totals],
+        "average_start": (
+            _time_of_day(_mean_time_of_day(local_started)) if len(net) else None
+        ),
+        "average_end": (
+            _time_of_day(_mean_time_of_day(shifts["local_finished"]))
+            if len(net)
+            else None
+        ),
+        "rest_violations": [
+            (
+                datetime.fromtimestamp(int(finished[i]), timezone.utc),
+                datetime.fromtimestamp(int(started[i + 1]), timezone.utc),
+                duration(gaps[i]),
+            )
+            for i in violations
+        ],
+        # (lower bound, upper bound or None, number of shifts)
+        "histogram": [
+            (lower, None if upper == np.inf else upper, count)
+            for lower, upper, count in zip(
+                [0] + HISTOGRAM_BINS, HISTOGRAM_BINS, histogram.tolist()
+            )
+        ],
+    }
+
+
+def get_statistics(user, start, end):
+    """Return the statistics of the shifts of the user in the months from
+    start to end (inclusive).
+    """
+    return compute_statistics(load_shifts(user, *month_range(start, end)))
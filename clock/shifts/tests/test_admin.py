@@ -0,0 +1,144 @@
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from clock.contracts.models import Contract
+from clock.shifts.models import Pause, Shift
+
+
+class ShiftAdminTest(TestCase):
+
+    def setUp(self):
+        self.admin = self.make_user("admin")
+        self.admin.is_staff = self.admin.is_superuser = True
+        self.admin.save()
+        self.user1 = self.make_user("user1")
+        self.contract1 = Contract.objects.create(
+            employee=self.user1, department="Tutor", hours=600
+        )
+        self.started = timezone.make_aware(timezone.datetime(2016, 5, 31, 20))
+
+    def action(self, action, shifts, **data):
+        data.update(
+            {"action": action, "_selected_action": [shift.pk for shift in shifts]}
+        )
+        return self.post("admin:shifts_shift_changelist", data=data)
+
+    def test_changelist(self):
+        """Assert that the number of queries does not grow with the shifts."""
+        for days in range(20):
+            Shift.objects.create(
+                employee=self.user1,
+                contract=self.contract1,
+                started=self.started - timezone.timedelta(days=days),
+            )
+
+        with self.login(username=self.admin.username, password="password"):
+            with self.assertNumQueries(11):
+                self.get_check_200("admin:shifts_shift_changelist")
+
+    def test_close_and_split_shifts(self):
+        running = Shift.objects.create(employee=self.user1, started=self.started)
+        self.assertEqual(Shift.objects.filter(duration__isnull=True).count(), 1)
+
+        with self.login(username=self.admin.username, password="password"):
+            self.action("close_shifts", [running])
+            running.refresh_from_db()
+            self.assertTrue(running.bool_finished)
+            self.assertEqual(running.duration, running.finished - running.started)
+
+            running.finished = self.started + timezone.timedelta(hours=6)
+            running.save()
+            self.action("split_shifts", [running])
+
+        first, second = Shift.objects.order_by("started")
+        self.assertEqual(first.pk, running.pk)
+        self.assertEqual(first.duration, timezone.timedelta(hours=4))
+        self.assertEqual(second.started, first.finished)
+        self.assertEqual(second.duration, timezone.timedelta(hours=2))
+
+    def test_split_shifts_ending_at_midnight(self):
+        """Assert that shifts ending exactly at midnight or starting after it
+        are not split."""
+        hours = timezone.timedelta(hours=1)
+        shifts = [
+            Shift.objects.create(
+                employee=self.user1,
+                started=self.started + start * hours,
+                finished=self.started + (start + 2) * hours,
+                duration=2 * hours,
+            )
+            for start in [2, 4.5]
+        ]
+
+        with self.login(username=self.admin.username, password="password"):
+            self.action("split_shifts", shifts)
+
+        self.assertEqual(list(Shift.objects.order_by("started")), shifts)
+
+    def test_split_shifts_with_pauses(self):
+        """Assert that the note, tags and pauses after midnight are moved to
+        the new shift and both durations are net of their pauses.
+        """
+        hours = timezone.timedelta(hours=1)
+        shift = Shift.objects.create(
+            employee=self.user1,
+            started=self.started,
+            finished=self.started + 6 * hours,
+            duration=6 * hours,
+            note="Night shift",
+        )
+        shift.tags.add("night")
+        for start, minutes in [(1, 30), (3 + 5 / 6, 20), (5, 15)]:
+            started = self.started + start * hours
+            Pause.objects.create(
+                shift=shift,
+                started=started,
+                finished=started + timezone.timedelta(minutes=minutes),
+            )
+        # Without recorded pauses, only as much pause as fits stays before
+        # midnight.
+        late = Shift.objects.create(
+            employee=self.user1,
+            started=self.started + 3.5 * hours,
+            finished=self.started + 7 * hours,
+            duration=2.5 * hours,
+            pause_duration=hours,
+        )
+
+        with self.login(username=self.admin.username, password="password"):
+            self.action("split_shifts", [shift, late])
+
+        first, second = Shift.objects.filter(note="Night shift").order_by("started")
+        self.assertEqual(first.pk, shift.pk)
+        self.assertEqual(first.pause_duration, timezone.timedelta(minutes=40))
+        self.assertEqual(first.duration, timezone.timedelta(hours=3, minutes=20))
+        self.assertEqual(second.pause_duration, timezone.timedelta(minutes=25))
+        self.assertEqual(second.duration, timezone.timedelta(hours=1, minutes=35))
+        self.assertEqual(list(second.tags.names()), ["night"])
+        self.assertEqual(
+            [pause.started for pause in second.pauses.all()],
+            [second.started, self.started + 5 * hours],
+        )
+        self.assertEqual(first.pauses.last().finished, second.started)
+        self.assertTrue(Shift.objects.search("night").filter(pk=second.pk).exists())
+
+        late.refresh_from_db()
+        self.assertEqual(late.pause_duration, 0.5 * hours)
+        self.assertEqual(late.duration, timezone.timedelta(0))
+        rest = Shift.objects.get(started=late.finished, note="")
+        self.assertEqual(rest.pause_duration, 0.5 * hours)
+        self.assertEqual(rest.duration, 2.5 * hours)
+
+    def test_reassign_contract(self):
+        shift = Shift.objects.create(employee=self.user1, started=self.started)
+        other = Shift.objects.create(
+            employee=self.make_user("user2"), started=self.started
+        )
+
+        with self.login(username=self.admin.username, password="password"):
+            self.action("reassign_contract", [shift, other], contract=self.contract1.pk)
+
+        shift.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(shift.contract, self.contract1)
+        self.assertIsNone(other.contract)
@@ -0,0 +1,56 @@
+"""Tests for the management commands of the shift app."""
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from test_plus.test import TestCase
+
+from clock.contracts.models import Contract
+from clock.shifts.models import Shift
+from clock.users.models import User
+
+
+class SeedClockTest(TestCase):
+    """Test the `seed_clock` command used to generate load test data."""
+
+    def seed(self, **kwargs):
+        options = {"users": 2, "years": 1, "until": "2018-01-31", "stdout": StringIO()}
+        options.update(kwargs)
+        call_command("seed_clock", **options)
+
+    def test_seed_creates_data(self):
+        self.seed(batch_size=50)
+
+        users = User.objects.filter(username__startswith="loadtest")
+        self.assertEqual(users.count(), 2)
+        self.assertTrue(users[0].emailaddress_set.get().verified)
+        self.assertTrue(Contract.objects.filter(employee__in=users).exists())
+
+        shifts = Shift.objects.filter(employee__in=users)
+        # Roughly 80% of all working days in one year should have a shift.
+        self.assertGreater(shifts.count(), 2 * 150)
+        for shift in shifts[:20]:
+            self.assertEqual(
+                shift.finished - shift.started - shift.pause_duration, shift.duration
+            )
+            self.assertLess(shift.started.weekday(), 5)
+
+    def test_seed_is_deterministic(self):
+        self.seed(prefix="first", seed=42)
+        self.seed(prefix="second", seed=42)
+
+        first = list(
+            Shift.objects.filter(employee__username__startswith="first")
+            .order_by("pk")
+            .values_list("started", "duration", "key")
+        )
+        second = list(
+            Shift.objects.filter(employee__username__startswith="second")
+            .order_by("pk")
+            .values_list("started", "duration", "key")
+        )
+        self.assertEqual(first, second)
+
+    def test_seed_refuses_existing_prefix(self):
+        self.seed(users=1)
+        with self.assertRaises(CommandError):
+            self.seed(users=1)
@@ -0,0 +1,179 @@
+"""Tests for the working time compliance checks."""
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from test_plus import TestCase
+
+from clock.shifts import compliance
+from clock.shifts.compliance import check_compliance
+from clock.shifts.models import Shift
+from clock.shifts.statistics import month_range
+
+
+class ComplianceTest(TestCase):
+    def setUp(self):
+        self.user = self.make_user()
+        self.other = self.make_user("other")
+        monday = timezone.datetime(2016, 5, 2)
+        for user, day, hour, minutes, pause in [
+            # 10:15 hours of work with enough breaks.
+            (self.user, 0, 7, 6 * 60 + 30, 15),
+            (self.user, 0, 14, 4 * 60, 0),
+            # Only 8 hours of rest, 6:15 hours of work without a break.
+            (self.user, 1, 2, 6 * 60 + 15, 0),
+            # 9 hours of work with a gap of 30 minutes as break.
+            (self.user, 2, 8, 5 * 60, 0),
+            (self.user, 2, 13.5, 4 * 60, 0),
+            # 8 hours without a break.
+            (self.other, 0, 8, 8 * 60, 0),
+            (self.other, 1, 8, 8 * 60, 30),
+        ]:
+            started = timezone.make_aware(monday + timedelta(days=day, hours=hour))
+            Shift.objects.create(
+                employee=user,
+                started=started,
+                finished=started + timedelta(minutes=minutes),
+                duration=timedelta(minutes=minutes),
+                pause_duration=timedelta(minutes=pause),
+            )
+        # All shifts were recorded on the same day, except for one.
+        Shift.objects.update(created_at=timezone.make_aware(monday.replace(hour=20)))
+        Shift.objects.filter(employee=self.other, started__day=3).update(
+            created_at=timezone.make_aware(timezone.datetime(2016, 5, 20))
+        )
+        # A running shift does not count.
+        Shift.objects.create(employee=self.user, started=timezone.now())
+
+    def check(self, user=None):
+        return [
+            (violation.employee_id, violation.rule, violation.date, violation.value)
+            for violation in check_compliance(
+                *month_range(date(2016, 5, 1), date(2016, 5, 1)), user=user
+            )
+        ]
+
+    def test_violations(self):
+        self.assertEqual(
+            self.check(),
+            [
+                (
+                    self.user.pk,
+                    compliance.DAILY_WORK,
+                    date(2016, 5, 2),
+                    timedelta(hours=10, minutes=15),
+                ),
+                (self.user.pk, compliance.REST, date(2016, 5, 3), timedelta(hours=8)),
+                (self.user.pk, compliance.BREAKS, date(2016, 5, 3), timedelta(0)),
+                (self.other.pk, compliance.BREAKS, date(2016, 5, 2), timedelta(0)),
+                (
+                    self.other.pk,
+                    compliance.LATE_RECORD,
+                    date(2016, 5, 3),
+                    timedelta(days=17),
+                ),
+            ],
+        )
+
+    def test_rest_after_split_shift(self):
+        """The rest period is measured from the end of a shift that was split
+        at midnight, and the gap to the next shift is no break.
+        """
+        for day, hour, minutes in [
+            (6, 18, 5 * 60 + 55),
+            (7, 0, 2 * 60),
+            (7, 8, 7 * 60),
+        ]:
+            started = timezone.make_aware(timezone.datetime(2016, 6, day, hour))
+            Shift.objects.create(
+                employee=self.other,
+                started=started,
+                finished=started + timedelta(minutes=minutes),
+                duration=timedelta(minutes=minutes),
+            )
+        Shift.objects.filter(started__month=6).update(
+            created_at=timezone.make_aware(timezone.datetime(2016, 6, 8))
+        )
+
+        violations = [
+            (violation.rule, violation.date, violation.value)
+            for violation in check_compliance(
+                *month_range(date(2016, 6, 1), date(2016, 6, 1))
+            )
+        ]
+
+        self.assertEqual(
+            violations,
+            [
+                (compliance.BREAKS, date(2016, 6, 6), timedelta(0)),
+                (compliance.REST, date(2016, 6, 7), timedelta(hours=6)),
+                (compliance.BREAKS, date(2016, 6, 7), timedelta(0)),
+            ],
+        )
+
+    def test_sick_and_vacation_shifts_are_no_work(self):
+        for day, key in [(6, "V"), (7, "S"), (8, "")]:
+            started = timezone.make_aware(timezone.datetime(2016, 6, day, 8))
+            Shift.objects.create(
+                employee=self.other,
+                started=started,
+                finished=started + timedelta(hours=8),
+                duration=timedelta(hours=8),
+                key=key,
+            )
+        Shift.objects.filter(started__month=6).update(
+            created_at=timezone.make_aware(timezone.datetime(2016, 6, 9))
+        )
+        Shift.objects.filter(started__month=6, started__day=6).update(
+            created_at=timezone.make_aware(timezone.datetime(2016, 6, 20))
+        )
+
+        violations = [
+            (violation.rule, violation.date)
+            for violation in check_compliance(
+                *month_range(date(2016, 6, 1), date(2016, 6, 1))
+            )
+        ]
+
+        self.assertEqual(
+            violations,
+            [
+                (compliance.LATE_RECORD, date(2016, 6, 6)),
+                (compliance.BREAKS, date(2016, 6, 8)),
+            ],
+        )
+
+    def test_user(self):
+        self.assertEqual(
+            [row[0] for row in self.check(self.other)], [self.other.pk] * 2
+        )
+
+    def test_streaming(self):
+        """Assert that all shifts are checked with a single query."""
+        with self.assertNumQueries(1):
+            self.check()
+
+    def test_view(self):
+        self.assertLoginRequired("shift:compliance")
+        with self.login(username=self.user.username, password="password"):
+            response = self.get_check_200(
+                "shift:compliance", data={"start": "2016-05", "end": "2016-05"}
+            )
+            self.assertEqual(len(response.context["violations"]), 3)
+            self.assertContains(response, "Less than 11 hours of rest")
+            self.assertContains(response, "08:00")
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "check_compliance",
+            "--start=2016-05-01",
+            "--end=2016-05-31",
+            "--user=other",
+            stdout=out,
+            stderr=StringIO(),
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[2].endswith(",17 days"))
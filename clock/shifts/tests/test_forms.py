@@ -7,7 +7,7 @@ from test_plus.test import TestCase
 
 from clock.contracts.models import Contract
 from clock.shifts.forms import ClockInForm, ClockOutForm, ShiftForm
-from clock.shifts.models import Shift
+from clock.shifts.models import Pause, Shift
 
 
 class ClockInOutFormTest(TestCase):
@@ -122,6 +122,41 @@ class ClockInOutFormTest(TestCase):
         )
         assert new_shift.duration == timedelta(0, 7200)
 
+    def test_split_shifts_with_pauses(self):
+        """Test that pauses after midnight are moved to the shift of the next
+        day when splitting a shift."""
+        started = timezone.make_aware(timezone.datetime(2017, 1, 1, 23))
+        form = ClockInForm(
+            data={"started": started, "contract": self.contract.pk}, user=self.user
+        )
+        assert form.is_valid()
+        form.clock_in()
+
+        shift = Shift.objects.get(employee=self.user, finished__isnull=True)
+        shift.start_pause(timezone.make_aware(timezone.datetime(2017, 1, 1, 23, 30)))
+        shift.stop_pause(timezone.make_aware(timezone.datetime(2017, 1, 2, 0, 10)))
+        shift.start_pause(timezone.make_aware(timezone.datetime(2017, 1, 2, 0, 40)))
+        shift.stop_pause(timezone.make_aware(timezone.datetime(2017, 1, 2, 1, 40)))
+
+        form_out = ClockOutForm(
+            data={"finished": timezone.make_aware(timezone.datetime(2017, 1, 2, 3))},
+            instance=shift,
+        )
+        assert form_out.is_valid()
+        form_out.clock_out()
+
+        shift.refresh_from_db()
+        assert shift.pause_duration == timedelta(minutes=25)
+        assert shift.duration == timedelta(minutes=30)
+
+        new_shift = Shift.objects.get(
+            employee=self.user,
+            started=timezone.make_aware(timezone.datetime(2017, 1, 2, 0, 0)),
+        )
+        assert new_shift.pause_duration == timedelta(minutes=70)
+        assert new_shift.duration == timedelta(minutes=110)
+        assert Pause.objects.filter(shift=new_shift).count() == 2
+
     def test_split_shifts_that_are_too_short(self):
         """Test that we handle shifts that are too short after splitting correctly."""
 
@@ -0,0 +1,278 @@
+"""Tests for the import of shifts from CSV and iCalendar files."""
+import os
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from test_plus import TestCase
+
+from clock.contracts.models import Contract
+from clock.shifts.imports import ShiftImporter, read_csv, read_ics
+from clock.shifts.models import Shift
+
+HEADER = "started,finished,contract,key,pause,tags,note\n"
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def csv_lines(*rows):
+    return StringIO(HEADER + "".join(row + "\n" for row in rows))
+
+
+class ShiftImporterTest(TestCase):
+    def setUp(self):
+        self.user = self.make_user()
+        self.contract = Contract.objects.create(
+            employee=self.user, department="Test department", hours="50"
+        )
+
+    def run_import(self, *rows, **kwargs):
+        kwargs.setdefault("default_contract", self.contract)
+        importer = ShiftImporter(self.user, **kwargs)
+        return importer.run(read_csv(csv_lines(*rows)))
+
+    def test_import_valid_rows(self):
+        result = self.run_import(
+            '2016-05-02 08:00,2016-05-02 12:30,,,00:30,"work, meeting",Planning',
+            "2016-05-03T09:00:00,2016-05-03T11:00:00,Test department,S,,,",
+        )
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [])
+        first, second = Shift.objects.order_by("started")
+        self.assertEqual(first.started, aware(2016, 5, 2, 8))
+        self.assertEqual(first.duration, timedelta(hours=4))
+        self.assertEqual(first.pause_duration, timedelta(minutes=30))
+        self.assertEqual(first.contract, self.contract)
+        self.assertEqual(first.note, "Planning")
+        self.assertEqual(sorted(first.tags.names()), ["meeting", "work"])
+        self.assertTrue(first.bool_finished)
+        self.assertEqual(second.key, "S")
+        self.assertEqual(second.contract, self.contract)
+        # The search vector is updated for bulk inserts as well.
+        self.assertTrue(Shift.objects.search("planning").exists())
+
+    def test_invalid_rows_are_reported(self):
+        result = self.run_import(
+            "2016-05-02 08:00,,,,,,",
+            "someday,2016-05-02 12:00,,,,,",
+            "2016-05-02 12:00,2016-05-02 08:00,,,,,",
+            "2016-05-02 08:00,2016-05-02 08:03,,,,,",
+            "2016-05-02 22:00,2016-05-03 02:00,,,,,",
+            "2016-05-02 08:00,2016-05-02 12:00,,X,,,",
+            "2016-05-02 08:00,2016-05-02 12:00,,,04:00,,",
+            "2016-05-02 08:00,2016-05-02 12:00,Unknown,,,,",
+            "2016-05-04 08:00,2016-05-04 12:00,,,,,",
+        )
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, message in result.errors], list(range(2, 10)))
+        self.assertEqual(Shift.objects.get().started, aware(2016, 5, 4, 8))
+
+    def test_overlaps_are_rejected(self):
+        Shift.objects.create(
+            employee=self.user,
+            contract=self.contract,
+            started=aware(2016, 5, 2, 8),
+            finished=aware(2016, 5, 2, 12),
+            duration=timedelta(hours=4),
+        )
+
+        result = self.run_import(
+            # Overlaps with the saved shift.
+            "2016-05-02 11:00,2016-05-02 13:00,,,,,",
+            "2016-05-03 08:00,2016-05-03 12:00,,,,,",
+            # Overlaps with the previous row of the same batch.
+            "2016-05-03 10:00,2016-05-03 14:00,,,,,",
+            "2016-05-03 12:00,2016-05-03 14:00,,,,,",
+        )
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([line for line, message in result.errors], [2, 4])
+
+    def test_rows_enclosing_saved_shifts_are_rejected(self):
+        Shift.objects.create(
+            employee=self.user,
+            contract=self.contract,
+            started=aware(2016, 5, 2, 10),
+            finished=aware(2016, 5, 2, 11),
+            duration=timedelta(hours=1),
+        )
+
+        result = self.run_import(
+            # Encloses the saved shift.
+            "2016-05-02 08:00,2016-05-02 12:00,,,,,",
+            # Overlaps with the start of the saved shift.
+            "2016-05-02 09:00,2016-05-02 10:30,,,,,",
+            "2016-05-02 11:00,2016-05-02 12:00,,,,,",
+        )
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, message in result.errors], [2, 3])
+        self.assertEqual(Shift.objects.count(), 2)
+
+    def test_shifts_without_contract_may_overlap(self):
+        result = self.run_import(
+            "2016-05-02 08:00,2016-05-02 12:00,,,,,",
+            "2016-05-02 10:00,2016-05-02 12:00,,,,,",
+            default_contract=None,
+        )
+
+        self.assertEqual(result.created, 2)
+
+    def test_daily_limit(self):
+        result = self.run_import(
+            "2016-05-02 06:00,2016-05-02 12:00,,,,,",
+            "2016-05-02 13:00,2016-05-02 17:00,,,,,",
+            "2016-05-02 17:00,2016-05-02 18:00,,,,,",
+            # Sick and vacation shifts are no working time.
+            "2016-05-03 06:00,2016-05-03 14:00,,S,,,",
+            "2016-05-03 14:00,2016-05-03 18:00,,,,,",
+        )
+
+        self.assertEqual(result.created, 4)
+        self.assertEqual([line for line, message in result.errors], [4])
+
+    def test_batches(self):
+        rows = [
+            "2016-05-{:02d} 08:00,2016-05-{:02d} 12:00,,,,,".format(day, day)
+            for day in range(1, 31)
+        ]
+        # The last row overlaps with a shift of the first batch.
+        rows.append("2016-05-01 10:00,2016-05-01 14:00,,,,,")
+
+        result = self.run_import(*rows, batch_size=7)
+
+        self.assertEqual(result.created, 30)
+        self.assertEqual([line for line, message in result.errors], [32])
+
+    def test_queries_do_not_grow_with_rows(self):
+        def count_queries(days):
+            Shift.objects.all().delete()
+            rows = [
+                "2016-05-{:02d} 08:00,2016-05-{:02d} 12:00,,,,tag,".format(day, day)
+                for day in days
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self.run_import(*rows)
+            return len(queries)
+
+        # The first import creates the tag.
+        count_queries(range(1, 3))
+        self.assertEqual(count_queries(range(1, 3)), count_queries(range(1, 31)))
+
+    def test_balances_are_updated(self):
+        self.run_import("2016-05-02 08:00,2016-05-02 12:00,,,,,")
+
+        self.assertEqual(
+            self.contract.balances.get(month__month=5).worked, timedelta(hours=4)
+        )
+
+
+class ReadICSTest(TestCase):
+    def test_read_events(self):
+        lines = StringIO(
+            "BEGIN:VCALENDAR\r\n"
+            "VERSION:2.0\r\n"
+            "BEGIN:VEVENT\r\n"
+            "DTSTART:20160502T060000Z\r\n"
+            "DTEND;TZID=Europe/Berlin:20160502T120000\r\n"
+            "SUMMARY:Planning\\, review\r\n"
+            "DESCRIPTION:A long\r\n"
+            "  description\r\n"
+            "CATEGORIES:work,meeting\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n"
+        )
+
+        (line, values), = read_ics(lines)
+
+        self.assertEqual(line, 3)
+        self.assertEqual(values["started"], aware(2016, 5, 2, 8))
+        self.assertEqual(values["finished"], aware(2016, 5, 2, 12))
+        self.assertEqual(values["note"], "Planning, review\nA long description")
+        self.assertEqual(values["tags"], "work,meeting")
+        self.assertEqual(values["contract"], "")
+
+
+class ShiftImportViewTest(TestCase):
+    def setUp(self):
+        self.user = self.make_user()
+        self.contract = Contract.objects.create(
+            employee=self.user, department="Test department", hours="50"
+        )
+
+    def test_login_required(self):
+        self.assertLoginRequired("shift:import")
+
+    def test_batches_are_not_wrapped_in_the_request_transaction(self):
+        view = resolve(reverse("shift:import")).func
+        self.assertIn("default", view._non_atomic_requests)
+
+    def test_import_csv(self):
+        upload = SimpleUploadedFile(
+            "shifts.csv",
+            (
+                HEADER + "2016-05-02 08:00,2016-05-02 12:00,,,,,\n"
+                "2016-05-02 13:00,2016-05-02 12:00,,,,,\n"
+            ).encode("utf-8-sig"),
+        )
+        with self.login(username=self.user.username, password="password"):
+            response = self.post(
+                "shift:import", data={"file": upload, "contract": self.contract.pk}
+            )
+
+        self.response_200(response)
+        self.assertEqual(response.context["result"].created, 1)
+        self.assertEqual(len(response.context["result"].errors), 1)
+        self.assertEqual(Shift.objects.get().contract, self.contract)
+
+    def test_reject_unknown_files(self):
+        upload = SimpleUploadedFile("shifts.txt", b"")
+        with self.login(username=self.user.username, password="password"):
+            response = self.post("shift:import", data={"file": upload})
+
+        self.response_200(response)
+        self.assertTrue(response.context["form"].errors["file"])
+        self.assertNotIn("result", response.context)
+
+
+class ImportShiftsCommandTest(TestCase):
+    def setUp(self):
+        self.user = self.make_user()
+        self.contract = Contract.objects.create(
+            employee=self.user, department="Test department", hours="50"
+        )
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as f:
+            f.write(HEADER + "2016-05-02 08:00,2016-05-02 12:00,,,,,\nfoo,bar,,,,,\n")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_import(self):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_shifts",
+            self.user.username,
+            self.path,
+            "--contract={}".format(self.contract.pk),
+            stdout=stdout,
+            stderr=stderr,
+        )
+
+        self.assertEqual(Shift.objects.get().contract, self.contract)
+        self.assertIn("Imported 1 shifts, 1 rows failed.", stdout.getvalue())
+        self.assertIn("Line 3:", stderr.getvalue())
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("import_shifts", "nobody", self.path)
@@ -1,10 +1,12 @@
 """Test the Shift model"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from freezegun import freeze_time
 from test_plus.test import TestCase
 
 from clock.contracts.models import Contract
-from clock.shifts.models import Shift
+from clock.shifts.models import Pause, Shift, ShiftRow
 
 
 class ShiftTest(TestCase):
@@ -36,3 +38,118 @@ class ShiftTest(TestCase):
         shift.finished = stop
         shift.save()
         assert shift.is_finished
+
+    def test_rows(self):
+        """Assert that `rows()` returns lightweight rows with the shift data."""
+        start = timezone.now() - timezone.timedelta(hours=5)
+        shift = Shift.objects.create(
+            employee=self.user,
+            contract=self.contract,
+            started=start,
+            finished=start + timezone.timedelta(hours=4),
+            duration=timezone.timedelta(hours=4),
+            key="S",
+        )
+
+        with self.assertNumQueries(1):
+            rows = list(Shift.objects.filter(employee=self.user).rows())
+
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertIsInstance(row, ShiftRow)
+        self.assertEqual(row.pk, shift.pk)
+        self.assertEqual(row.contract_id, self.contract.pk)
+        self.assertEqual(row.contract_or_none, self.contract.department)
+        self.assertEqual(row.started, shift.started)
+        self.assertEqual(row.duration, shift.duration)
+        self.assertEqual(row.get_key_display(), "Sick")
+        self.assertFalse(hasattr(row, "__dict__"))
+
+    def test_in_month(self):
+        """Assert that `in_month()` only returns the shifts of existing months."""
+        start = timezone.make_aware(timezone.datetime(2017, 12, 31, 20))
+        Shift.objects.create(
+            employee=self.user,
+            contract=self.contract,
+            started=start,
+            finished=start + timezone.timedelta(hours=2),
+            duration=timezone.timedelta(hours=2),
+        )
+
+        self.assertEqual(Shift.objects.in_month(2017, 12).count(), 1)
+        self.assertEqual(Shift.objects.in_month("2018", "01").count(), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(list(Shift.objects.in_month(2017, 13)), [])
+            self.assertEqual(list(Shift.objects.in_month(9999, 12)), [])
+
+    def test_update_durations(self):
+        """Assert that the net durations of many shifts are updated at once."""
+        start = timezone.now().replace(microsecond=0) - timezone.timedelta(hours=5)
+        paused, unpaused, legacy = [
+            Shift.objects.create(
+                employee=self.user,
+                started=start,
+                finished=start + timezone.timedelta(hours=4),
+                duration=timezone.timedelta(hours=4),
+                pause_duration=timezone.timedelta(minutes=minutes),
+            )
+            for minutes in (0, 0, 30)
+        ]
+        for minutes in (0, 60):
+            Pause.objects.create(
+                shift=paused,
+                started=start + timezone.timedelta(minutes=minutes),
+                finished=start + timezone.timedelta(minutes=minutes + 15),
+            )
+        # Running pauses do not count yet.
+        Pause.objects.create(shift=paused, started=start)
+
+        with self.assertNumQueries(1):
+            Shift.objects.filter(employee=self.user).update_durations()
+
+        self.assertEqual(
+            list(
+                Shift.objects.order_by("pk").values_list("pause_duration", "duration")
+            ),
+            [
+                (timezone.timedelta(minutes=30), timezone.timedelta(hours=3.5)),
+                (timezone.timedelta(0), timezone.timedelta(hours=4)),
+                # Shifts without pause intervals keep their pause duration.
+                (timezone.timedelta(minutes=30), timezone.timedelta(hours=3.5)),
+            ],
+        )
+
+        with self.assertNumQueries(1):
+            ranges = Pause.objects.filter(shift__employee=self.user).ranges()
+        self.assertEqual(list(ranges), [paused.pk])
+        self.assertEqual(
+            ranges[paused.pk][1],
+            (
+                start + timezone.timedelta(hours=1),
+                start + timezone.timedelta(hours=1.25),
+            ),
+        )
+
+    def test_search_vector_only_follows_the_note(self):
+        shift = Shift.objects.create(
+            employee=self.user, started=timezone.now(), note="Tutorial"
+        )
+        self.assertTrue(Shift.objects.search("tutorial").exists())
+
+        def search_updates(save, **kwargs):
+            with CaptureQueriesContext(connection) as context:
+                save(**kwargs)
+            return [
+                query
+                for query in context.captured_queries
+                if query["sql"].startswith('UPDATE "shifts_shift" SET "search_vector"')
+            ]
+
+        shift = Shift.objects.get(pk=shift.pk)
+        self.assertEqual(search_updates(shift.start_pause, started=timezone.now()), [])
+        self.assertEqual(search_updates(shift.save), [])
+
+        shift.note = "Exam"
+        self.assertEqual(len(search_updates(shift.save)), 1)
+        self.assertTrue(Shift.objects.search("exam").exists())
+        self.assertEqual(search_updates(shift.save), [])
@@ -0,0 +1,107 @@
+"""Tests for the shift statistics."""
+from datetime import date, timedelta
+
+from django.utils import timezone
+from test_plus import TestCase
+
+from clock.shifts.models import Shift
+from clock.shifts.statistics import get_statistics
+
+
+class StatisticsTest(TestCase):
+
+    def setUp(self):
+        self.user = self.make_user()
+        monday = timezone.datetime(2016, 5, 2)
+        for day, hour, minutes, pause in [
+            (0, 8, 8 * 60, 30),
+            (0, 22, 115, 0),
+            # Continues the shift of the evening before after midnight.
+            (1, 0, 2 * 60, 0),
+            (1, 14, 8 * 60, 0),
+            # Only 8 hours after the end of the shift before.
+            (2, 6, 4 * 60, 0),
+        ]:
+            started = timezone.make_aware(monday + timedelta(days=day, hours=hour))
+            Shift.objects.create(
+                employee=self.user,
+                started=started,
+                finished=started + timedelta(minutes=minutes),
+                duration=timedelta(minutes=minutes),
+                pause_duration=timedelta(minutes=pause),
+            )
+        # A running shift does not count.
+        Shift.objects.create(employee=self.user, started=timezone.now())
+
+    def test_statistics(self):
+        statistics = get_statistics(self.user, date(2016, 5, 1), date(2016, 5, 1))
+        self.assertEqual(statistics["count"], 5)
+        self.assertEqual(statistics["total"], timedelta(hours=23, minutes=25))
+        self.assertEqual(
+            statistics["days"],
+            [
+                (date(2016, 5, 2), timedelta(hours=9, minutes=25)),
+                (date(2016, 5, 3), timedelta(hours=10)),
+                (date(2016, 5, 4), timedelta(hours=4)),
+            ],
+        )
+        self.assertEqual(
+            statistics["weeks"], [(date(2016, 5, 2), timedelta(hours=23, minutes=25))]
+        )
+        self.assertEqual(statistics["weekdays"][1], timedelta(hours=10))
+        self.assertEqual(statistics["weekdays"][6], timedelta(0))
+        self.assertEqual(statistics["longest_day"], timedelta(hours=10))
+        # The starts at 22:00 and 0:00 are close to each other.
+        self.assertEqual(statistics["average_start"], "04:00")
+
+        [(finished, started, rest)] = statistics["rest_violations"]
+        self.assertEqual(rest, timedelta(hours=8))
+        self.assertEqual(timezone.localtime(started).hour, 6)
+
+        histogram = {lower: count for lower, upper, count in statistics["histogram"]}
+        self.assertEqual(histogram[1], 1)
+        self.assertEqual(histogram[7], 1)
+        self.assertEqual(sum(histogram.values()), 5)
+
+    def test_rest_after_split_shift(self):
+        """The rest period after a shift that was split at midnight is
+        reported even though the next shift starts on the same day.
+        """
+        for started, minutes in [
+            (timezone.datetime(2016, 6, 6, 18), 5 * 60 + 55),
+            (timezone.datetime(2016, 6, 7, 0), 2 * 60),
+            (timezone.datetime(2016, 6, 7, 8), 4 * 60),
+        ]:
+            started = timezone.make_aware(started)
+            Shift.objects.create(
+                employee=self.user,
+                started=started,
+                finished=started + timedelta(minutes=minutes),
+                duration=timedelta(minutes=minutes),
+            )
+
+        statistics = get_statistics(self.user, date(2016, 6, 1), date(2016, 6, 1))
+
+        [(finished, started, rest)] = statistics["rest_violations"]
+        self.assertEqual(rest, timedelta(hours=6))
+        self.assertEqual(timezone.localtime(started).hour, 8)
+
+    def test_no_shifts(self):
+        statistics = get_statistics(self.user, date(2015, 1, 1), date(2015, 12, 1))
+        self.assertEqual(statistics["count"], 0)
+        self.assertEqual(statistics["days"], [])
+        self.assertIsNone(statistics["average_start"])
+
+    def test_view(self):
+        self.assertLoginRequired("shift:statistics")
+        with self.login(username=self.user.username, password="password"):
+            response = self.get_check_200(
+                "shift:statistics", data={"start": "2016-05", "end": "2016-05"}
+            )
+            self.assertContains(response, "Week 18/2016")
+
+            # The month after the last month has to exist.
+            response = self.get_check_200(
+                "shift:statistics", data={"start": "9999-12", "end": "9999-12"}
+            )
+            self.assertNotIn("statistics", response.context)
@@ -1,10 +1,12 @@
 """Tests for the shift utilities."""
+from django.core.cache import cache
+from django.utils import timezone
 from test_plus import TestCase
 
 from clock.contracts.models import Contract
 from clock.shifts.factories import ShiftFactory, UserFactory
 from clock.shifts.models import Shift
-from clock.shifts.utils import get_current_shift, get_last_shifts
+from clock.shifts.utils import get_current_shift, get_default_contract, get_last_shifts
 
 
 class TestUtils(TestCase):
@@ -65,3 +67,21 @@ class TestUtils(TestCase):
             last_shift = get_current_shift(self.user)
             self.assertIsNotNone(last_shift)
             self.assertIsNone(last_shift.finished, "")
+
+    def test_get_default_contract(self):
+        """Test that the contract of the latest shift is the default one and
+        that it is only looked up once per request."""
+        cache.clear()
+        self.assertIsNone(get_default_contract(self.user))
+
+        now = timezone.now()
+        ShiftFactory(employee=self.user, contract=self.contract1, started=now)
+        ShiftFactory(employee=self.user, started=now - timezone.timedelta(days=1))
+
+        with self.assertNumQueries(2):
+            # One query for the contracts and one for the latest shift.
+            for i in range(3):
+                self.assertEqual(get_default_contract(self.user), "Test department")
+
+        ShiftFactory(employee=self.user, started=now + timezone.timedelta(hours=1))
+        self.assertIsNone(get_default_contract(self.user))
@@ -2,13 +2,19 @@
 
 All messages are tested for the default English strings.
 """
+from unittest.mock import patch
+
 from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone, translation
 from freezegun import freeze_time
 from test_plus.test import TestCase
 
 from clock.contracts.models import Contract
-from clock.shifts.models import Shift
+from clock.shifts.models import Shift, ShiftQuerySet
 
 
 class ManualShiftViewTest(TestCase):
@@ -124,6 +130,42 @@ class ManualShiftViewTest(TestCase):
                 self.assertEqual(len(messages), 1)
                 self.assertEqual(messages[0].__str__(), "Your shift has finished!")
 
+    @freeze_time("2015-01-01 12:00")
+    def test_pause_shift(self):
+        """Assert that pauses are recorded and excluded from the duration."""
+        with self.login(username=self.user.username, password="password"):
+            self.post("shift:quick_action", data={"_start": True})
+            with freeze_time("2015-01-01 13:00"):
+                self.post("shift:quick_action", data={"_pause_start": True})
+                self.assertTrue(self.get_check_200("shift:status").json()["paused"])
+                response = self.post(
+                    "shift:quick_action",
+                    data={"_pause_start": True},
+                    follow=True,
+                    extra={"HTTP_ACCEPT_LANGUAGE": "en"},
+                )
+                messages = list(get_messages(response.wsgi_request))
+                self.assertEqual(str(messages[-1]), "Your shift is already paused!")
+            with freeze_time("2015-01-01 13:30"):
+                self.post("shift:quick_action", data={"_pause_stop": True})
+            with freeze_time("2015-01-01 15:00"):
+                self.post("shift:quick_action", data={"_pause_start": True})
+            # Stopping the shift ends the running pause.
+            with freeze_time("2015-01-01 15:15"):
+                self.post("shift:quick_action", data={"_stop": True})
+
+        shift = Shift.objects.get()
+        self.assertFalse(shift.is_paused)
+        self.assertEqual(shift.pause_duration, timezone.timedelta(minutes=45))
+        self.assertEqual(shift.duration, timezone.timedelta(hours=2, minutes=30))
+        self.assertEqual(
+            list(shift.pauses.values_list("finished", flat=True)),
+            [
+                timezone.datetime(2015, 1, 1, 13, 30, tzinfo=timezone.utc),
+                timezone.datetime(2015, 1, 1, 15, 15, tzinfo=timezone.utc),
+            ],
+        )
+
 
 class ShiftsViewTest(TestCase):
     """
@@ -156,6 +198,8 @@ class ShiftsViewTest(TestCase):
             "shift:archive_month_contract_numeric", year=2016, month=5, contract=0
         )
         self.assertLoginRequired("shift:article_year_archive", year=2016)
+        self.assertLoginRequired("shift:status")
+        self.assertLoginRequired("shift:tags")
 
     def test_logged_in_shift_views(self):
         """
@@ -254,3 +298,226 @@ class ShiftsViewTest(TestCase):
             )
             self.get_check_200("shift:edit", pk=shift.pk)
             self.get_check_200("shift:delete", pk=shift.pk)
+
+    def test_month_view_query_count(self):
+        """Assert that the number of queries of the month view does not grow with
+        the number of shifts displayed.
+        """
+        started = timezone.make_aware(timezone.datetime(2016, 5, 2, 8))
+
+        def add_shifts(count):
+            for day in range(count):
+                shift = Shift.objects.create(
+                    employee=self.user1,
+                    contract=self.contract1,
+                    started=started + timezone.timedelta(days=day),
+                    finished=started + timezone.timedelta(days=day, hours=2),
+                    duration=timezone.timedelta(hours=2),
+                )
+                shift.tags.add("teaching")
+
+        def count_queries():
+            # Make sure the table is rendered and not taken from the cache.
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                self.get_check_200(
+                    "shift:archive_month_contract_numeric",
+                    year=2016,
+                    month=5,
+                    contract="00",
+                )
+            return len(context)
+
+        with self.login(username=self.user1.username, password="password"):
+            add_shifts(1)
+            # The first request also has to populate some caches (e.g. the
+            # current site), so we only compare the following ones.
+            count_queries()
+            queries = count_queries()
+
+            add_shifts(10)
+            self.assertEqual(count_queries(), queries)
+
+    def test_month_view_conditional_get(self):
+        """Assert that an unchanged month view is answered with a 304 and that a
+        new shift invalidates the ETag.
+        """
+        kwargs = {"year": 2016, "month": 5, "contract": "00"}
+        started = timezone.make_aware(timezone.datetime(2016, 5, 2, 8))
+
+        with self.login(username=self.user1.username, password="password"):
+            response = self.get_check_200(
+                "shift:archive_month_contract_numeric", **kwargs
+            )
+            self.assertIn("private", response["Cache-Control"])
+            etag = response["ETag"]
+
+            response = self.get(
+                "shift:archive_month_contract_numeric",
+                extra={"HTTP_IF_NONE_MATCH": etag},
+                **kwargs
+            )
+            self.assertEqual(response.status_code, 304)
+
+            Shift.objects.create(
+                employee=self.user1,
+                contract=self.contract1,
+                started=started,
+                finished=started + timezone.timedelta(hours=2),
+                duration=timezone.timedelta(hours=2),
+            )
+            response = self.get(
+                "shift:archive_month_contract_numeric",
+                extra={"HTTP_IF_NONE_MATCH": etag},
+                **kwargs
+            )
+            self.response_200()
+            self.assertNotEqual(response["ETag"], etag)
+
+    @override_settings(CLOCK_STATUS_TIMEOUT=0)
+    def test_clock_status(self):
+        """Assert that the clock status follows the running shift."""
+        with self.login(username=self.user1.username, password="password"):
+            status = self.get_check_200("shift:status").json()
+            self.assertFalse(status["running"])
+            self.assertIsNone(status["started"])
+            # Without long polling, clients have to wait before polling again.
+            self.assertEqual(status["poll_interval"], 30)
+
+            # Waiting for a change returns the unchanged status after the
+            # timeout.
+            response = self.get("shift:status", data={"version": status["version"]})
+            self.assertEqual(response.json()["version"], status["version"])
+
+            shift = Shift.objects.create(
+                employee=self.user1, contract=self.contract1, started=timezone.now()
+            )
+            response = self.get("shift:status", data={"version": status["version"]})
+            status = response.json()
+            self.assertTrue(status["running"])
+            self.assertEqual(status["contract"], "Test department")
+
+            shift.finished = timezone.now()
+            shift.save()
+            self.assertFalse(self.get_check_200("shift:status").json()["running"])
+
+    def test_search(self):
+        """Assert that the notes and tags of the own shifts can be searched."""
+        started = timezone.make_aware(timezone.datetime(2016, 5, 2, 8))
+
+        def add_shift(user, days, note, tags=(), contract=None):
+            shift = Shift.objects.create(
+                employee=user,
+                contract=contract,
+                started=started + timezone.timedelta(days=days),
+                finished=started + timezone.timedelta(days=days, hours=2),
+                duration=timezone.timedelta(hours=2),
+                note=note,
+            )
+            shift.tags.add(*tags)
+            return shift
+
+        tagged = add_shift(self.user1, 0, "Prepared slides", ["tutorial"])
+        noted = add_shift(self.user1, 1, "Tutorial on statistics", [], self.contract1)
+        add_shift(self.user1, 2, "Exams")
+        add_shift(self.make_user("user2"), 0, "Tutorial", ["tutorial"])
+
+        with self.login(username=self.user1.username, password="password"):
+            response = self.get_check_200("shift:search_api", data={"q": "tutorial"})
+            data = response.json()
+            self.assertEqual(data["count"], 2)
+            # Matches in the note rank higher than matches in the tags.
+            self.assertEqual([r["id"] for r in data["results"]], [noted.pk, tagged.pk])
+            self.assertEqual(data["results"][1]["tags"], ["tutorial"])
+
+            data = self.get(
+                "shift:search_api",
+                data={"q": "tutorial", "contract": self.contract1.pk},
+            ).json()
+            self.assertEqual([r["id"] for r in data["results"]], [noted.pk])
+
+            data = self.get(
+                "shift:search_api",
+                data={"q": "tutorial", "start": "2016-05-01", "end": "2016-05-02"},
+            ).json()
+            self.assertEqual([r["id"] for r in data["results"]], [tagged.pk])
+
+            response = self.get_check_200("shift:search", data={"q": "slides"})
+            self.assertContains(response, "Prepared slides")
+            self.assertNotContains(response, "Exams")
+
+            self.get("shift:search_api")
+            self.response_400()
+
+    def test_search_fallback(self):
+        """Assert that databases without full text search use icontains."""
+        shift = Shift.objects.create(
+            employee=self.user1, started=timezone.now(), note="Grading homework"
+        )
+        shift.tags.add("Teaching")
+        with patch.object(ShiftQuerySet, "_supports_search", return_value=False):
+            self.assertEqual(
+                list(Shift.objects.for_user(self.user1).search("homework")), [shift]
+            )
+            self.assertEqual(
+                list(Shift.objects.for_user(self.user1).search("teach")), [shift]
+            )
+            self.assertEqual(Shift.objects.update_search_vector(), 0)
+
+    def test_tag_analytics(self):
+        """Assert that the time per tag is summed up over the given months."""
+        started = timezone.make_aware(timezone.datetime(2016, 5, 2, 8))
+
+        def add_shift(user, days, hours, tags):
+            shift = Shift.objects.create(
+                employee=user,
+                started=started + timezone.timedelta(days=days),
+                finished=started + timezone.timedelta(days=days, hours=hours),
+                duration=timezone.timedelta(hours=hours),
+            )
+            shift.tags.add(*tags)
+            return shift
+
+        add_shift(self.user1, 0, 2, ["teaching", "exams"])
+        add_shift(self.user1, 1, 4, ["teaching"])
+        moved = add_shift(self.user1, 31, 2, ["research"])
+        add_shift(self.user1, 2, 2, [])
+        add_shift(self.make_user("user2"), 0, 8, ["teaching"])
+
+        with self.login(username=self.user1.username, password="password"):
+            data = self.get_check_200(
+                "shift:tags_api", data={"start": "2016-05", "end": "2016-06"}
+            ).json()
+            self.assertEqual(data["start"], "2016-05")
+            self.assertEqual(
+                data["results"],
+                [
+                    {"tag": "teaching", "duration": "06:00", "count": 2, "share": 60.0},
+                    {"tag": "exams", "duration": "02:00", "count": 1, "share": 20.0},
+                    {"tag": "research", "duration": "02:00", "count": 1, "share": 20.0},
+                ],
+            )
+
+            # Changing the tags invalidates the cached totals of the month.
+            moved.tags.set("teaching")
+            data = self.get(
+                "shift:tags_api", data={"start": "2016-06", "end": "2016-06"}
+            ).json()
+            self.assertEqual([r["tag"] for r in data["results"]], ["teaching"])
+
+            response = self.get_check_200(
+                "shift:tags", data={"start": "2016-05", "end": "2016-05"}
+            )
+            self.assertContains(response, "exams")
+            self.assertNotContains(response, "research")
+
+            self.get("shift:tags_api", data={"start": "2016-06", "end": "2016-05"})
+            self.response_400()
+
+            # The range is limited to 60 months.
+            self.get("shift:tags_api", data={"start": "2011-06", "end": "2016-05"})
+            self.response_200()
+            self.get("shift:tags_api", data={"start": "2011-05", "end": "2016-05"})
+            self.response_400()
+            self.get("shift:tags_api", data={"start": "9999-11", "end": "9999-12"})
+            self.response_400()
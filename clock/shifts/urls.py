@@ -2,11 +2,19 @@
 from django.urls import path
 
 from clock.shifts.views import (
+    ShiftComplianceView,
+    ShiftImportView,
     ShiftManualCreate,
     ShiftManualDelete,
     ShiftManualEdit,
     ShiftMonthContractView,
+    ShiftSearchAPI,
+    ShiftSearchView,
+    ShiftStatisticsView,
     ShiftYearView,
+    TagAnalyticsAPI,
+    TagAnalyticsView,
+    clock_status,
     get_contract_end_date,
     shift_action,
 )
@@ -17,6 +25,20 @@ urlpatterns = [
     path("ajax/get_contract_id/", get_contract_end_date, name="get_contract_id"),
     # Display the ShiftMonthView as default with the current year-month
     path("", ShiftMonthContractView.as_view(month_format="%m"), name="list"),
+    # JSON status of the running shift, used to update the dashboard
+    path("status/", clock_status, name="status"),
+    # Full text search over the notes and tags of the shifts
+    path("search/", ShiftSearchView.as_view(), name="search"),
+    path("search/api/", ShiftSearchAPI.as_view(), name="search_api"),
+    # Time spent per tag over a range of months
+    path("tags/", TagAnalyticsView.as_view(), name="tags"),
+    path("tags/api/", TagAnalyticsAPI.as_view(), name="tags_api"),
+    # Statistics about the working times over a range of months
+    path("statistics/", ShiftStatisticsView.as_view(), name="statistics"),
+    # Violations of the working time rules over a range of months
+    path("compliance/", ShiftComplianceView.as_view(), name="compliance"),
+    # Import shifts from CSV or iCalendar files
+    path("import/", ShiftImportView.as_view(), name="import"),
     # View to handle all the quick-actions from the dashboard
     path("quick_action/", shift_action, name="quick_action"),
     # CreateView to add a new shift
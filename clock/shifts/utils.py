@@ -1,10 +1,29 @@
 # -*- coding: utf-8 -*-
-from datetime import datetime
+import hashlib
+from datetime import datetime, timedelta
 
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.urls import reverse_lazy
-
+from django.utils import timezone, translation
+from django.utils.translation import ugettext_lazy as _
+
+from clock.contracts.ledger import rebuild_balances
+from clock.contracts.registry import get_contract_registry
+from clock.shifts.cache import (
+    CLOCK_STATUS_KEY,
+    bump_data_version,
+    cache_data,
+    get_change_stamp,
+    get_data_version,
+    touch_month,
+)
 from clock.shifts.models import Shift
 
+# The shortest shift we save
+MIN_SHIFT_DURATION = timedelta(minutes=5)
+
 
 def get_return_url(request, default_success):
     """Checks whether the user should be returned to the default_success view or to
@@ -85,19 +104,50 @@ def get_current_shift(user):
     :return: Shift object or None
     """
     try:
-        return Shift.objects.get(employee=user, finished__isnull=True)
+        return Shift.objects.for_user(user).get(finished__isnull=True)
     except Shift.DoesNotExist:
         return None
 
 
+def get_clock_status(user_id):
+    """
+    Returns the state of the running shift of a user. The state is cached with
+    the data version of the user, so it is only queried again after one of the
+    shifts or contracts of the user changed.
+    :param user_id: Id of the user
+    :return: Dict with the keys 'running', 'started', 'contract', 'paused' and
+        'version'
+    """
+    version = get_data_version(user_id)
+    key = CLOCK_STATUS_KEY.format(user_id, version)
+    status = cache.get(key)
+    if status is None:
+        shift = (
+            Shift.objects.for_user(user_id)
+            .filter(finished__isnull=True)
+            .values_list("started", "contract__department", "pause_started")
+            .first()
+        )
+        started, contract, pause_started = shift or (None, None, None)
+        status = {
+            "running": shift is not None,
+            "started": started,
+            "contract": contract,
+            "paused": pause_started is not None,
+            "version": version,
+        }
+        cache_data(key, status)
+    return status
+
+
 def get_all_contracts(user):
     """
     Returns all contracts a user has signed.
     """
-    q = user.contract_set.all().order_by("id")
-    if len(q) < 1:
+    registry = get_contract_registry(user)
+    if not registry:
         return None
-    return q
+    return registry.contracts
 
 
 def get_default_contract(user):
@@ -109,23 +159,12 @@ def get_default_contract(user):
           return the contract that was added first.
         - If no contracts are defined, then return the NoneObject as default
     """
-    # Filter all shifts (finished or not) from the current user
-    try:
-        finished_shifts = Shift.objects.filter(employee=user).latest("started")
-    except Shift.DoesNotExist:
-        # If the user just registered and does not have any shifts!
+    # The registry looks up the contract of the latest shift (finished or not)
+    # only once per request.
+    contract = get_contract_registry(user).default
+    if contract is None:
         return None
-
-    # If the user has shifts
-    if finished_shifts:
-        # Are there any shifts finished for a non-default contract?
-        if finished_shifts.contract is not None:
-            # Return the contract of the latest shift
-
-            return finished_shifts.contract.department
-
-    # Return NoneObject for the default None-contract
-    return None
+    return contract.department
 
 
 def get_last_shifts(user, count=5):
@@ -135,9 +174,7 @@ def get_last_shifts(user, count=5):
     :param count: Number of shifts to return. Default is 5
     :return: Shift objects or None
     """
-    finished_shifts = Shift.objects.filter(employee=user, finished__isnull=False)[
-        :count
-    ]
+    finished_shifts = Shift.objects.for_user(user).finished().with_related()[:count]
 
     if not finished_shifts:
         return None
@@ -151,7 +188,7 @@ def get_all_shifts(user):
     :param user: User object
     :return: List of dicts with 'year' and 'month' keys or None
     """
-    shifts = Shift.objects.filter(employee=user, finished__isnull=False)
+    shifts = Shift.objects.for_user(user).finished()
 
     months_with_shifts = []
 
@@ -167,3 +204,84 @@ def get_all_shifts(user):
         return None
 
     return months_with_shifts
+
+
+def _hash_etag(*parts):
+    return hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def shift_month_etag(request, year=None, month=None, **kwargs):
+    """
+    Returns the ETag of the month view of the shifts.
+    The page also shows data of other months (e.g. the default contract), so we
+    use the data version of the user instead of the change stamp of the month.
+    Pages that display pending messages are never answered with a 304.
+    :param request: request object
+    :return: ETag string or None
+    """
+    if len(get_messages(request)):
+        return None
+
+    now = timezone.localtime()
+    return _hash_etag(
+        request.user.pk,
+        get_data_version(request.user.pk),
+        # The CSRF token of the forms on the page changes with the session.
+        request.session.session_key,
+        translation.get_language(),
+        timezone.get_current_timezone_name(),
+        year or now.year,
+        month or now.month,
+    )
+
+
+def export_last_modified(request, year, month, **kwargs):
+    """
+    Returns the last time the exported shifts of the user in the given month
+    changed.
+    """
+    return get_change_stamp(request.user.pk, year, month)
+
+
+def export_etag(request, year, month, **kwargs):
+    """
+    Returns the ETag of an export of the shifts of the user in the given month.
+    """
+    return _hash_etag(
+        request.user.pk,
+        get_change_stamp(request.user.pk, year, month).isoformat(),
+        # The PDF export contains the name of the user, translated strings and
+        # datetimes in the current timezone.
+        request.user.first_name,
+        request.user.last_name,
+        translation.get_language(),
+        timezone.get_current_timezone_name(),
+    )
+
+
+def invalidate_shifts(rows, contract_ids):
+    """
+    `QuerySet.update()` and `bulk_create()` do not send any signals, so bump
+    the data versions and touch the months of the given (employee_id, started)
+    rows and rebuild the balances of the given contracts by hand.
+    """
+    rebuild_balances({pk for pk in contract_ids if pk})
+    for employee_id in {employee_id for employee_id, started in rows}:
+        bump_data_version(employee_id)
+    for employee_id, started in rows:
+        touch_month(employee_id, started)
+
+
+def validate_shift_times(started, finished):
+    """
+    Validate the start and end of a finished shift, for the shift form and
+    the import alike.
+    :raises ValidationError: If the shift finishes before it starts, is shorter
+        than five minutes or does not finish on the day it started.
+    """
+    if finished < started:
+        raise ValidationError(_("The shift cannot start after finishing."))
+    if finished - started < MIN_SHIFT_DURATION:
+        raise ValidationError(_("We cannot save a shift that is this short."))
+    if timezone.localdate(started) != timezone.localdate(finished):
+        raise ValidationError({"finished": _("A shift can never end on the next day.")})
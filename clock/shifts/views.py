@@ -1,29 +1,50 @@
+import time
 from datetime import datetime
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import connection, transaction
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect
 from django.utils import timezone
+from django.utils.dates import WEEKDAYS
 from django.utils.decorators import method_decorator
 from django.utils.translation import ugettext_lazy as _
-from django.views.decorators.http import require_POST
+from django.utils.translation import ungettext
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+from django.views.generic.base import TemplateView
 from django.views.generic.dates import MonthArchiveView, YearArchiveView
-from django.views.generic.edit import CreateView, DeleteView, UpdateView
+from django.views.generic.edit import CreateView, DeleteView, FormView, UpdateView
 from django.views.generic.list import ListView
-from pytz import timezone as p_timezone
 
 from clock.contracts.models import Contract
+from clock.contrib.replica.routers import use_replica
+from clock.exports.serializers import ShiftJSONEncoder
+from clock.pages.localization import format_column
 from clock.pages.mixins import UserObjectOwnerMixin
-from clock.shifts.forms import ClockInForm, ClockOutForm, ShiftForm
+from clock.pages.paginators import EstimatedCountPaginator
+from clock.shifts.analytics import get_tag_totals
+from clock.shifts.compliance import check_compliance
+from clock.shifts.forms import (
+    ClockInForm,
+    ClockOutForm,
+    MonthRangeForm,
+    ShiftForm,
+    ShiftImportForm,
+    ShiftSearchForm,
+)
 from clock.shifts.models import Shift
+from clock.shifts.statistics import get_statistics, month_range
 from clock.shifts.utils import (
     get_all_contracts,
+    get_clock_status,
     get_current_shift,
     get_default_contract,
     get_return_url,
     set_correct_session,
+    shift_month_etag,
 )
 
 
@@ -42,6 +63,38 @@ def get_contract_end_date(request):
     return HttpResponse(status=403)
 
 
+@transaction.non_atomic_requests
+@login_required
+def clock_status(request):
+    """
+    Return the start time and contract of the running shift as JSON.
+
+    Clients pass the `version` of the last status they received to wait until
+    the status changes (long polling). If nothing changes within
+    `CLOCK_STATUS_TIMEOUT` seconds, the unchanged status is returned. Without
+    a timeout, `poll_interval` tells clients how long to wait before polling
+    again.
+    """
+    status = get_clock_status(request.user.pk)
+    since = request.GET.get("version")
+
+    if since == str(status["version"]):
+        # Do not keep a database connection while waiting. Waiting clients
+        # would otherwise drain the connection pool.
+        if not connection.in_atomic_block:
+            connection.close()
+        deadline = time.monotonic() + settings.CLOCK_STATUS_TIMEOUT
+        while since == str(status["version"]) and time.monotonic() < deadline:
+            time.sleep(settings.CLOCK_STATUS_INTERVAL)
+            status = get_clock_status(request.user.pk)
+
+    poll_interval = (
+        0 if settings.CLOCK_STATUS_TIMEOUT else settings.CLOCK_STATUS_POLL_INTERVAL
+    )
+    # Lets clients correct the difference between their and our clock.
+    return JsonResponse(dict(status, now=timezone.now(), poll_interval=poll_interval))
+
+
 @require_POST
 @login_required
 def shift_action(request):
@@ -80,10 +133,38 @@ def shift_action(request):
         else:
             messages.add_message(request, messages.ERROR, form.errors)
 
+    # Pause the current shift
+    elif "_pause_start" in request.POST:
+        if shift.is_paused:
+            messages.add_message(
+                request, messages.ERROR, _("Your shift is already paused!"), "danger"
+            )
+        else:
+            shift.start_pause(timezone.now())
+            messages.add_message(
+                request, messages.SUCCESS, _("Your pause has started!")
+            )
+
+    # Resume the current shift
+    elif "_pause_stop" in request.POST:
+        if not shift.is_paused:
+            messages.add_message(
+                request, messages.ERROR, _("Your shift is not paused!"), "danger"
+            )
+        else:
+            shift.stop_pause(timezone.now())
+            messages.add_message(
+                request, messages.SUCCESS, _("Your pause has finished!")
+            )
+
     # Stop current shift
     elif "_stop" in request.POST:
+        now = timezone.now()
+        # A running pause ends with the shift.
+        if shift.is_paused:
+            shift.stop_pause(now)
         # Set the finished value to timezone.now() and save the updated shift
-        form = ClockOutForm(data={"finished": timezone.now()}, instance=shift)
+        form = ClockOutForm(data={"finished": now}, instance=shift)
 
         if form.is_valid():
             form.clock_out()
@@ -102,9 +183,7 @@ class ShiftListView(ListView):
     template_name = "shift/list.html"
 
     def get_queryset(self):
-        return Shift.objects.filter(
-            employee=self.request.user.id, finished__isnull=False
-        )
+        return Shift.objects.for_user(self.request.user).finished().with_related()
 
 
 @method_decorator(login_required, name="dispatch")
@@ -176,15 +255,10 @@ class ShiftManualEdit(UpdateView, UserObjectOwnerMixin):
 
     def get_shift(self):
         # Use the current timezone when retrieving datetime objects
-        tz = p_timezone(settings.TIME_ZONE)
-
         moment_format = "%Y-%m-%dT%H:%M"
         obj = self.get_object()
-        dates = {
-            "started": obj.started.astimezone(tz).strftime(moment_format),
-            "finished": obj.finished.astimezone(tz).strftime(moment_format),
-        }
-        return dates
+        started, finished = format_column([obj.started, obj.finished], moment_format)
+        return {"started": started, "finished": finished}
 
 
 @method_decorator(login_required, name="dispatch")
@@ -217,7 +291,7 @@ class ShiftMonthView(MonthArchiveView):
         return super(ShiftMonthView, self).dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        return Shift.objects.filter(employee=self.request.user, finished__isnull=False)
+        return Shift.objects.for_user(self.request.user).finished().with_related()
 
     @property
     def get_all_contracts(self):
@@ -229,6 +303,9 @@ class ShiftMonthView(MonthArchiveView):
 
 
 @method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+@method_decorator(cache_control(private=True, no_cache=True), name="get")
+@method_decorator(condition(etag_func=shift_month_etag), name="get")
 class ShiftMonthContractView(ShiftMonthView):
     """
     Show all shifts assigned to a contract of a specific date.
@@ -248,9 +325,7 @@ class ShiftMonthContractView(ShiftMonthView):
         return super(ShiftMonthContractView, self).dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        queryset = Shift.objects.filter(
-            employee=self.request.user.pk, finished__isnull=False
-        )
+        queryset = Shift.objects.for_user(self.request.user).finished().with_related()
         if self.contract == "0":
             queryset = queryset.filter(contract__isnull=True)
         elif self.contract == "00":
@@ -261,6 +336,7 @@ class ShiftMonthContractView(ShiftMonthView):
 
 
 @method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
 class ShiftYearView(YearArchiveView):
     date_field = "started"
     allow_future = False
@@ -268,4 +344,181 @@ class ShiftYearView(YearArchiveView):
     template_name = "shift/year_archive_view.html"
 
     def get_queryset(self):
-        return Shift.objects.filter(employee=self.request.user).order_by("started")
+        return Shift.objects.for_user(self.request.user).order_by("started")
+
+
+@method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+class ShiftSearchView(ListView):
+    """
+    Full text search over the notes and tags of the shifts of the user. The
+    results may be filtered by contract and date range.
+    """
+    template_name = "shift/search.html"
+    paginate_by = 25
+    paginator_class = EstimatedCountPaginator
+
+    def get(self, request, *args, **kwargs):
+        self.form = ShiftSearchForm(request.GET or None, user=request.user)
+        return super(ShiftSearchView, self).get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        if not self.form.is_valid():
+            return Shift.objects.none()
+        return self.form.search().with_related()
+
+    def get_context_data(self, **kwargs):
+        context = super(ShiftSearchView, self).get_context_data(**kwargs)
+        context["form"] = self.form
+
+        # Keep the search parameters when switching pages.
+        query = self.request.GET.copy()
+        query.pop(self.page_kwarg, None)
+        context["query_string"] = query.urlencode()
+        return context
+
+
+class ShiftSearchAPI(ShiftSearchView):
+    """Return the results of the shift search as JSON."""
+
+    def render_to_response(self, context, **response_kwargs):
+        if not self.form.is_valid():
+            return JsonResponse({"errors": self.form.errors}, status=400)
+
+        page = context["page_obj"]
+        results = [
+            {
+                "id": shift.pk,
+                "contract": shift.contract_or_none,
+                "started": shift.started,
+                "finished": shift.finished,
+                "duration": shift.duration,
+                "key": shift.key,
+                "note": shift.note,
+                "tags": [tag.name for tag in shift.tags.all()],
+                "rank": getattr(shift, "rank", None),
+            }
+            for shift in context["object_list"]
+        ]
+        return JsonResponse(
+            {
+                "count": page.paginator.count,
+                "page": page.number,
+                "pages": page.paginator.num_pages,
+                "results": results,
+            },
+            encoder=ShiftJSONEncoder,
+        )
+
+
+@method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+class TagAnalyticsView(TemplateView):
+    """Show how much time the user spent per tag over a range of months."""
+    template_name = "shift/tags.html"
+
+    def get_context_data(self, **kwargs):
+        context = super(TagAnalyticsView, self).get_context_data(**kwargs)
+        form = MonthRangeForm(self.request.GET)
+        context["form"] = form
+        if form.is_valid():
+            context["start"] = form.cleaned_data["start"]
+            context["end"] = form.cleaned_data["end"]
+            context["tags"] = get_tag_totals(
+                self.request.user.pk, context["start"], context["end"]
+            )
+        return context
+
+
+class TagAnalyticsAPI(TagAnalyticsView):
+    """Return the tag analytics as JSON."""
+
+    def render_to_response(self, context, **response_kwargs):
+        form = context["form"]
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+
+        return JsonResponse(
+            {
+                "start": context["start"].strftime("%Y-%m"),
+                "end": context["end"].strftime("%Y-%m"),
+                "results": context["tags"],
+            },
+            encoder=ShiftJSONEncoder,
+        )
+
+
+@method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+class ShiftStatisticsView(TemplateView):
+    """Show statistics about the working times of the user over a range of
+    months.
+    """
+    template_name = "shift/statistics.html"
+
+    def get_context_data(self, **kwargs):
+        context = super(ShiftStatisticsView, self).get_context_data(**kwargs)
+        form = MonthRangeForm(self.request.GET)
+        context["form"] = form
+        if form.is_valid():
+            context["start"] = form.cleaned_data["start"]
+            context["end"] = form.cleaned_data["end"]
+            statistics = get_statistics(
+                self.request.user, context["start"], context["end"]
+            )
+            context["statistics"] = statistics
+            context["weekdays"] = [
+                (WEEKDAYS[day], total)
+                for day, total in enumerate(statistics["weekdays"])
+            ]
+        return context
+
+
+@method_decorator(login_required, name="dispatch")
+@method_decorator(use_replica, name="dispatch")
+class ShiftComplianceView(TemplateView):
+    """List the violations of the working time rules by the shifts of the user
+    over a range of months.
+    """
+    template_name = "shift/compliance.html"
+
+    def get_context_data(self, **kwargs):
+        context = super(ShiftComplianceView, self).get_context_data(**kwargs)
+        form = MonthRangeForm(self.request.GET)
+        context["form"] = form
+        if form.is_valid():
+            context["start"] = form.cleaned_data["start"]
+            context["end"] = form.cleaned_data["end"]
+            context["violations"] = list(
+                check_compliance(
+                    *month_range(context["start"], context["end"]),
+                    user=self.request.user
+                )
+            )
+        return context
+
+
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+@method_decorator(login_required, name="dispatch")
+class ShiftImportView(FormView):
+    """Import shifts from a CSV or iCalendar file and list the rows that
+    could not be imported. Every batch of rows is saved in its own transaction.
+    """
+    form_class = ShiftImportForm
+    template_name = "shift/import.html"
+
+    def get_form_kwargs(self):
+        kwargs = super(ShiftImportView, self).get_form_kwargs()
+        kwargs["user"] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        result = form.import_shifts()
+        if result.created:
+            messages.add_message(
+                self.request,
+                messages.SUCCESS,
+                ungettext("Imported %d shift.", "Imported %d shifts.", result.created)
+                % result.created,
+            )
+        return self.render_to_response(self.get_context_data(form=form, result=result))
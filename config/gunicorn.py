@@ -0,0 +1,45 @@
+"""
+Gunicorn configuration for Clock.
+
+Most requests of Clock are small polls (e.g. the clock status of the
+dashboard) that spend their time waiting for the database or the cache. With
+the default synchronous workers every waiting request blocks a whole
+process. The gevent workers switch to another request instead, so a few
+processes can serve many concurrent polls.
+
+Usage::
+
+    gunicorn -c config/gunicorn.py config.wsgi
+
+The configuration can be adjusted with these environment variables:
+
+    PORT                         Port to listen on (default: 8000)
+    WEB_CONCURRENCY              Number of worker processes (default: 2)
+    GUNICORN_WORKER_CLASS        "gevent" (default) or "sync"
+    GUNICORN_WORKER_CONNECTIONS  Concurrent requests per gevent worker
+                                 (default: 100)
+
+The requests of a worker share DJANGO_DATABASE_POOL_SIZE database connections
+(see `clock.contrib.postgresql_pool`).
+
+Use `loadtest/polling.py` to compare the worker classes.
+"""
+import os
+
+bind = "0.0.0.0:{}".format(os.environ.get("PORT", "8000"))
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+
+# Waiting clock status requests are answered after CLOCK_STATUS_TIMEOUT
+# seconds, so the workers must not be killed before.
+timeout = 60
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # psycopg2 is a C extension and is not patched by gevent. Without this
+        # every query blocks all greenlets of the worker.
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
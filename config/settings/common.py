@@ -76,6 +76,7 @@ MIDDLEWARE = (
     "clock.profiles.middleware.LocaleMiddlewareExtended",
     "django.contrib.flatpages.middleware.FlatpageFallbackMiddleware",
     "clock.pages.middleware.LastVisitedMiddleware",
+    "clock.contrib.replica.middleware.StickyPrimaryMiddleware",
 )
 
 # MIGRATIONS CONFIGURATION
@@ -235,6 +236,25 @@ LOGIN_URL = "account_login"
 AUTOSLUG_SLUGIFY_FUNCTION = "slugify.slugify"
 
 # Your common stuff: Below this line define 3rd party library settings
+# Cached template fragments are invalidated as soon as the displayed data
+# changes, so they can be kept for a long time.
+FRAGMENT_CACHE_TIMEOUT = env.int("DJANGO_FRAGMENT_CACHE_TIMEOUT", 60 * 60 * 24)
+# Clients waiting for changes of the clock status are answered after this many
+# seconds even if nothing changed. Keep it below the timeout of the proxy.
+# Waiting blocks a synchronous worker, so long polling is only enabled with
+# the gevent workers of config/gunicorn.py (see the production settings).
+# Without it, clients poll again every CLOCK_STATUS_POLL_INTERVAL seconds.
+CLOCK_STATUS_TIMEOUT = env.int("DJANGO_CLOCK_STATUS_TIMEOUT", 0)
+CLOCK_STATUS_INTERVAL = 1
+CLOCK_STATUS_POLL_INTERVAL = 30
+
+# Reporting views read from this database alias if it is set (see
+# clock.contrib.replica). Clients read from the primary database for
+# REPLICA_STICKY_SECONDS after they changed something.
+DATABASE_ROUTERS = ["clock.contrib.replica.routers.ReplicaRouter"]
+REPLICA_DATABASE = None
+REPLICA_STICKY_SECONDS = env.int("DJANGO_REPLICA_STICKY_SECONDS", 10)
+
 LOCALE_PATHS = (str(ROOT_DIR("locale")),)
 
 ACCOUNT_FORMS = {"signup": "clock.accounts.forms.ClockSignUpForm"}
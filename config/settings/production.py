@@ -103,6 +103,37 @@ TEMPLATES[0]["OPTIONS"]["loaders"] = [
 # Use the Heroku-style specification
 # Raises ImproperlyConfigured exception if DATABASE_URL not in os.environ
 DATABASES["default"] = env.db("DATABASE_URL")
+# Share the connections between the requests (and greenlets) of a worker
+# instead of opening a new one per request. Set the size to 0 to disable it.
+DATABASE_POOL_SIZE = env.int("DJANGO_DATABASE_POOL_SIZE", default=10)
+if DATABASE_POOL_SIZE:
+    DATABASES["default"]["ENGINE"] = "clock.contrib.postgresql_pool"
+    DATABASES["default"]["POOL"] = {
+        "SIZE": DATABASE_POOL_SIZE,
+        "TIMEOUT": env.int("DJANGO_DATABASE_POOL_TIMEOUT", default=10),
+        "MAX_AGE": env.int("DJANGO_DATABASE_POOL_MAX_AGE", default=60 * 60),
+    }
+# Optional read replica for the reporting and export views
+if env("DATABASE_REPLICA_URL", default=None):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+    DATABASES["replica"]["ENGINE"] = DATABASES["default"]["ENGINE"]
+    DATABASES["replica"]["POOL"] = DATABASES["default"].get("POOL", {})
+    REPLICA_DATABASE = "replica"
+
+# CACHING
+# ------------------------------------------------------------------------------
+# The data versions and change stamps of clock/shifts/cache.py and the clock
+# status have to be shared by all workers, so a per-process cache would serve
+# stale pages and miss changes. Use memcached, e.g.
+# DJANGO_CACHE_URL=memcache://127.0.0.1:11211 (python-memcached cooperates
+# with the gevent workers).
+# Raises ImproperlyConfigured exception if DJANGO_CACHE_URL not in os.environ
+CACHES = {"default": env.cache("DJANGO_CACHE_URL")}
+
+# The gevent workers of config/gunicorn.py wait for changes of the clock
+# status without blocking other requests, so the dashboard uses long polling.
+if env("GUNICORN_WORKER_CLASS", default="gevent") == "gevent":
+    CLOCK_STATUS_TIMEOUT = env.int("DJANGO_CLOCK_STATUS_TIMEOUT", 25)
 
 # Sentry Configuration
 SENTRY_DSN = env("DJANGO_SENTRY_DSN")
@@ -37,6 +37,7 @@ urlpatterns = [
     url(r"^contract/", include("clock.contracts.urls")),
     url(r"^export/", include("clock.exports.urls")),
     url(r"^contact/", include("clock.contact.urls")),
+    url(r"^reports/", include("clock.reports.urls")),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 # Add all needed favicon redirects to comply with todays OS/browser standards
@@ -0,0 +1,142 @@
+"""Load test scenarios for Clock.
+
+The scenarios log in through allauth and replay the journeys of a typical
+user: looking at the dashboard, clocking in and out, browsing months,
+planning recurring shifts and exporting a month as PDF. Every request is
+reported under the name of its Django URL pattern, so locust prints latency
+percentiles per view instead of per concrete URL.
+
+Start the local stack and seed it with users first:
+
+    docker-compose up -d
+    docker-compose run --rm web python manage.py seed_clock --users 50
+
+Then run locust from the host:
+
+    pipenv run locust -f loadtest/locustfile.py --host http://localhost:8000
+
+The users `<LOADTEST_PREFIX>0` up to `<LOADTEST_PREFIX><LOADTEST_USERS - 1>`
+are used, which matches the defaults of `seed_clock`.
+"""
+import os
+import random
+import re
+from datetime import date, timedelta
+
+from locust import HttpUser, between, task
+
+USER_PREFIX = os.environ.get("LOADTEST_PREFIX", "loadtest")
+USER_COUNT = int(os.environ.get("LOADTEST_USERS", 10))
+PASSWORD = os.environ.get("LOADTEST_PASSWORD", "password")
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+CONTRACT_RE = re.compile(r'<option value="(\d+)"')
+
+
+def random_month(years=1):
+    """Return (year, month) of a random month within the last years."""
+    day = date.today() - timedelta(days=random.randrange(365 * years))
+    return day.year, day.month
+
+
+class LoggedInUser(HttpUser):
+    """Logs in as one of the seeded users and remembers the CSRF token and the
+    contracts of the user.
+    """
+
+    abstract = True
+
+    def on_start(self):
+        self.username = "{}{}".format(USER_PREFIX, random.randrange(USER_COUNT))
+        self.csrf_token = None
+        self.contracts = []
+
+        response = self.client.get("/accounts/login/", name="account_login")
+        self.client.post(
+            "/accounts/login/",
+            data={
+                "login": self.username,
+                "password": PASSWORD,
+                "csrfmiddlewaretoken": self.parse_csrf_token(response),
+            },
+            name="account_login",
+        )
+        self.dashboard()
+
+    def parse_csrf_token(self, response):
+        match = CSRF_RE.search(response.text)
+        if match:
+            self.csrf_token = match.group(1)
+        return self.csrf_token
+
+    def dashboard(self):
+        response = self.client.get("/", name="home")
+        self.parse_csrf_token(response)
+        self.contracts = CONTRACT_RE.findall(response.text)
+
+
+class ClockUser(LoggedInUser):
+    wait_time = between(1, 5)
+
+    @task(10)
+    def dashboard(self):
+        super().dashboard()
+
+    @task(5)
+    def clock_in_and_out(self):
+        for action in ("_start", "_stop"):
+            self.client.post(
+                "/shift/quick_action/",
+                data={action: True, "csrfmiddlewaretoken": self.csrf_token},
+                name="shift:quick_action",
+            )
+
+    @task(8)
+    def browse_months(self):
+        year, month = random_month()
+        self.client.get(
+            "/shift/{}/{}/".format(year, month), name="shift:archive_month_numeric"
+        )
+        if self.contracts:
+            self.client.get(
+                "/shift/{}/{}/contract/{}/".format(
+                    year, month, random.choice(self.contracts)
+                ),
+                name="shift:archive_month_contract_numeric",
+            )
+
+    @task(2)
+    def create_recurring_shift(self):
+        if not self.contracts:
+            return
+
+        response = self.client.get("/shift/new/", name="shift:new")
+        day = date.today() + timedelta(days=random.randrange(1, 60))
+        self.client.post(
+            "/shift/new/",
+            data={
+                "started": "{} 08:00".format(day.isoformat()),
+                "finished": "{} 12:00".format(day.isoformat()),
+                "contract": random.choice(self.contracts),
+                "reoccuring": "WEEKLY",
+                "end_date": (day + timedelta(weeks=4)).isoformat(),
+                "key": "",
+                "tags": "",
+                "note": "",
+                "csrfmiddlewaretoken": self.parse_csrf_token(response),
+            },
+            name="shift:new",
+        )
+
+    @task(1)
+    def export_month(self):
+        if not self.contracts:
+            return
+
+        year, month = random_month()
+        self.client.get(
+            "/export/{}/{}/contract/{}/".format(
+                year, month, random.choice(self.contracts)
+            ),
+            name="export:contract",
+        )
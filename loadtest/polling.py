@@ -0,0 +1,64 @@
+"""Benchmark of the small JSON endpoints that browsers poll.
+
+Most of these requests only wait for the database or the cache, so they show
+the difference between the synchronous and the gevent workers of gunicorn
+(see `config/gunicorn.py`). Run the same scenario against both setups:
+
+    GUNICORN_WORKER_CLASS=sync gunicorn -c config/gunicorn.py config.wsgi
+    pipenv run locust -f loadtest/polling.py --host http://localhost:8000 \\
+        --headless --users 200 --spawn-rate 20 --run-time 2m
+
+    GUNICORN_WORKER_CLASS=gevent gunicorn -c config/gunicorn.py config.wsgi
+    pipenv run locust -f loadtest/polling.py --host http://localhost:8000 \\
+        --headless --users 200 --spawn-rate 20 --run-time 2m
+
+and compare the requests per second and latency percentiles locust prints.
+The waiting dashboards keep one request open each, which blocks a whole
+synchronous worker but only a greenlet of a gevent worker.
+"""
+import random
+
+from locust import between, task
+from locustfile import LoggedInUser, random_month
+
+
+class PollingUser(LoggedInUser):
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        super().on_start()
+        self.status_version = None
+
+    @task(10)
+    def clock_status(self):
+        response = self.client.get("/shift/status/", name="shift:status")
+        self.status_version = response.json()["version"]
+
+    @task(2)
+    def wait_for_clock_status(self):
+        # Behaves like an open dashboard waiting for the next change.
+        if self.status_version is None:
+            return
+        self.client.get(
+            "/shift/status/",
+            params={"version": self.status_version},
+            name="shift:status (waiting)",
+        )
+
+    @task(3)
+    def export_json(self):
+        year, month = random_month()
+        self.client.get("/export/api/{}/{}/".format(year, month), name="export:api_all")
+
+    @task(3)
+    def contract_end_date(self):
+        if not self.contracts:
+            return
+        self.client.post(
+            "/shift/ajax/get_contract_id/",
+            data={
+                "contract": random.choice(self.contracts),
+                "csrfmiddlewaretoken": self.csrf_token,
+            },
+            name="shift:get_contract_id",
+        )